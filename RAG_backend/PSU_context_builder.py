@@ -0,0 +1,130 @@
+import os
+
+import tiktoken
+
+# Must match the tiktoken encoder used by the ingestion splitter
+TOKENIZER_MODEL = "gpt-4o"
+# Max prompt tokens spent on retrieved context
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+# Shortest shared prefix/suffix treated as splitter overlap (shorter matches are coincidence)
+MIN_OVERLAP_CHARS = 40
+
+_encoder = None
+
+
+def get_encoder():
+    """The splitter's tiktoken encoding, loaded on first use."""
+    global _encoder
+    if _encoder is None:
+        _encoder = tiktoken.encoding_for_model(TOKENIZER_MODEL)
+    return _encoder
+
+
+def count_tokens(text):
+    """Number of tokens in text under the splitter's encoder."""
+    return len(get_encoder().encode(text, disallowed_special=()))
+
+
+def format_chunk(doc):
+    """Formats one chunk the way the prompt cites it."""
+    return f"{doc['id']}: {doc['text']}"
+
+
+def _overlap(first, second, min_chars=MIN_OVERLAP_CHARS):
+    """Length of the longest suffix of first that is also a prefix of second."""
+    if len(first) < min_chars or len(second) < min_chars:
+        return 0
+    probe = second[:min_chars]
+    pos = first.find(probe, max(0, len(first) - len(second)))
+    while pos != -1:
+        if second.startswith(first[pos:]):
+            return len(first) - pos
+        pos = first.find(probe, pos + 1)
+    return 0
+
+
+def _merge_pair(first, second):
+    """Returns the merged text if the two chunks overlap or contain each other, else None."""
+    if second in first:
+        return first
+    if first in second:
+        return second
+    overlap = _overlap(first, second)
+    if overlap:
+        return first + second[overlap:]
+    overlap = _overlap(second, first)
+    if overlap:
+        return second + first[overlap:]
+    return None
+
+
+def merge_overlapping_chunks(documents):
+    """
+    Merges chunks from the same source whose text overlaps (adjacent splitter chunks)
+    or is contained in another chunk. A merged chunk keeps the position of its best-ranked part.
+    """
+    merged = [dict(doc) for doc in documents]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                source_i = merged[i].get("metadata", {}).get("source")
+                source_j = merged[j].get("metadata", {}).get("source")
+                if source_i != source_j:
+                    continue
+                text = _merge_pair(merged[i]["text"], merged[j]["text"])
+                if text is None:
+                    continue
+                if merged[j]["id"] not in merged[i]["id"].split("+"):
+                    merged[i]["id"] = f"{merged[i]['id']}+{merged[j]['id']}"
+                merged[i]["text"] = text
+                # Only a merge of neighbors is still a neighbor
+                if "neighbor_of" not in merged[j]:
+                    merged[i].pop("neighbor_of", None)
+                del merged[j]
+                changed = True
+                break
+            if changed:
+                break
+    return merged
+
+
+def build_context(documents, token_budget=None):
+    """
+    Builds the prompt context from ranked chunks: merges overlapping chunks, then packs
+    them in rank order until the token budget is spent. Neighbor chunks added by
+    expand_with_neighbors() only fill the budget the ranked chunks leave, but stay next to
+    their anchor in the context.
+    Returns (context, stats) where stats reports the tokens saved versus plain concatenation.
+    """
+    token_budget = token_budget or CONTEXT_TOKEN_BUDGET
+    naive_tokens = count_tokens("\n".join(format_chunk(doc) for doc in documents))
+
+    merged = merge_overlapping_chunks(documents)
+    ranked_first = sorted(range(len(merged)), key=lambda i: "neighbor_of" in merged[i])
+    blocks = {}
+    used_tokens = 0
+    for i in ranked_first:
+        block = format_chunk(merged[i])
+        block_tokens = count_tokens(block)
+        if used_tokens + block_tokens > token_budget:
+            if blocks:
+                continue
+            # Always keep (a truncated copy of) the best chunk
+            encoder = get_encoder()
+            block = encoder.decode(encoder.encode(block, disallowed_special=())[:token_budget])
+            block_tokens = token_budget
+        blocks[i] = block
+        used_tokens += block_tokens
+
+    context = "\n".join(blocks[i] for i in sorted(blocks))
+    packed_tokens = count_tokens(context)
+    stats = {
+        "chunks_in": len(documents),
+        "chunks_out": len(blocks),
+        "naive_tokens": naive_tokens,
+        "context_tokens": packed_tokens,
+        "tokens_saved": naive_tokens - packed_tokens,
+    }
+    return context, stats
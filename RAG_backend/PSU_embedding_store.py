@@ -0,0 +1,202 @@
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+# A chunk store is a directory of column files:
+#   embeddings.npy            (n, dim) float32, one contiguous row per chunk
+#   <column>.bin / .offsets.npy  UTF-8 string column (ids, texts, JSON metadata):
+#                             data buffer + int64 offsets (n + 1), Arrow-style
+# Every file is written as rows arrive and read back with mmap, so neither side holds the corpus twice.
+STRING_COLUMNS = ("ids", "texts", "metadata")
+EMBEDDING_DTYPE = np.float32
+# Fixed .npy header size, so the header can be rewritten with the final row count in place
+NPY_HEADER_BYTES = 128
+
+
+def _npy_header(dtype, shape):
+    header = repr({"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": shape})
+    prefix = b"\x93NUMPY\x01\x00"
+    padding = NPY_HEADER_BYTES - len(prefix) - 2 - len(header) - 1
+    return prefix + struct.pack("<H", len(header) + padding + 1) + header.encode("latin1") + b" " * padding + b"\n"
+
+
+class NpyStreamWriter:
+    """Appends rows to a .npy file whose row count is only known once it is closed."""
+
+    def __init__(self, path, dtype, row_shape=()):
+        self.file = open(path, "wb")
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.rows = 0
+        self.file.write(_npy_header(self.dtype, (0, *self.row_shape)))
+
+    def append(self, rows):
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        if rows.shape[1:] != self.row_shape:
+            raise ValueError(f"Expected rows of shape {self.row_shape}, got {rows.shape[1:]}")
+        self.file.write(rows.tobytes())
+        self.rows += len(rows)
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(_npy_header(self.dtype, (self.rows, *self.row_shape)))
+        self.file.close()
+
+
+class StringColumnWriter:
+    def __init__(self, directory, name):
+        self.data = open(os.path.join(directory, f"{name}.bin"), "wb")
+        self.offsets = NpyStreamWriter(os.path.join(directory, f"{name}.offsets.npy"), np.int64)
+        self.position = 0
+        self.offsets.append([0])
+
+    def append(self, value):
+        encoded = value.encode("utf-8")
+        self.data.write(encoded)
+        self.position += len(encoded)
+        self.offsets.append([self.position])
+
+    def close(self):
+        self.data.close()
+        self.offsets.close()
+
+
+class ChunkStoreWriter:
+    """
+    Streams chunks into a store directory:
+        with ChunkStoreWriter("corpus.store") as writer:
+            writer.append(chunk_id, text, metadata, embedding)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.embeddings = None
+        self.columns = {name: StringColumnWriter(directory, name) for name in STRING_COLUMNS}
+
+    def append(self, chunk_id, text, metadata, embedding):
+        embedding = np.asarray(embedding, dtype=EMBEDDING_DTYPE)
+        if self.embeddings is None:
+            self.embeddings = NpyStreamWriter(
+                os.path.join(self.directory, "embeddings.npy"), EMBEDDING_DTYPE, embedding.shape
+            )
+        self.embeddings.append(embedding[np.newaxis, :])
+        self.columns["ids"].append(chunk_id)
+        self.columns["texts"].append(text)
+        self.columns["metadata"].append(json.dumps(metadata, ensure_ascii=False))
+
+    def close(self):
+        if self.embeddings is None:
+            # Empty store: a (0, 0) matrix keeps the layout readable
+            self.embeddings = NpyStreamWriter(os.path.join(self.directory, "embeddings.npy"), EMBEDDING_DTYPE, (0,))
+        self.embeddings.close()
+        for column in self.columns.values():
+            column.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ChunkStore:
+    """Memory-mapped read access to a store directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.embeddings = np.load(os.path.join(directory, "embeddings.npy"), mmap_mode="r")
+        self._data = {}
+        self._offsets = {}
+        for name in STRING_COLUMNS:
+            self._offsets[name] = np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode="r")
+            data_path = os.path.join(directory, f"{name}.bin")
+            # np.memmap refuses empty files
+            self._data[name] = np.memmap(data_path, dtype=np.uint8, mode="r") if os.path.getsize(data_path) else b""
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def value(self, name, row):
+        offsets = self._offsets[name]
+        return bytes(self._data[name][offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def chunk(self, row):
+        """One chunk in the legacy JSON shape (embedding as a float32 array view)."""
+        return {
+            "id": self.value("ids", row),
+            "text": self.value("texts", row),
+            "metadata": json.loads(self.value("metadata", row)),
+            "embedding": self.embeddings[row],
+        }
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.chunk(row)
+
+    def ids(self):
+        return [self.value("ids", row) for row in range(len(self))]
+
+
+def _iter_json_chunks(json_path):
+    """Streams chunks out of a legacy JSON file with ijson when it is installed."""
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+    with open(json_path, "rb") as f:
+        if ijson is not None:
+            yield from ijson.items(f, "item", use_float=True)
+            return
+        yield from json.load(f)
+
+
+def convert_json(json_path, directory):
+    """Converts a legacy *_ingested_chunks.json file into a store directory; returns the chunk count."""
+    count = 0
+    with ChunkStoreWriter(directory) as writer:
+        for chunk in _iter_json_chunks(json_path):
+            writer.append(chunk["id"], chunk["text"], chunk.get("metadata", {}), chunk["embedding"])
+            count += 1
+    return count
+
+
+def export_json(directory, json_path):
+    """Writes a store back out in the legacy JSON layout, one chunk at a time."""
+    with open(json_path, "w") as f:
+        f.write("[")
+        for row, chunk in enumerate(ChunkStore(directory)):
+            chunk["embedding"] = chunk["embedding"].tolist()
+            f.write(("," if row else "") + "\n" + json.dumps(chunk))
+        f.write("\n]")
+
+
+def export_faiss(vectorstore, directory):
+    """
+    Exports a LangChain FAISS store (vectors reconstructed from the index, texts and metadata
+    from the docstore) with the chunk ids initialize_rag_lunr() assigns.
+    """
+    docstore_positions = {docstore_id: i for i, docstore_id in enumerate(vectorstore.docstore._dict)}
+    vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+    with ChunkStoreWriter(directory) as writer:
+        for row, docstore_id in sorted(vectorstore.index_to_docstore_id.items()):
+            doc = vectorstore.docstore.search(docstore_id)
+            chunk_id = f"{doc.metadata.get('source', 'unknown')}-{docstore_positions[docstore_id] + 1}"
+            writer.append(chunk_id, doc.page_content, doc.metadata, vectors[row])
+
+
+if __name__ == "__main__":
+    # python PSU_embedding_store.py from-json PSU_rag_ingested_chunks.json PSU_rag_ingested_chunks.store
+    # python PSU_embedding_store.py to-json PSU_rag_ingested_chunks.store chunks.json
+    command, source, target = sys.argv[1:4]
+    if command == "from-json":
+        count = convert_json(source, target)
+        size = sum(os.path.getsize(os.path.join(target, name)) for name in os.listdir(target))
+        print(f"{count} chunks: {os.path.getsize(source) / 1024:.0f} KB JSON -> {size / 1024:.0f} KB store")
+    elif command == "to-json":
+        export_json(source, target)
+    else:
+        raise SystemExit(f"Unknown command {command!r} (expected from-json or to-json)")
@@ -0,0 +1,276 @@
+import json
+import os
+import pathlib
+import pickle
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PSU_pdf_loader import file_sha256
+from PSU_schedule import SCHEDULE_CSV
+from PSU_serving import CURRENT_INDEX_FILE, INDEX_ROOT
+
+DATA_DIR = pathlib.Path(os.path.dirname(__file__)) / "data"
+SUPPORTED_EXTENSIONS = (".pdf", ".csv", ".ipynb", ".txt")
+# A file is ingested once its size and mtime have not changed for this long (uploads in progress are skipped)
+DEBOUNCE_SECONDS = float(os.getenv("INGEST_DEBOUNCE_SECONDS", "3"))
+POLL_SECONDS = float(os.getenv("INGEST_POLL_SECONDS", "1"))
+# Files loaded, split and embedded at the same time
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+# Chunks and vectors per file content, so a new version only embeds the files that changed
+EMBEDDING_CACHE_DIR = pathlib.Path(os.path.dirname(__file__)) / os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")
+# Bumped when load_and_split changes the chunks or their metadata (2: section parents), so cached files are redone
+CHUNK_FORMAT_VERSION = 2
+# Published index versions kept on disk (older ones are removed after a publish)
+KEEP_INDEX_VERSIONS = int(os.getenv("KEEP_INDEX_VERSIONS", "3"))
+
+# Optional S3-compatible store (e.g. MinIO) mirroring the assignments bucket; objects are copied into DATA_DIR/s3
+INGEST_S3_BUCKET = os.getenv("INGEST_S3_BUCKET")
+INGEST_S3_PREFIX = os.getenv("INGEST_S3_PREFIX", "assignments/")
+INGEST_S3_ENDPOINT = os.getenv("INGEST_S3_ENDPOINT")
+INGEST_S3_POLL_SECONDS = float(os.getenv("INGEST_S3_POLL_SECONDS", "10"))
+S3_MIRROR_DIR = DATA_DIR / "s3"
+S3_MANIFEST = S3_MIRROR_DIR / ".etags.json"
+
+
+def scan(data_dir=DATA_DIR):
+    """(size, mtime_ns) of every ingestible file under data_dir, keyed by its path relative to data_dir."""
+    found = {}
+    for path in data_dir.rglob("*"):
+        if path.name.startswith(".") or not path.is_file() or path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+            continue
+        if path == SCHEDULE_CSV:
+            # Answered from the schedule table, kept out of vector search
+            continue
+        stat = path.stat()
+        found[path.relative_to(data_dir).as_posix()] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+class S3Mirror:
+    """Copies new or changed objects under the prefix into DATA_DIR/s3 and removes deleted ones."""
+
+    def __init__(self, bucket=INGEST_S3_BUCKET, prefix=INGEST_S3_PREFIX, endpoint_url=INGEST_S3_ENDPOINT):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        S3_MIRROR_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            self.etags = json.loads(S3_MANIFEST.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.etags = {}
+
+    def sync(self):
+        seen = set()
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                if not key.lower().endswith(SUPPORTED_EXTENSIONS):
+                    continue
+                seen.add(key)
+                if self.etags.get(key) == obj["ETag"]:
+                    continue
+                target = S3_MIRROR_DIR / key[len(self.prefix):]
+                target.parent.mkdir(parents=True, exist_ok=True)
+                # Download next to the target, then rename, so the watcher never sees a partial file
+                partial = target.with_name(f".{target.name}.partial")
+                self.client.download_file(self.bucket, key, str(partial))
+                os.replace(partial, target)
+                self.etags[key] = obj["ETag"]
+                print(f"S3: mirrored s3://{self.bucket}/{key}")
+        for key in set(self.etags) - seen:
+            (S3_MIRROR_DIR / key[len(self.prefix):]).unlink(missing_ok=True)
+            del self.etags[key]
+            print(f"S3: removed s3://{self.bucket}/{key}")
+        S3_MANIFEST.write_text(json.dumps(self.etags), encoding="utf-8")
+
+    def run(self, stop):
+        while not stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"S3 mirror error: {e}")
+            stop.wait(INGEST_S3_POLL_SECONDS)
+
+
+class IngestionDaemon:
+    """
+    Watches DATA_DIR, debounces changes, embeds changed files on a bounded worker pool and
+    publishes a new FAISS index version once the queue drains. The API picks the version up
+    through the CURRENT pointer (PSU_serving.start_master_index_watcher).
+    """
+
+    def __init__(self, data_dir=DATA_DIR, workers=INGEST_WORKERS):
+        from PSU_rag_documents_ingestion import EMBEDDING_MODEL, embedding_client
+
+        self.data_dir = data_dir
+        self.embedding_client = embedding_client
+        self.embedding_model = EMBEDDING_MODEL
+        self.jobs = queue.Queue()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.dirty = False
+        self.ingested = {}  # relative path -> (size, mtime_ns) last ingested
+        self.failed = {}  # relative path -> (size, mtime_ns) whose ingestion failed; skipped until it changes
+        self.pending = {}  # relative path -> (size, mtime_ns, first seen unchanged at)
+        EMBEDDING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    # --- WATCHER ---
+    def poll(self):
+        """Queues files whose changes have settled; a removed file only triggers a publish."""
+        now = time.monotonic()
+        current = scan(self.data_dir)
+        ready = []
+        with self.lock:
+            for name, signature in current.items():
+                if self.ingested.get(name) == signature or self.failed.get(name) == signature:
+                    self.pending.pop(name, None)
+                    continue
+                seen = self.pending.get(name)
+                if seen is None or seen[:2] != signature:
+                    self.pending[name] = (*signature, now)
+                elif now - seen[2] >= DEBOUNCE_SECONDS:
+                    del self.pending[name]
+                    self.failed.pop(name, None)
+                    self.ingested[name] = signature
+                    ready.append((name, signature))
+            for name in set(self.failed) - set(current):
+                del self.failed[name]
+            removed = set(self.ingested) - set(current)
+            for name in removed:
+                del self.ingested[name]
+                print(f"Removed: {name}")
+            if removed:
+                self.dirty = True
+        for name, signature in ready:
+            self.submit(name, signature)
+
+    def submit(self, name, signature):
+        with self.lock:
+            self.in_flight += 1
+        self.jobs.put((name, signature))
+        self.pool.submit(self._run_job)
+
+    # --- WORKERS ---
+    def cache_path(self, file_path):
+        return EMBEDDING_CACHE_DIR / f"{file_sha256(file_path)}-{self.embedding_model}-v{CHUNK_FORMAT_VERSION}.pkl"
+
+    def ingest_file(self, name):
+        """Loads, splits and embeds one file unless its content is already in the embedding cache."""
+        from PSU_rag_documents_ingestion import load_and_split
+
+        file_path = self.data_dir / name
+        cached = self.cache_path(file_path)
+        if cached.exists():
+            print(f"Unchanged content, reusing embeddings: {name}")
+            return
+        split_docs = load_and_split(file_path, name)
+        texts = [doc.page_content for doc in split_docs]
+        entry = {
+            "texts": texts,
+            "metadatas": [doc.metadata for doc in split_docs],
+            "vectors": self.embedding_client.embed_documents(texts) if texts else [],
+        }
+        partial = cached.with_suffix(".partial")
+        with open(partial, "wb") as f:
+            pickle.dump(entry, f)
+        os.replace(partial, cached)
+
+    def _run_job(self):
+        name, signature = self.jobs.get()
+        try:
+            self.ingest_file(name)
+            with self.lock:
+                self.dirty = True
+        except FileNotFoundError:
+            print(f"Skipped {name}: removed before it was ingested")
+        except Exception as e:
+            print(f"ERROR ingesting {name}: {e}")
+            with self.lock:
+                # Retry only once the file changes, not on every poll
+                if self.ingested.get(name) == signature:
+                    del self.ingested[name]
+                    self.failed[name] = signature
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+            self.jobs.task_done()
+
+    # --- PUBLISH ---
+    def publish(self):
+        """Builds a FAISS index from the cached vectors of every current file and swaps the pointer to it."""
+        from langchain_community.vectorstores import FAISS
+
+        with self.lock:
+            names = sorted(self.ingested)
+        texts, vectors, metadatas = [], [], []
+        for name in names:
+            try:
+                with open(self.cache_path(self.data_dir / name), "rb") as f:
+                    entry = pickle.load(f)
+            except (FileNotFoundError, pickle.UnpicklingError):
+                continue
+            texts.extend(entry["texts"])
+            vectors.extend(entry["vectors"])
+            metadatas.extend(entry["metadatas"])
+        if not texts:
+            print("Nothing to publish.")
+            return None
+
+        vectorstore = FAISS.from_embeddings(list(zip(texts, vectors)), self.embedding_client, metadatas=metadatas)
+        # Fixed-width UTC seconds plus nanoseconds, so lexical order is publish order and prune() keeps the newest
+        now_ns = time.time_ns()
+        version = f"v{time.strftime('%Y%m%d%H%M%S', time.gmtime(now_ns // 1_000_000_000))}-{now_ns % 1_000_000_000:09d}"
+        target = os.path.join(INDEX_ROOT, version)
+        # Write under a hidden name, rename into place, then move the pointer: readers see old or new, never half
+        staging = os.path.join(INDEX_ROOT, f".{version}")
+        vectorstore.save_local(staging)
+        os.replace(staging, target)
+        pointer = f"{CURRENT_INDEX_FILE}.tmp"
+        with open(pointer, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer, CURRENT_INDEX_FILE)
+        print(f"Published index {version} ({len(texts)} chunks from {len(names)} files)")
+        self.prune(keep=version)
+        return version
+
+    def prune(self, keep):
+        versions = sorted(name for name in os.listdir(INDEX_ROOT) if name.startswith("v"))
+        for name in versions[:-KEEP_INDEX_VERSIONS]:
+            if name != keep:
+                shutil.rmtree(os.path.join(INDEX_ROOT, name), ignore_errors=True)
+
+    def run(self):
+        os.makedirs(INDEX_ROOT, exist_ok=True)
+        if INGEST_S3_BUCKET:
+            threading.Thread(target=S3Mirror().run, args=(self.stop,), name="s3-mirror", daemon=True).start()
+        print(f"Watching {self.data_dir} (debounce {DEBOUNCE_SECONDS}s, {self.pool._max_workers} workers)")
+        try:
+            while not self.stop.is_set():
+                self.poll()
+                with self.lock:
+                    ready = self.dirty and self.in_flight == 0 and not self.pending
+                    if ready:
+                        self.dirty = False
+                if ready:
+                    try:
+                        self.publish()
+                    except Exception as e:
+                        print(f"ERROR publishing index: {e}")
+                self.stop.wait(POLL_SECONDS)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop.set()
+            self.pool.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    IngestionDaemon().run()
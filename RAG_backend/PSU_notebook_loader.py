@@ -0,0 +1,85 @@
+import json
+import re
+
+from langchain_core.documents import Document
+
+from PSU_pdf_loader import carry_headers
+
+# Cell types indexed from notebooks (raw cells carry no course content)
+INDEXED_CELL_TYPES = ("code", "markdown")
+# Markdown headings that open a notebook section (same levels as the PDF splitter)
+HEADING = re.compile(r"^(#{1,3})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+
+
+def _cell_text(source):
+    """nbformat stores cell source either as one string or as a list of lines."""
+    return "".join(source) if isinstance(source, list) else (source or "")
+
+
+def _iter_cells_streaming(file, ijson):
+    """
+    Streams cells with ijson, materializing only cell_type and source:
+    outputs (plots, HTML tables, base64 images) are tokenized but never built into objects.
+    """
+    cell = None
+    for prefix, event, value in ijson.parse(file):
+        if prefix == "cells.item" and event == "start_map":
+            cell = {"cell_type": None, "source": []}
+        elif cell is None:
+            continue
+        elif prefix == "cells.item.cell_type":
+            cell["cell_type"] = value
+        elif prefix == "cells.item.source" and event == "string":
+            cell["source"] = value
+        elif prefix == "cells.item.source.item":
+            cell["source"].append(value)
+        elif prefix == "cells.item" and event == "end_map":
+            yield cell
+            cell = None
+
+
+def iter_notebook_cells(file_path):
+    """Yields {"cell_type", "source"} for every cell; streams with ijson when it is installed."""
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+    with open(file_path, "rb") as f:
+        if ijson is not None:
+            yield from _iter_cells_streaming(f, ijson)
+            return
+        for cell in json.load(f).get("cells", []):
+            yield {"cell_type": cell.get("cell_type"), "source": cell.get("source", [])}
+
+
+def load_notebook_cells(file_path, filename):
+    """
+    One Document per non-empty code/markdown cell, tagged with the notebook, cell index and
+    cell type so retrieval can filter on code cells and cite the exact cell. Every cell also
+    carries the h1/h2/h3 headings of the markdown section it falls under.
+    """
+    documents = []
+    headers = {}
+    for cell_index, cell in enumerate(iter_notebook_cells(file_path)):
+        if cell["cell_type"] not in INDEXED_CELL_TYPES:
+            continue
+        text = _cell_text(cell["source"]).strip()
+        if not text:
+            continue
+        if cell["cell_type"] == "markdown":
+            # The first heading of each level in the cell; the cell belongs to the section it opens
+            cell_headers = {}
+            for hashes, title in HEADING.findall(text):
+                cell_headers.setdefault(f"h{len(hashes)}", title)
+            headers = carry_headers(headers, cell_headers)
+        documents.append(Document(
+            page_content=text,
+            metadata={
+                "source": filename,
+                "notebook": filename,
+                "cell_index": cell_index,
+                "cell_type": cell["cell_type"],
+                **headers,
+            },
+        ))
+    return documents
@@ -0,0 +1,103 @@
+import hashlib
+import multiprocessing
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+
+from langchain_core.documents import Document
+from langchain_text_splitters import MarkdownHeaderTextSplitter
+
+# Extracted page markdown, keyed by PDF content hash and page number
+PDF_CACHE_DIR = pathlib.Path(os.path.dirname(__file__)) / os.getenv("PDF_CACHE_DIR", "pdf_page_cache")
+# Processes used for page extraction (PyMuPDF documents are not thread-safe)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+HEADERS_TO_SPLIT_ON = [("#", "h1"), ("##", "h2"), ("###", "h3")]
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _page_count(file_path):
+    import pymupdf
+
+    with pymupdf.open(file_path) as pdf:
+        return pdf.page_count
+
+
+def _extract_page(args):
+    """Worker: one page to markdown (headings and tables preserved)."""
+    import pymupdf4llm
+
+    file_path, page_number = args
+    return page_number, pymupdf4llm.to_markdown(str(file_path), pages=[page_number], show_progress=False)
+
+
+def load_pdf_pages(file_path, filename, workers=PDF_WORKERS):
+    """
+    One markdown Document per page. Pages already extracted for this exact file content are
+    read from the cache; the rest are extracted in parallel and cached.
+    """
+    cache_dir = PDF_CACHE_DIR / file_sha256(file_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    page_count = _page_count(file_path)
+
+    pages = {}
+    missing = []
+    for page_number in range(page_count):
+        cached = cache_dir / f"{page_number}.md"
+        if cached.exists():
+            pages[page_number] = cached.read_text(encoding="utf-8")
+        else:
+            missing.append(page_number)
+
+    if missing:
+        print(f"   -> Extracting {len(missing)}/{page_count} pages of {filename} with {workers} workers")
+        jobs = [(str(file_path), page_number) for page_number in missing]
+        # spawn, not fork: the ingestion daemon calls this from its worker threads, and a child
+        # forked while another thread holds a lock (HTTP client, logging, a pool queue) can deadlock
+        if workers > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                extracted = list(pool.map(_extract_page, jobs))
+        else:
+            extracted = [_extract_page(job) for job in jobs]
+        for page_number, markdown in extracted:
+            (cache_dir / f"{page_number}.md").write_text(markdown, encoding="utf-8")
+            pages[page_number] = markdown
+    else:
+        print(f"   -> All {page_count} pages of {filename} served from cache")
+
+    return [
+        Document(page_content=pages[page_number], metadata={"source": filename, "page": page_number})
+        for page_number in range(page_count)
+        if pages[page_number].strip()
+    ]
+
+
+def carry_headers(previous, headers):
+    """
+    Full h1/h2/h3 path of a section: its own headings under the closest enclosing headings
+    seen before it. Text before a page's first heading continues the previous page's section.
+    """
+    levels = [name for _, name in HEADERS_TO_SPLIT_ON]
+    first = next((i for i, name in enumerate(levels) if name in headers), len(levels))
+    path = {name: previous[name] for name in levels[:first] if name in previous}
+    path.update({name: headers[name] for name in levels[first:] if name in headers})
+    return path
+
+
+def split_markdown_documents(page_documents, text_splitter):
+    """Splits each page on markdown headings first, then to the token limit."""
+    header_splitter = MarkdownHeaderTextSplitter(headers_to_split_on=HEADERS_TO_SPLIT_ON, strip_headers=False)
+    sections = []
+    headers = {}
+    for page in page_documents:
+        for section in header_splitter.split_text(page.page_content):
+            headers = carry_headers(headers, section.metadata)
+            section.metadata = {**page.metadata, **headers}
+            sections.append(section)
+    return text_splitter.split_documents(sections)
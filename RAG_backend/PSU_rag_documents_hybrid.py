@@ -1,13 +1,15 @@
+import hashlib
 import json
+import dataclasses
 import os
+from array import array
 
-import azure.identity
 import openai
 from dotenv import load_dotenv
-from lunr import lunr
-from sentence_transformers import CrossEncoder
-from langchain_community.vectorstores import FAISS 
-from langchain_openai import OpenAIEmbeddings 
+from PSU_reranker import cached_predict_scores
+from PSU_context_builder import build_context, count_tokens
+from PSU_schedule import load_schedule, schedule_search
+from PSU_serving import current_index_path
 
 
 
@@ -37,19 +39,50 @@ generation_client = openai.OpenAI(
     base_url="https://openrouter.ai/api/v1",
     api_key=os.environ["OPENROUTER_API_KEY"]
 )
+# Async twin of generation_client, used by the SSE endpoint so a stream can be closed mid-answer
+async_generation_client = openai.AsyncOpenAI(
+    base_url="https://openrouter.ai/api/v1",
+    api_key=os.environ["OPENROUTER_API_KEY"]
+)
 GENERATION_MODEL = os.getenv("GEMINI_MODEL", "google/gemini-2.0-flash-exp")
 
-# Load documents and create index
-documents = None
-documents_by_id = None
-index = None # LUNR Index (Full-Text)
-FAISS_STORE = None # FAISS Index (Vector)
+
+
+@dataclasses.dataclass(frozen=True)
+class IndexState:
+    """
+    One loaded index version: the FAISS store and everything built from its docstore.
+    Never changed in place; a reload builds a new one and replaces STATE.
+    """
+    faiss_store: object # FAISS Index (Vector)
+    faiss_path: str # Directory faiss_store was loaded from
+    version: str # Changes whenever a different FAISS index is loaded
+    documents: list = None
+    documents_by_id: dict = None
+    chunk_ids_by_docstore_id: dict = None # FAISS docstore id -> chunk id
+    # Compact chunk adjacency: positions (into documents) of the previous/next chunk of the same parent, -1 if none
+    prev_chunk: array = None
+    next_chunk: array = None
+    index: object = None # LUNR Index (Full-Text)
+    code_index: object = None # LUNR Index over notebook code cells only (code-only retrieval)
+
+
+# The index in use. A request reads it once and passes it down, so a reload in the middle of
+# the request cannot mix two versions.
+STATE = None
+# Neighbor-window retrieval: chunks added on each side of every top-ranked chunk (0 disables it),
+# and the max extra tokens the neighbors may add to the context
+NEIGHBOR_WINDOW = int(os.getenv("NEIGHBOR_WINDOW", "0"))
+NEIGHBOR_TOKEN_BUDGET = int(os.getenv("NEIGHBOR_TOKEN_BUDGET", "1000"))
+# Schedule rows placed ahead of the reranked chunks when a schedule question is not answered outright
+SCHEDULE_BOOST = int(os.getenv("SCHEDULE_BOOST", "2"))
 
 
 # --- UTILITY FUNCTION ---
 def get_all_documents_from_faiss(faiss_path, embedding_client):
     """Loads all documents from a FAISS index and returns them as a list of dictionaries."""
-    
+    from langchain_community.vectorstores import FAISS
+
     faiss_index = FAISS.load_local(
         faiss_path, 
         embedding_client, 
@@ -59,9 +92,20 @@ def get_all_documents_from_faiss(faiss_path, embedding_client):
     # We return the FAISS object itself for vector search.
     return faiss_index
 
-def initialize_rag_faiss():
-    """Initializes the FAISS vector store for vector search."""
-    global FAISS_STORE
+def compute_index_version(faiss_path):
+    """Fingerprints the on-disk index files so caches can tell when the index was rebuilt."""
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(faiss_path)):
+        stat = os.stat(os.path.join(faiss_path, name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+def load_faiss(faiss_path=None):
+    """
+    Loads a FAISS vector store without installing it; returns (store, path, version).
+    Defaults to the latest version published by the ingestion daemon.
+    """
+    from langchain_openai import OpenAIEmbeddings
     
     # 1. Load Embedding Client (Necessary to load FAISS)
     embedding_client_loader = OpenAIEmbeddings(
@@ -69,71 +113,158 @@ def initialize_rag_faiss():
         model=EMBEDDING_MODEL
     )
     
-    FAISS_PATH = "faiss_index_hackpsu"
+    faiss_path = faiss_path or current_index_path()
     
     # Load the FAISS object
-    FAISS_STORE = get_all_documents_from_faiss(FAISS_PATH, embedding_client_loader)
-    print("FAISS Index loaded.")
-
+    faiss_store = get_all_documents_from_faiss(faiss_path, embedding_client_loader)
+    return faiss_store, faiss_path, compute_index_version(faiss_path)
 
 
-def initialize_rag_lunr():
+def build_lookup_tables(faiss_store):
     """
-    Loads all document content from FAISS for Lunr and dictionary lookups.
+    Builds the document list, lookup dicts, chunk adjacency and LUNR indexes from a FAISS
+    docstore. Returns them keyed by IndexState field; nothing is installed.
     """
-    global documents, documents_by_id, index
-    
-    if FAISS_STORE is None:
-        raise RuntimeError("FAISS Store must be initialized first. Run initialize_rag_faiss().")
+    from lunr import lunr
 
     # This step retrieves ALL chunks from the FAISS object
-    all_docs_raw = FAISS_STORE.docstore._dict.values()
+    all_docs_raw = faiss_store.docstore._dict.items()
     
     # Convert LangChain Documents back to your required dictionary structure
     document_list = []
-    for i, doc in enumerate(all_docs_raw):
+    docstore_ids = {}
+    for i, (docstore_id, doc) in enumerate(all_docs_raw):
         # We manually re-create the structure that your old script expected
         # Use metadata source and a simple index ID
         chunk_id = f"{doc.metadata.get('source', 'unknown')}-{i + 1}"
+        docstore_ids[docstore_id] = chunk_id
         document_list.append({
             "id": chunk_id, 
             "text": doc.page_content,
             "metadata": doc.metadata,
+            "position": i,
         })
     
-    documents = document_list
-    documents_by_id = {doc["id"]: doc for doc in documents}
-    
-    # Build the full-text LUNR index with all the new data
-    index = lunr(ref="id", fields=["text"], documents=documents)
-    print("LUNR Index and document lookup tables built.")
+    prev_chunk, next_chunk = build_chunk_adjacency(document_list)
+    # Code questions search a much smaller candidate set: notebook code cells only
+    code_documents = [doc for doc in document_list if doc["metadata"].get("cell_type") == "code"]
+    return {
+        "documents": document_list,
+        "documents_by_id": {doc["id"]: doc for doc in document_list},
+        "chunk_ids_by_docstore_id": docstore_ids,
+        "prev_chunk": prev_chunk,
+        "next_chunk": next_chunk,
+        # Build the full-text LUNR index with all the new data
+        "index": lunr(ref="id", fields=["text"], documents=document_list),
+        "code_index": lunr(ref="id", fields=["text"], documents=code_documents) if code_documents else None,
+    }
+
+
+def initialize_rag_faiss(faiss_path=None):
+    """
+    Initializes the FAISS vector store for vector search.
+    Defaults to the latest version published by the ingestion daemon.
+    """
+    global STATE
+    faiss_store, faiss_path, version = load_faiss(faiss_path)
+    STATE = IndexState(faiss_store, faiss_path, version)
+    print(f"FAISS Index loaded from {faiss_path} (version {version}).")
+
+
+
+def initialize_rag_lunr():
+    """
+    Loads all document content from FAISS for Lunr and dictionary lookups.
+    """
+    global STATE
+    state = STATE
+    if state is None:
+        raise RuntimeError("FAISS Store must be initialized first. Run initialize_rag_faiss().")
+
+    tables = build_lookup_tables(state.faiss_store)
+    STATE = dataclasses.replace(state, **tables)
+    code_count = sum(1 for doc in tables["documents"] if doc["metadata"].get("cell_type") == "code")
+    print(f"LUNR Index and document lookup tables built ({code_count} code cell chunks).")
+
+
+def load_index(faiss_path):
+    """
+    Loads another index version (FAISS plus everything built from its docstore) into a new
+    IndexState, then puts it in use by replacing the single STATE reference.
+    """
+    global STATE
+    faiss_store, faiss_path, version = load_faiss(faiss_path)
+    state = IndexState(faiss_store, faiss_path, version, **build_lookup_tables(faiss_store))
+    STATE = state
+    print(f"Index {faiss_path} (version {version}) installed ({len(state.documents)} documents).")
+
+def chunk_parent(metadata):
+    """
+    The unit a chunk was split from. Ingestion records it as metadata["parent"];
+    older indexes fall back to the CSV row or the whole source file.
+    """
+    if "parent" in metadata:
+        return metadata["parent"]
+    if "row" in metadata:
+        return f"{metadata.get('source')}#row{metadata['row']}"
+    return metadata.get("source")
+
+
+def build_chunk_adjacency(documents):
+    """
+    Links each chunk to its predecessor/successor within the same parent, ordered by the
+    chunk_index recorded at ingestion (docstore order for older indexes).
+    Two int arrays instead of storing larger duplicated chunks; returns (prev, next).
+    """
+    prev_chunk = array("i", [-1] * len(documents))
+    next_chunk = array("i", [-1] * len(documents))
+    order = sorted(
+        range(len(documents)),
+        key=lambda i: (
+            str(chunk_parent(documents[i]["metadata"])),
+            documents[i]["metadata"].get("chunk_index", i),
+        ),
+    )
+    for previous, current in zip(order, order[1:]):
+        if chunk_parent(documents[previous]["metadata"]) == chunk_parent(documents[current]["metadata"]):
+            next_chunk[previous] = current
+            prev_chunk[current] = previous
+    return prev_chunk, next_chunk
 
 def initialize_rag():
     """Unified initialization call."""
     initialize_rag_faiss()
     initialize_rag_lunr()
-def full_text_search(query, limit):
+    load_schedule()
+def full_text_search(query, limit, cell_type=None, state=None):
     """
     Perform a full-text search on the indexed documents (LUNR).
+    cell_type="code" searches only notebook code cells.
     """
-    if index is None:
+    state = state or STATE
+    if state is None:
         return []
-    results = index.search(query)
+    search_index = state.code_index if cell_type == "code" else state.index
+    if search_index is None:
+        return []
+    results = search_index.search(query)
     # Ensure the retrieved documents exist in the dictionary
     retrieved_documents = []
     for result in results:
-        if result["ref"] in documents_by_id:
-            retrieved_documents.append(documents_by_id[result["ref"]])
+        if result["ref"] in state.documents_by_id:
+            retrieved_documents.append(state.documents_by_id[result["ref"]])
     return retrieved_documents[:limit]
 
 
-def vector_search(query, limit):
+def vector_search(query, limit, cell_type=None, state=None):
     """
     Perform a vector search using the loaded FAISS index (LangChain method).
     This replaces your custom cosine similarity function which is no longer needed.
     """
-    if FAISS_STORE is None:
+    state = state or STATE
+    if state is None:
         return []
+    from langchain_openai import OpenAIEmbeddings
         
     # We must create a temporary embedding client *inside* this function 
     # because the FAISS store needs a client with the same embeddings model for the query.
@@ -145,9 +276,13 @@ def vector_search(query, limit):
     
     # Perform the search using FAISS's built-in similarity search
     # This returns LangChain Document objects
-    lc_docs = FAISS_STORE.similarity_search(
+    # Optional metadata filter (e.g. notebook code cells only); FAISS over-fetches and filters
+    search_filter = {"cell_type": cell_type} if cell_type else None
+    lc_docs = state.faiss_store.similarity_search(
         query, 
         k=limit,
+        filter=search_filter,
+        fetch_k=limit * 8,
         # The embedding model must be passed explicitly for the query calculation
         embeddings=query_embedding_client 
     )
@@ -156,7 +291,9 @@ def vector_search(query, limit):
     retrieved_documents = []
     for i, doc in enumerate(lc_docs):
         # Retrieve the document ID from the lookup table for consistency
-        chunk_id = f"{doc.metadata.get('source', 'unknown')}-{i + 1}"
+        chunk_id = (state.chunk_ids_by_docstore_id or {}).get(getattr(doc, "id", None))
+        if chunk_id is None:
+            chunk_id = f"{doc.metadata.get('source', 'unknown')}-{i + 1}"
         retrieved_documents.append({
             "id": chunk_id,
             "text": doc.page_content,
@@ -166,7 +303,7 @@ def vector_search(query, limit):
     return retrieved_documents
 
 
-def reciprocal_rank_fusion(text_results, vector_results, k=60):
+def reciprocal_rank_fusion(text_results, vector_results, k=60, state=None):
     """
     Perform Reciprocal Rank Fusion (RRF) on the results from text and vector searches.
     """
@@ -187,6 +324,7 @@ def reciprocal_rank_fusion(text_results, vector_results, k=60):
     scored_documents = sorted(scores.items(), key=lambda x: x[1], reverse=True)
     
     # Ensure we only return IDs that exist in the documents_by_id map
+    documents_by_id = (state or STATE).documents_by_id
     retrieved_documents = []
     for doc_id, _ in scored_documents:
         if doc_id in documents_by_id:
@@ -195,32 +333,104 @@ def reciprocal_rank_fusion(text_results, vector_results, k=60):
     return retrieved_documents
 
 
-def rerank(query, retrieved_documents):
+def rerank(query, retrieved_documents, state=None):
     """
     Rerank the results using a cross-encoder model.
     """
-    # ... (Your existing rerank logic, assuming CrossEncoder is available) ...
-    # Placeholder for the Reranker logic
+    # Backend (PyTorch or quantized ONNX) is selected via RERANKER_BACKEND in PSU_reranker
     if not retrieved_documents:
         return []
-    encoder = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
-    scores = encoder.predict([(query, doc["text"]) for doc in retrieved_documents])
+    # Scores are cached per (query, chunk) so repeat questions only score new chunks
+    scores = cached_predict_scores(
+        query,
+        [doc["id"] for doc in retrieved_documents],
+        [doc["text"] for doc in retrieved_documents],
+        index_version=(state or STATE).version,
+    )
     # Combine scores with documents and sort
-    scored_documents = [v for _, v in sorted(zip(scores, retrieved_documents), reverse=True)]
+    scored_documents = [v for _, v in sorted(zip(scores, retrieved_documents), key=lambda x: x[0], reverse=True)]
     return scored_documents
 
 
-def hybrid_search(query, limit):
+def fused_candidates(query, search_limit, cell_type=None, state=None):
+    """
+    Returns the RRF-fused full-text + vector candidate pool (before reranking).
+    """
+    state = state or STATE
+    text_results = full_text_search(query, search_limit, cell_type=cell_type, state=state)
+    vector_results = vector_search(query, search_limit, cell_type=cell_type, state=state)
+    return reciprocal_rank_fusion(text_results, vector_results, state=state)
+
+
+def expand_with_neighbors(ranked_documents, window=None, token_budget=None, state=None):
+    """
+    Adds up to `window` neighboring chunks (same parent) on each side of every ranked chunk,
+    best-ranked chunks first, until the neighbors would exceed token_budget.
+    Neighbors are inserted right after their anchor; build_context() merges the overlaps.
+    """
+    window = NEIGHBOR_WINDOW if window is None else window
+    token_budget = NEIGHBOR_TOKEN_BUDGET if token_budget is None else token_budget
+    state = state or STATE
+    if window <= 0 or state is None or state.prev_chunk is None:
+        return ranked_documents
+    documents = state.documents
+
+    seen = {doc["id"] for doc in ranked_documents}
+    spent_tokens = 0
+    budget_left = True
+    expanded = []
+    for doc in ranked_documents:
+        expanded.append(doc)
+        position = doc.get("position")
+        if not budget_left or position is None:
+            continue
+        # Walk outward: 1 before, 1 after, 2 before, 2 after, ...
+        previous, following = position, position
+        for _ in range(window):
+            previous = state.prev_chunk[previous] if previous >= 0 else -1
+            following = state.next_chunk[following] if following >= 0 else -1
+            for neighbor_position in (previous, following):
+                if neighbor_position < 0 or documents[neighbor_position]["id"] in seen:
+                    continue
+                neighbor = documents[neighbor_position]
+                neighbor_tokens = count_tokens(neighbor["text"])
+                if spent_tokens + neighbor_tokens > token_budget:
+                    budget_left = False
+                    break
+                spent_tokens += neighbor_tokens
+                seen.add(neighbor["id"])
+                expanded.append({**neighbor, "neighbor_of": doc["id"]})
+            if not budget_left:
+                break
+    return expanded
+
+
+def hybrid_search(query, limit, cell_type=None):
     """
     Perform a hybrid search using both full-text and vector search, then RRF and rerank.
+    With NEIGHBOR_WINDOW > 0 the top chunks are expanded with their neighboring chunks.
+    cell_type="code" restricts retrieval to notebook code cells.
+    Schedule questions are first looked up in the course schedule table: an exact match
+    (a date, or every keyword in one meeting's topic) skips embedding and reranking entirely,
+    weaker matches are boosted ahead of the reranked chunks.
     """
+    schedule_results, confident = ([], False) if cell_type else schedule_search(query, limit)
+    if confident:
+        return schedule_results
+
+    # One index version for the whole request, even if a reload lands in the middle of it
+    state = STATE
     # NOTE: We double the limit for the initial searches to ensure a high quality pool
-    search_limit = limit * 3
-    text_results = full_text_search(query, search_limit)
-    vector_results = vector_search(query, search_limit)
-    fused_results = reciprocal_rank_fusion(text_results, vector_results)
-    reranked_results = rerank(query, fused_results)
-    return reranked_results[:limit]
+    fused_results = fused_candidates(query, limit * 3, cell_type=cell_type, state=state)
+    reranked_results = rerank(query, fused_results, state=state)
+    if schedule_results:
+        boosted = schedule_results[:SCHEDULE_BOOST]
+        boosted_rows = {(doc["metadata"]["source"], doc["metadata"]["row"]) for doc in boosted}
+        reranked_results = boosted + [
+            doc for doc in reranked_results
+            if (doc["metadata"].get("source"), doc["metadata"].get("row")) not in boosted_rows
+        ]
+    return expand_with_neighbors(reranked_results[:limit], state=state)
 
 
 def answer_question(user_question):
@@ -251,7 +461,7 @@ def answer_question(user_question):
             "guardrail_triggered": False
         }
     print(f"✓ Retrieved {len(retrieved_documents)} matching documents")
-    context = "\n".join([f"{doc['id']}: {doc['text']}" for doc in retrieved_documents[0:5]])
+    context, _ = build_context(retrieved_documents)
         
     response = generation_client.chat.completions.create(
         model=GENERATION_MODEL,
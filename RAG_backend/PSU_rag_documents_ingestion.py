@@ -4,13 +4,15 @@ import pathlib
 import time
 import azure.identity
 import openai
-import pymupdf4llm
 from dotenv import load_dotenv
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyMuPDFLoader, NotebookLoader 
 from langchain_openai import OpenAIEmbeddings # Use this for OpenRouter embeddings
 from langchain_community.vectorstores import FAISS 
 from langchain_community.document_loaders import CSVLoader
+from PSU_context_builder import TOKENIZER_MODEL
+from PSU_embedding_store import export_faiss
+from PSU_notebook_loader import load_notebook_cells
+from PSU_pdf_loader import HEADERS_TO_SPLIT_ON, load_pdf_pages, split_markdown_documents
 
 load_dotenv(override=True)
 
@@ -41,26 +43,29 @@ print(f"Generation: Gemini {GENERATION_MODEL}\n")
 
 data_dir = pathlib.Path(os.path.dirname(__file__)) / "data"
 # filenames= ['PSU_Syllabus_IA651_Spring_2025.pdf']
-filenames=['PSU_Syllabus_IA651_Spring_2025.pdf','2025_01_IA651CourseSchedule.csv','01.ipynb','02.ipynb','03.ipynb','04.ipynb','05.ipynb','06.ipynb']
-all_chunks = []
-all_docs = []
+# The schedule CSV is not embedded: it is served from the typed schedule table (PSU_schedule.py)
+filenames=['PSU_Syllabus_IA651_Spring_2025.pdf','01.ipynb','02.ipynb','03.ipynb','04.ipynb','05.ipynb','06.ipynb']
  # Split the text into smaller chunks
 text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-    model_name="gpt-4o", chunk_size=500, chunk_overlap=125
+    model_name=TOKENIZER_MODEL, chunk_size=500, chunk_overlap=125
 )
+# Heading metadata (h1/h2/h3) that delimits the parent section of a chunk
+SECTION_LEVELS = [level for _, level in HEADERS_TO_SPLIT_ON]
 
-for filename in filenames:
-    file_path = data_dir / filename
+def load_and_split(file_path, filename):
+    """Loads one course file and splits it into tagged chunks (used by the script and the ingestion daemon)."""
     if filename.endswith(".pdf"):
-        # md_text = pymupdf4llm.to_markdown(data_dir / filename)
-        loader = PyMuPDFLoader(file_path)
+        print(f"Loading PDF: {filename}")
+        # Per-page pymupdf4llm markdown (parallel, cached by file hash + page), split on headings
+        loader = None
     elif filename.endswith(".csv"): 
         print(f"Loading CSV: {filename}")
         # The loader treats each row as a separate document
         loader = CSVLoader(file_path=file_path, encoding="utf8")
     elif filename.endswith(".ipynb"):
         print(f"Loading Notebook: {filename}")
-        loader = NotebookLoader(file_path, include_outputs=False)
+        # One document per code/markdown cell (outputs skipped) instead of one flattened string
+        loader = None
     elif filename.endswith(".txt"):
         # with open(file_path, "r", encoding="utf-8") as file:
         #     md_text = file.read()
@@ -68,16 +73,33 @@ for filename in filenames:
         loader = TextLoader(file_path)
     else:
         raise ValueError(f"Unsupported file type for file: {filename}")
-        continue
    
     # texts = text_splitter.create_documents([md_text])
-    documents = loader.load()
-    split_docs = text_splitter.split_documents(documents)
-    for doc in split_docs:
+    if filename.endswith(".pdf"):
+        split_docs = split_markdown_documents(load_pdf_pages(file_path, filename), text_splitter)
+    else:
+        documents = loader.load() if loader is not None else load_notebook_cells(file_path, filename)
+        split_docs = text_splitter.split_documents(documents)
+    section_number = 0
+    previous_section = None
+    for chunk_index, doc in enumerate(split_docs):
         doc.metadata["source"] = filename
+        # Chunk order and parent unit feed the retriever's chunk adjacency (neighbor-window retrieval):
+        # a PDF or notebook chunk's parent is the run of chunks under the same h1/h2/h3 headings,
+        # CSV rows are independent records
+        doc.metadata["chunk_index"] = chunk_index
+        if filename.endswith(".csv"):
+            doc.metadata["parent"] = f"{filename}#row{doc.metadata.get('row')}"
+            continue
+        section = " > ".join(doc.metadata[level] for level in SECTION_LEVELS if level in doc.metadata)
+        if section != previous_section:
+            # Numbered, so a heading that appears twice still opens two separate sections
+            section_number += 1
+            previous_section = section
+        doc.metadata["parent"] = f"{filename}#{section_number}:{section}" if section else filename
     
     print(f" -> {filename} split into {len(split_docs)} chunks.")
-    all_docs.extend(split_docs)
+    return split_docs
 '''
     total_chunks = len(texts)
     file_chunks = []
@@ -125,19 +147,24 @@ for filename in filenames:
             
     all_chunks.extend(file_chunks)
     '''
-print("\nStarting embedding and FAISS indexing...")
 
-# FAISS handles the embedding calls and storage efficiently
-vectorstore = FAISS.from_documents(
-    all_docs, 
-    embedding=embedding_client 
-)
 
-# You can save the vector store to disk (optional, but good practice)
-vectorstore.save_local("faiss_index_hackpsu")
+if __name__ == "__main__":
+    all_docs = []
+    for filename in filenames:
+        all_docs.extend(load_and_split(data_dir / filename, filename))
+    print("\nStarting embedding and FAISS indexing...")
+
+    # FAISS handles the embedding calls and storage efficiently
+    vectorstore = FAISS.from_documents(
+        all_docs, 
+        embedding=embedding_client 
+    )
+
+    # You can save the vector store to disk (optional, but good practice)
+    vectorstore.save_local("faiss_index_hackpsu")
 
-print(f"\n All documents loaded and indexed into 'faiss_index_hackpsu' with {len(all_docs)} total chunks.")
+    print(f"\n All documents loaded and indexed into 'faiss_index_hackpsu' with {len(all_docs)} total chunks.")
 
-# Save the documents with embeddings to a JSON file
-with open("PSU_notebooks_rag_ingested_chunks.json", "w") as f:
-    json.dump(all_chunks, f, indent=4)
+    # Export the chunks with their embeddings (compact column store; see PSU_embedding_store.py)
+    export_faiss(vectorstore, "PSU_notebooks_rag_ingested_chunks.store")
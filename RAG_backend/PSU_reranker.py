@@ -0,0 +1,214 @@
+import hashlib
+import os
+import pathlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+# --- CONFIGURATION ---
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+# "torch" (PyTorch eager, default) or "onnx" (int8 dynamically quantized ONNX Runtime)
+RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "torch").lower()
+# Intra-op threads for the ONNX Runtime session (0 lets ONNX Runtime decide)
+RERANKER_THREADS = int(os.getenv("RERANKER_THREADS", "0"))
+# Quantization target used by export_onnx_reranker(): "avx2", "avx512", "avx512_vnni" or "arm64"
+RERANKER_QUANTIZATION = os.getenv("RERANKER_QUANTIZATION", "avx2")
+ONNX_MODEL_DIR = pathlib.Path(os.path.dirname(__file__)) / "reranker_onnx"
+ONNX_FILE_NAME = f"onnx/model_qint8_{RERANKER_QUANTIZATION}.onnx"
+# Max number of cached (query, chunk) scores; 0 disables the cache
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "50000"))
+
+# Loaded once per process (previously a new CrossEncoder was built on every query)
+_encoders = {}
+
+# LRU of rerank scores keyed by (query hash, chunk id, model version)
+_score_cache = OrderedDict()
+_score_cache_lock = threading.Lock()
+_score_cache_index_version = None
+cache_stats = {"hits": 0, "misses": 0}
+
+
+def export_onnx_reranker(output_dir=ONNX_MODEL_DIR, quantization=RERANKER_QUANTIZATION):
+    """
+    Exports the reranker to ONNX and writes an int8 dynamically quantized copy
+    to <output_dir>/onnx/model_qint8_<quantization>.onnx.
+    """
+    from sentence_transformers import CrossEncoder, export_dynamic_quantized_onnx_model
+
+    output_dir = pathlib.Path(output_dir)
+    onnx_model = CrossEncoder(RERANKER_MODEL, backend="onnx")
+    onnx_model.save_pretrained(str(output_dir))
+    export_dynamic_quantized_onnx_model(
+        onnx_model,
+        quantization_config=quantization,
+        model_name_or_path=str(output_dir),
+    )
+    print(f"Quantized ONNX reranker written to {output_dir / f'onnx/model_qint8_{quantization}.onnx'}")
+    return output_dir
+
+
+def _load_onnx_encoder():
+    """Loads the quantized ONNX reranker, exporting it on first use."""
+    import onnxruntime
+    from sentence_transformers import CrossEncoder
+
+    if not (ONNX_MODEL_DIR / ONNX_FILE_NAME).exists():
+        export_onnx_reranker()
+
+    session_options = onnxruntime.SessionOptions()
+    session_options.intra_op_num_threads = RERANKER_THREADS
+    session_options.inter_op_num_threads = 1
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return CrossEncoder(
+        str(ONNX_MODEL_DIR),
+        backend="onnx",
+        model_kwargs={
+            "file_name": ONNX_FILE_NAME,
+            "provider": "CPUExecutionProvider",
+            "session_options": session_options,
+        },
+    )
+
+
+def get_encoder(backend=None):
+    """Returns the process-wide CrossEncoder for the selected backend."""
+    backend = (backend or RERANKER_BACKEND).lower()
+    if backend not in _encoders:
+        # Imported here: sentence_transformers pulls in torch, which dominates startup time
+        from sentence_transformers import CrossEncoder
+        if backend == "onnx":
+            _encoders[backend] = _load_onnx_encoder()
+        elif backend == "torch":
+            if RERANKER_THREADS:
+                import torch
+                torch.set_num_threads(RERANKER_THREADS)
+            _encoders[backend] = CrossEncoder(RERANKER_MODEL)
+        else:
+            raise ValueError(f"Unsupported reranker backend: {backend}")
+        print(f"Reranker loaded: {RERANKER_MODEL} ({backend})")
+    return _encoders[backend]
+
+
+def predict_scores(query, texts, backend=None):
+    """Scores (query, text) pairs with the selected reranker backend."""
+    if not texts:
+        return []
+    return get_encoder(backend).predict([(query, text) for text in texts])
+
+
+def model_version(backend=None):
+    """Identifies the scoring model so cached scores never cross backends or exports."""
+    backend = (backend or RERANKER_BACKEND).lower()
+    if backend == "onnx":
+        return f"{RERANKER_MODEL}:onnx:{RERANKER_QUANTIZATION}"
+    return f"{RERANKER_MODEL}:{backend}"
+
+
+def normalize_query(query):
+    """Lowercases, collapses whitespace and drops trailing punctuation so near-repeats share a key."""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip("?!. ")
+
+
+def query_hash(query):
+    """Stable hash of the normalized query."""
+    return hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+def clear_score_cache():
+    """Drops every cached rerank score."""
+    with _score_cache_lock:
+        _score_cache.clear()
+
+
+def cached_predict_scores(query, chunk_ids, texts, index_version=None, backend=None):
+    """
+    Scores (query, text) pairs, reusing cached scores for chunks this query has already seen.
+    Only the cache misses are batched to the model. The cache is emptied whenever
+    index_version changes, since chunk ids are not stable across re-ingestion.
+    """
+    global _score_cache_index_version
+
+    if not texts:
+        return []
+    if RERANK_CACHE_SIZE <= 0:
+        return list(predict_scores(query, texts, backend=backend))
+
+    q_hash = query_hash(query)
+    version = model_version(backend)
+    keys = [(q_hash, chunk_id, version) for chunk_id in chunk_ids]
+    scores = [None] * len(texts)
+
+    with _score_cache_lock:
+        if index_version != _score_cache_index_version:
+            _score_cache.clear()
+            _score_cache_index_version = index_version
+        for i, key in enumerate(keys):
+            if key in _score_cache:
+                _score_cache.move_to_end(key)
+                scores[i] = _score_cache[key]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        cache_stats["hits"] += len(texts) - len(missing)
+        cache_stats["misses"] += len(missing)
+
+    if missing:
+        new_scores = predict_scores(query, [texts[i] for i in missing], backend=backend)
+        with _score_cache_lock:
+            for i, score in zip(missing, new_scores):
+                scores[i] = float(score)
+                if index_version == _score_cache_index_version:
+                    _score_cache[keys[i]] = scores[i]
+            while len(_score_cache) > RERANK_CACHE_SIZE:
+                _score_cache.popitem(last=False)
+    return scores
+
+
+def compare_backends(queries, documents, top_k=5):
+    """
+    Validates that the ONNX backend ranks documents like the PyTorch backend.
+    Returns per-query top-k overlap plus total scoring time for each backend.
+    """
+    report = {"queries": [], "torch_seconds": 0.0, "onnx_seconds": 0.0}
+    texts = [doc["text"] for doc in documents]
+    for query in queries:
+        rankings = {}
+        for backend in ("torch", "onnx"):
+            start = time.perf_counter()
+            scores = predict_scores(query, texts, backend=backend)
+            report[f"{backend}_seconds"] += time.perf_counter() - start
+            order = sorted(range(len(texts)), key=lambda i: scores[i], reverse=True)
+            rankings[backend] = [documents[i]["id"] for i in order[:top_k]]
+        overlap = len(set(rankings["torch"]) & set(rankings["onnx"]))
+        report["queries"].append({
+            "query": query,
+            "top1_match": rankings["torch"][:1] == rankings["onnx"][:1],
+            "topk_overlap": overlap / max(len(rankings["torch"]), 1),
+            "torch": rankings["torch"],
+            "onnx": rankings["onnx"],
+        })
+    return report
+
+
+if __name__ == "__main__":
+    # Benchmark set: the fused candidate pool for typical student questions
+    import PSU_rag_documents_hybrid as hybrid_retriever
+
+    hybrid_retriever.initialize_rag()
+    benchmark_queries = [
+        "Who is the TA?",
+        "When is the final project due?",
+        "What code did he use for mini batch gradient descent?",
+        "What is the grading policy?",
+        "How do I compute the slope derivative?",
+    ]
+    for query in benchmark_queries:
+        candidates = hybrid_retriever.fused_candidates(query, 15)
+        result = compare_backends([query], candidates)
+        row = result["queries"][0]
+        print(f"{query!r}: top1_match={row['top1_match']} overlap@5={row['topk_overlap']:.2f} "
+              f"torch={result['torch_seconds'] * 1000:.1f}ms onnx={result['onnx_seconds'] * 1000:.1f}ms")
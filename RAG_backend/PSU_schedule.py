@@ -0,0 +1,211 @@
+import csv
+import os
+import pathlib
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+
+SCHEDULE_CSV = pathlib.Path(os.path.dirname(__file__)) / "data" / os.getenv(
+    "SCHEDULE_CSV", "2025_01_IA651CourseSchedule.csv"
+)
+
+# Words that mark a logistics/schedule question
+SCHEDULE_INTENT_WORDS = {
+    "when", "date", "day", "days", "due", "deadline", "schedule", "week", "teach", "taught",
+    "cover", "covered", "lecture", "quiz", "homework", "hw", "midterm", "exam", "break", "reading",
+}
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "to", "in", "on", "for", "is", "are", "was", "were", "did", "do",
+    "does", "he", "she", "they", "we", "i", "what", "which", "who", "how", "about", "with", "our",
+}
+MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",),
+         ("jun", "june"), ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"),
+         ("oct", "october"), ("nov", "november"), ("dec", "december")],
+        start=1,
+    )
+    for name in names
+}
+
+
+@dataclass
+class ScheduleEntry:
+    """One class meeting from the course schedule CSV."""
+    row: int
+    date: date
+    weekday: str
+    topic: str
+    lecture: bool
+    other: str
+    quiz_topic: str
+    homework_topic: str
+    homework_due: date | None
+    chapters: str
+    reading: list[str]
+
+    def to_text(self):
+        parts = [f"Date: {self.date.month}/{self.date.day}/{self.date.year} ({self.weekday})", f"Topic: {self.topic}"]
+        if not self.lecture:
+            parts.append("No lecture")
+        if self.quiz_topic:
+            parts.append(f"Quiz: {self.quiz_topic}")
+        if self.homework_topic:
+            due = f", due {self.homework_due.month}/{self.homework_due.day}/{self.homework_due.year}" if self.homework_due else ""
+            parts.append(f"Homework assigned: {self.homework_topic}{due}")
+        if self.chapters:
+            parts.append(f"Hands On Machine Learning chapter {self.chapters}")
+        if self.reading:
+            parts.append(f"Other reading: {', '.join(self.reading)}")
+        if self.other:
+            parts.append(f"Note: {self.other}")
+        return "; ".join(parts)
+
+
+# The typed table and its indexes (built by load_schedule)
+SCHEDULE = []
+ENTRIES_BY_DATE = {}  # date -> [entry positions]
+ENTRIES_BY_TERM = {}  # topic/quiz/homework term -> {entry positions}
+
+
+def _parse_date(value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    return datetime.strptime(value, "%m/%d/%Y").date()
+
+
+def _terms(text):
+    return {t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS and len(t) > 1}
+
+
+def load_schedule(path=SCHEDULE_CSV):
+    """Reads the schedule CSV into ScheduleEntry rows and builds the date and topic indexes."""
+    global SCHEDULE, ENTRIES_BY_DATE, ENTRIES_BY_TERM
+    entries, by_date, by_term = [], {}, {}
+    with open(path, encoding="utf8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        # "Other Reading" is followed by unnamed columns holding extra reading links
+        reading_start = header.index("Other Reading")
+        for row_number, values in enumerate(reader):
+            row = dict(zip(header[:reading_start], values))
+            meeting_date = _parse_date(row.get("Date"))
+            if meeting_date is None:
+                continue
+            reading = values[reading_start:]
+            entry = ScheduleEntry(
+                row=row_number,
+                date=meeting_date,
+                weekday=row.get("Weekday", "").strip(),
+                topic=row.get("Topic", "").strip(),
+                lecture=row.get("Lecture", "").strip().upper() == "Y",
+                other=row.get("Other", "").strip(),
+                quiz_topic=row.get("Quiz Topic", "").strip(),
+                homework_topic=row.get("Homework Topic", "").strip(),
+                homework_due=_parse_date(row.get("Homework Due Date")),
+                chapters=row.get("Hands On Machine Learning Chapters", "").strip(),
+                reading=[link.strip() for link in reading if link and link.strip()],
+            )
+            position = len(entries)
+            entries.append(entry)
+            by_date.setdefault(entry.date, []).append(position)
+            if entry.homework_due:
+                by_date.setdefault(entry.homework_due, []).append(position)
+            for term in _terms(f"{entry.topic} {entry.quiz_topic} {entry.homework_topic} {entry.other}"):
+                by_term.setdefault(term, set()).add(position)
+    SCHEDULE, ENTRIES_BY_DATE, ENTRIES_BY_TERM = entries, by_date, by_term
+    print(f"Schedule table loaded: {len(entries)} meetings, {len(by_term)} topic terms.")
+
+
+# 2/4 or 2/4/2025, and "Feb 4" / "February 4th": a month name only counts with a day number after it
+NUMERIC_DATE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")
+NAMED_DATE = re.compile(r"\b([A-Za-z]{3,9})\.?\s+(\d{1,2})(st|nd|rd|th)?\b(?!/)")
+
+
+def _named_month(name, ordinal):
+    """Month number for a month name, or None. "may" is also a verb: only "May" or "may 5th" count."""
+    month = MONTHS.get(name.lower())
+    if name.lower() == "may" and name != "May" and not ordinal:
+        return None
+    return month
+
+
+def _dates_in(query):
+    """
+    Dates mentioned as 2/4, 2/4/2025 or 'Feb 4'; the year defaults to the schedule's.
+    Returns (dates, query with the date expressions removed).
+    """
+    default_year = SCHEDULE[0].date.year if SCHEDULE else date.today().year
+    found = []
+    for month, day, year in NUMERIC_DATE.findall(query):
+        year = int(year) + 2000 if year and len(year) == 2 else int(year or default_year)
+        found.append((int(month), int(day), year))
+    rest = NUMERIC_DATE.sub(" ", query)
+
+    def named(match):
+        month = _named_month(match.group(1), match.group(3))
+        if month is None:
+            return match.group(0)
+        found.append((month, int(match.group(2)), default_year))
+        return " "
+
+    rest = NAMED_DATE.sub(named, rest)
+    dates = []
+    for month, day, year in found:
+        try:
+            dates.append(date(year, month, day))
+        except ValueError:
+            continue
+    return dates, rest
+
+
+def entry_document(entry):
+    """Formats a schedule entry like a retrieved chunk."""
+    return {
+        "id": f"{SCHEDULE_CSV.name}#row{entry.row}",
+        "text": entry.to_text(),
+        "metadata": {"source": SCHEDULE_CSV.name, "row": entry.row, "parent": f"{SCHEDULE_CSV.name}#row{entry.row}"},
+    }
+
+
+def schedule_search(query, limit):
+    """
+    Structured lookup for schedule questions. Returns (documents, confident):
+    confident means the hybrid search can be skipped: the question names a date on the schedule
+    and asks nothing else (no keyword beyond the date and the schedule words), or it is a schedule
+    question whose every keyword (other than the schedule words themselves) matches the returned
+    meeting's topic. Other matches come back with confident=False, to be boosted.
+    """
+    if not SCHEDULE:
+        return [], False
+    dates, rest = _dates_in(query)
+    positions = [p for d in dates for p in ENTRIES_BY_DATE.get(d, [])]
+    if positions:
+        # "what code did he use on 1/21" also asks about course content: search it too
+        only_date = not (_terms(rest) - SCHEDULE_INTENT_WORDS)
+        return [entry_document(SCHEDULE[p]) for p in dict.fromkeys(positions)][:limit], only_date
+
+    query_terms = _terms(query)
+    if not query_terms & SCHEDULE_INTENT_WORDS:
+        return [], False
+    # Intent words ("due", "midterm", "break") are also topic terms of many meetings, so they only
+    # rank meetings when the question has no other keyword, and never make the answer confident
+    topic_terms = query_terms - SCHEDULE_INTENT_WORDS
+    intent_only = not topic_terms
+    if intent_only:
+        topic_terms = {t for t in query_terms if t in ENTRIES_BY_TERM}
+    scores = {}
+    for term in topic_terms:
+        for position in ENTRIES_BY_TERM.get(term, ()):
+            scores[position] = scores.get(position, 0) + 1
+    if not scores:
+        return [], False
+    # Meetings whose own topic matches rank above ones where it is only the quiz/homework topic
+    ranked = sorted(
+        scores,
+        key=lambda p: (-scores[p], -len(topic_terms & _terms(SCHEDULE[p].topic)), SCHEDULE[p].date),
+    )
+    confident = not intent_only and scores[ranked[0]] == len(topic_terms)
+    return [entry_document(SCHEDULE[p]) for p in ranked[:limit]], confident
@@ -0,0 +1,173 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import defaultdict, deque
+
+# --- CONFIGURATION ---
+# Requests running the pipeline at once (rerank is CPU-bound, generation is quota-bound)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "8"))
+# Requests allowed to wait for a slot before new ones are shed with 429
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "32"))
+# Running + queued requests per user
+PER_USER_CONCURRENCY = int(os.getenv("PER_USER_CONCURRENCY", "2"))
+# Longest a request may wait in the queue before it is shed
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("QUEUE_TIMEOUT_SECONDS", "10"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "2"))
+
+# Lower value = served first. Debug traffic may only use a quarter of the queue.
+LANE_PRIORITY = {"interactive": 0, "standard": 1, "debug": 2}
+LANE_QUEUE_SHARE = {"interactive": 1.0, "standard": 1.0, "debug": 0.25}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; maps to HTTP 429 with Retry-After."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """
+    One admitted (or queued) request. A ticket without a slot belongs to a request that joins
+    work already running: it only counts against its user's limit.
+    """
+
+    def __init__(self, user_key, lane, holds_slot=True):
+        self.user_key = user_key
+        self.lane = lane
+        self.holds_slot = holds_slot
+        self.enqueued_at = time.perf_counter()
+        self.queue_seconds = 0.0
+        self.released = False
+
+
+class AdmissionController:
+    """
+    Bounded priority scheduler for the RAG endpoints: at most max_concurrent requests run,
+    up to max_queue wait (interactive before standard before debug), each user is capped
+    at per_user_limit running + queued requests, and everything else is rejected immediately.
+    """
+
+    def __init__(
+        self,
+        max_concurrent=MAX_CONCURRENT_REQUESTS,
+        max_queue=MAX_QUEUED_REQUESTS,
+        per_user_limit=PER_USER_CONCURRENCY,
+        queue_timeout=QUEUE_TIMEOUT_SECONDS,
+        retry_after=RETRY_AFTER_SECONDS,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.per_user_limit = per_user_limit
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.queued = 0
+        self._waiters = []  # heap of (priority, seq, ticket, future)
+        self._seq = itertools.count()
+        self._per_user = defaultdict(int)
+        self._queue_waits = deque(maxlen=1000)
+        self.stats = {
+            "admitted": 0,
+            "joined": 0,
+            "rejected_user_limit": 0,
+            "rejected_queue_full": 0,
+            "rejected_queue_timeout": 0,
+        }
+
+    def _reject(self, reason):
+        self.stats[f"rejected_{reason}"] += 1
+        raise AdmissionRejected(reason, self.retry_after)
+
+    def _lane_queue_limit(self, lane):
+        return int(self.max_queue * LANE_QUEUE_SHARE[lane])
+
+    def _grant(self, ticket):
+        self.active += 1
+        ticket.queue_seconds = time.perf_counter() - ticket.enqueued_at
+        self._queue_waits.append(ticket.queue_seconds)
+        self.stats["admitted"] += 1
+
+    def _user_done(self, user_key):
+        self._per_user[user_key] -= 1
+        if self._per_user[user_key] <= 0:
+            del self._per_user[user_key]
+
+    async def acquire(self, user_key, lane="standard", needs_slot=True):
+        """
+        Waits for a slot and returns a Ticket; raises AdmissionRejected when shedding.
+        needs_slot=False (joining an in-flight computation) only applies the per-user limit.
+        """
+        if self._per_user[user_key] >= self.per_user_limit:
+            self._reject("user_limit")
+        ticket = Ticket(user_key, lane, holds_slot=needs_slot)
+        self._per_user[user_key] += 1
+
+        if not needs_slot:
+            self.stats["joined"] += 1
+            return ticket
+
+        if self.active < self.max_concurrent and not self.queued:
+            self._grant(ticket)
+            return ticket
+        if self.queued >= self._lane_queue_limit(lane):
+            self._user_done(user_key)
+            self._reject("queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (LANE_PRIORITY[lane], next(self._seq), ticket, future))
+        self.queued += 1
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.queued -= 1
+            self._user_done(user_key)
+            self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(ticket)
+            else:
+                self.queued -= 1
+                self._user_done(user_key)
+            raise
+        return ticket
+
+    def release(self, ticket):
+        """Frees the ticket's slot and hands it to the highest-priority waiter."""
+        if ticket.released:
+            return
+        ticket.released = True
+        self._user_done(ticket.user_key)
+        if not ticket.holds_slot:
+            return
+        self.active -= 1
+        while self._waiters and self.active < self.max_concurrent:
+            _, _, waiting_ticket, future = heapq.heappop(self._waiters)
+            if future.done():
+                # Timed out or cancelled while queued; already accounted for
+                continue
+            self.queued -= 1
+            self._grant(waiting_ticket)
+            future.set_result(True)
+
+    def snapshot(self):
+        """Current load and queue-time percentiles for /health."""
+        waits = sorted(self._queue_waits)
+
+        def percentile(p):
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 1)
+
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_wait_ms": {"p50": percentile(0.50), "p99": percentile(0.99), "max": percentile(1.0)},
+            **self.stats,
+        }
@@ -0,0 +1,216 @@
+import gc
+import os
+import signal
+import threading
+import time
+
+# Load indexes (and optionally the reranker) in the gunicorn master so forked workers share them
+PRELOAD_RERANKER = os.getenv("PRELOAD_RERANKER", "0") == "1"
+# app.py warns at startup when importing it takes longer than this
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "2"))
+
+# Per-component load status reported by /health/ready (copied into workers on fork)
+COMPONENTS = ("faiss", "keyword", "schedule", "reranker")
+READINESS = {name: {"ready": False, "seconds": None, "error": None} for name in COMPONENTS}
+_loading_lock = threading.Lock()
+
+# Index versions published by the ingestion daemon: INDEX_ROOT/<version>/ plus a CURRENT pointer file
+INDEX_ROOT = os.getenv("INDEX_ROOT", "indexes")
+CURRENT_INDEX_FILE = os.path.join(INDEX_ROOT, "CURRENT")
+DEFAULT_FAISS_PATH = "faiss_index_hackpsu"
+# How often the gunicorn master (or a single uvicorn process) checks the pointer for a newly
+# published index (0 disables the check)
+INDEX_POLL_SECONDS = float(os.getenv("INDEX_POLL_SECONDS", "10"))
+# Set by preload_shared_indexes: the gunicorn master owns reloads, forked workers never reload
+PRELOADED = False
+
+
+def _load_component(name, loader):
+    if READINESS[name]["ready"]:
+        return True
+    start = time.perf_counter()
+    try:
+        loader()
+    except Exception as e:
+        READINESS[name] = {"ready": False, "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+        print(f"FATAL ERROR loading {name}: {e}")
+        return False
+    READINESS[name] = {"ready": True, "seconds": round(time.perf_counter() - start, 3), "error": None}
+    print(f"  - {name}: ready in {READINESS[name]['seconds']}s")
+    return True
+
+
+def load_components(include_reranker=True):
+    """Loads FAISS, the LUNR keyword index built from its docstore, the schedule table, then the reranker."""
+    import PSU_rag_documents_hybrid as hybrid_retriever
+    import PSU_reranker as reranker
+    import PSU_schedule as schedule
+
+    with _loading_lock:
+        if _load_component("faiss", hybrid_retriever.initialize_rag_faiss):
+            _load_component("keyword", hybrid_retriever.initialize_rag_lunr)
+        _load_component("schedule", schedule.load_schedule)
+        if include_reranker:
+            _load_component("reranker", reranker.get_encoder)
+    if is_ready():
+        state = hybrid_retriever.STATE
+        doc_count = len(state.documents) if state and state.documents else 0
+        print(f"✓ Hybrid RAG ready ({doc_count} documents, model {hybrid_retriever.GENERATION_MODEL})")
+
+
+def start_background_loading():
+    """
+    Loads whatever is not loaded yet without blocking startup. A single process without a
+    preloading master also watches for new index versions itself.
+    """
+    threading.Thread(target=load_components, name="rag-loader", daemon=True).start()
+    if INDEX_POLL_SECONDS > 0 and not PRELOADED:
+        threading.Thread(target=watch_index_pointer, name="rag-index-watcher", daemon=True).start()
+
+
+def current_index_path():
+    """The FAISS directory named by the CURRENT pointer, or the legacy one-shot index when nothing was published."""
+    try:
+        with open(CURRENT_INDEX_FILE, encoding="utf-8") as f:
+            version = f.read().strip()
+    except OSError:
+        return DEFAULT_FAISS_PATH
+    path = os.path.join(INDEX_ROOT, version)
+    return path if version and os.path.isdir(path) else DEFAULT_FAISS_PATH
+
+
+def reload_index_if_changed():
+    """
+    Swaps in the published index when the pointer moved; returns True when it did.
+    The new version is built completely before it replaces the one in use (hybrid.load_index).
+    """
+    import PSU_rag_documents_hybrid as hybrid_retriever
+
+    path = current_index_path()
+    if not READINESS["keyword"]["ready"] or path == loaded_index_path():
+        return False
+    with _loading_lock:
+        start = time.perf_counter()
+        try:
+            hybrid_retriever.load_index(path)
+        except Exception as e:
+            print(f"ERROR loading published index {path}: {e}")
+            return False
+    print(f"Switched to index {path} in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def loaded_index_path():
+    import PSU_rag_documents_hybrid as hybrid_retriever
+
+    state = hybrid_retriever.STATE
+    return state.faiss_path if state else None
+
+
+def watch_index_pointer(on_change=reload_index_if_changed):
+    """Polls the CURRENT pointer and calls on_change whenever it names a version not yet handled."""
+    handled = None
+    while True:
+        time.sleep(INDEX_POLL_SECONDS)
+        path = current_index_path()
+        if path != loaded_index_path() and path != handled:
+            handled = path
+            on_change()
+
+
+def start_master_index_watcher():
+    """
+    Gunicorn master only: when a new version is published, sends the master a HUP.
+    Gunicorn then runs the on_reload hook (reload_shared_indexes) before forking the
+    replacement workers, and retires the old ones gracefully once their requests finish.
+    """
+    if INDEX_POLL_SECONDS <= 0:
+        return
+    master_pid = os.getpid()
+    threading.Thread(
+        target=watch_index_pointer,
+        args=(lambda: os.kill(master_pid, signal.SIGHUP),),
+        name="rag-index-watcher",
+        daemon=True,
+    ).start()
+
+
+def reload_shared_indexes():
+    """Gunicorn on_reload hook: loads the published version in the master and re-freezes the GC."""
+    gc.unfreeze()
+    reload_index_if_changed()
+    gc.collect()
+    gc.freeze()
+
+
+def is_ready():
+    return all(status["ready"] for status in READINESS.values())
+
+
+def preload_shared_indexes():
+    """
+    Loads FAISS, the docstore and the Lunr index once in the pre-fork master, then freezes
+    the GC so collections in the workers do not touch (and copy) the shared pages.
+    """
+    # Only safe to preload the reranker when its runtime does not start a thread pool before fork (see readme)
+    global PRELOADED
+    load_components(include_reranker=PRELOAD_RERANKER)
+    PRELOADED = True
+    gc.collect()
+    gc.freeze()
+    print(f"Shared indexes preloaded in master (pid {os.getpid()}), {gc.get_freeze_count()} objects frozen.")
+
+
+def _read_memory(pid):
+    """RSS / PSS / shared / private (kB) of one process from /proc."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[1].isdigit():
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        "pid": pid,
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def memory_report(master_pid=None):
+    """
+    Per-process memory of the serving master and its workers. PSS splits shared pages
+    between the processes mapping them, so total_pss_kb is the real footprint of the node.
+    """
+    master_pid = master_pid or os.getppid()
+    processes = [_read_memory(pid) for pid in [master_pid] + _children(master_pid)]
+    processes = [p for p in processes if p is not None]
+    return {
+        "master_pid": master_pid,
+        "workers": len(processes) - 1,
+        "processes": processes,
+        "total_rss_kb": sum(p["rss_kb"] for p in processes),
+        "total_pss_kb": sum(p["pss_kb"] for p in processes),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    report = memory_report(int(sys.argv[1]) if len(sys.argv) > 1 else os.getpid())
+    for process in report["processes"]:
+        print(f"pid {process['pid']}: rss={process['rss_kb'] / 1024:.1f}MB pss={process['pss_kb'] / 1024:.1f}MB "
+              f"shared={process['shared_kb'] / 1024:.1f}MB private={process['private_kb'] / 1024:.1f}MB")
+    print(f"total rss={report['total_rss_kb'] / 1024:.1f}MB pss={report['total_pss_kb'] / 1024:.1f}MB")
@@ -0,0 +1,158 @@
+import asyncio
+import os
+
+from PSU_reranker import normalize_query
+
+# Longest a subscriber waits for a frame before checking whether its client went away
+# (same default as the SSE heartbeat)
+DISCONNECT_CHECK_SECONDS = float(os.getenv("DISCONNECT_CHECK_SECONDS", "15"))
+
+
+def flight_key(kind, query, *options):
+    """Requests of the same kind and options whose normalized questions match share one computation."""
+    return (kind, normalize_query(query), *options)
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: the first caller for a key runs the coroutine,
+    later callers await the same task until it finishes.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.stats = {"executions": 0, "coalesced": 0}
+
+    def is_inflight(self, key):
+        return key in self._inflight
+
+    async def do(self, key, coroutine_factory):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coroutine_factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.stats["executions"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        # Shielded so one caller going away does not cancel the others
+        return await asyncio.shield(task)
+
+
+class StreamFanout:
+    """
+    Runs one producer stream and replays its frames to every subscriber, including
+    subscribers that join mid-stream. The producer is cancelled once nobody is reading.
+    """
+
+    def __init__(self, producer):
+        self.frames = []
+        self.finished = False
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._run(producer))
+
+    def _publish(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _run(self, producer):
+        try:
+            async for frame in producer:
+                self.frames.append(frame)
+                self._publish()
+        finally:
+            self.finished = True
+            self._publish()
+
+    def subscribe(self, http_request=None):
+        """
+        Counts a subscriber now, not on its first read, so a client that disconnects before
+        iterating still releases its claim on the producer (through aclose).
+        """
+        self.subscribers += 1
+        return Subscription(self, http_request)
+
+    def _release(self):
+        self.subscribers -= 1
+        if self.subscribers == 0 and not self.finished:
+            self.task.cancel()
+
+    async def _frames(self, http_request):
+        """
+        Yields every frame of the shared stream; stops early if this client disconnects,
+        noticed on the next frame or after DISCONNECT_CHECK_SECONDS without one.
+        """
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.frames):
+                yield self.frames[index]
+                index += 1
+            if self.finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), DISCONNECT_CHECK_SECONDS)
+            except asyncio.TimeoutError:
+                # No frame yet (the model is still thinking): check the client anyway
+                pass
+            if http_request is not None and await http_request.is_disconnected():
+                return
+
+
+class Subscription:
+    """
+    One subscriber's async iterator over a StreamFanout. Releases the subscriber exactly once,
+    when iteration ends or on aclose, whether or not it was ever iterated.
+    """
+
+    def __init__(self, fanout, http_request=None):
+        self.fanout = fanout
+        self.released = False
+        self._frames = fanout._frames(http_request)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._frames.__anext__()
+        except BaseException:
+            self._release()
+            raise
+
+    async def aclose(self):
+        try:
+            await self._frames.aclose()
+        finally:
+            self._release()
+
+    def _release(self):
+        if not self.released:
+            self.released = True
+            self.fanout._release()
+
+
+class StreamFlights:
+    """Single-flight registry for streaming answers: one StreamFanout per in-flight key."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.stats = {"executions": 0, "coalesced": 0}
+
+    def is_inflight(self, key):
+        fanout = self._inflight.get(key)
+        return fanout is not None and not fanout.finished
+
+    def subscribe(self, key, producer_factory, http_request=None):
+        fanout = self._inflight.get(key)
+        if fanout is None or fanout.finished:
+            fanout = StreamFanout(producer_factory())
+            self._inflight[key] = fanout
+            fanout.task.add_done_callback(
+                lambda _: self._inflight.pop(key, None) if self._inflight.get(key) is fanout else None
+            )
+            self.stats["executions"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        return fanout.subscribe(http_request)
@@ -1,23 +1,31 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from fastapi.responses import StreamingResponse
 from fastapi import BackgroundTasks # Optional, but good practice
 import json
 import PSU_rag_documents_hybrid as hybrid_retriever  # Import to ensure RAG components are available
-from PSU_rag_documents_hybrid import  initialize_rag, hybrid_search, generation_client
+from PSU_rag_documents_hybrid import hybrid_search, generation_client
+import PSU_reranker as reranker
+import PSU_serving as serving
+from PSU_context_builder import build_context, count_tokens
+from PSU_single_flight import SingleFlight, StreamFlights, flight_key
+from PSU_scheduler import AdmissionController, AdmissionRejected
+from PSU_serving import memory_report
 
 
 # --- LangChain Imports ---
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-# from langchain.retrievers import EnsembleRetriever # 🌟 NEW IMPORT for combining search methods
-from langchain_community.retrievers import BM25Retriever # 🌟 NEW IMPORT for keyword search
-from langchain_community.document_loaders import TextLoader # Needed for BM25 (or another loader if you use a full file)
+# Only the commented-out simple vector search path below uses LangChain chains/retrievers.
+# Import ChatOpenAI, OpenAIEmbeddings, FAISS, ChatPromptTemplate, RunnablePassthrough and
+# StrOutputParser there if you re-enable it; importing them here costs seconds at startup.
+# Heavy runtime dependencies (FAISS, lunr, sentence_transformers) are imported lazily by the loaders.
 
 load_dotenv()
 app = FastAPI(title="HackPSU RAG API")
@@ -25,9 +33,31 @@ app = FastAPI(title="HackPSU RAG API")
 RAG_CHAIN = None
 RETRIEVER = None
 
+# Seconds without a token before the SSE stream sends a keep-alive comment
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+NO_RESULTS_MESSAGE = "I couldn't find any relevant information in the course materials for your query."
+# Coalesce identical in-flight questions (one pipeline run per burst)
+ANSWER_FLIGHTS = SingleFlight()
+STREAM_FLIGHTS = StreamFlights()
+# Bounded, prioritized admission for everything that runs the pipeline
+ADMISSION = AdmissionController()
+# Streaming counters reported by /health
+STREAM_METRICS = {
+    "completed_streams": 0,
+    "completed_tokens": 0,
+    "cancelled_streams": 0,
+    "failed_streams": 0,
+    "estimated_tokens_saved": 0,
+}
+
 class QueryRequest(BaseModel):
     """Schema for the incoming user question."""
     question: str
+    user_id: str | None = None # Used for per-user concurrency limits (falls back to client IP)
+    code_only: bool = False # Search only notebook code cells ("what code did he use for ...")
+
+    def cell_type(self) -> str | None:
+        return "code" if self.code_only else None
 
 class RAGResponse(BaseModel):
     """Schema for the outgoing RAG answer."""
@@ -46,21 +76,28 @@ def stream_rag_answer(query: str, retriever, rag_chain):
         # LangChain stream yields the final string chunk by chunk
         yield chunk
 '''
-def stream_rag_answer(query: str):
+def stream_rag_answer(query: str, stream_state: dict = None, cell_type: str | None = None):
     """
     Performs the custom hybrid search and streams the LLM response.
     This replaces the LangChain chain.
+    If stream_state is given, the upstream stream is published under "response_stream"
+    and generation stops once "cancelled" is set (see stream_until_disconnect); "failed"
+    is set when the answer ends in an error message.
     """
+    if stream_state is None:
+        stream_state = {"cancelled": False, "failed": False, "response_stream": None}
     
     # 1. CUSTOM HYBRID RETRIEVAL
     # Use your high-quality hybrid search function directly
     
+    response_stream = None
     try:
-        retrieved_documents = hybrid_search(query, limit=5)
+        retrieved_documents = hybrid_search(query, limit=5, cell_type=cell_type)
         if not retrieved_documents:
             yield f"{{'sources': []}} [METADATA_END] I couldn't find any relevant information in the course materials for your query."
             return
-        context = "\n".join([f"{doc['id']}: {doc['text']}" for doc in retrieved_documents[0:5]])
+        context, context_stats = build_context(retrieved_documents)
+        print(f"Context: {context_stats['context_tokens']} tokens ({context_stats['tokens_saved']} saved)")
         unique_sources = sorted(list(set(doc["metadata"]["source"] for doc in retrieved_documents)))
         response_stream = generation_client.chat.completions.create(
             model=hybrid_retriever.GENERATION_MODEL,
@@ -71,37 +108,219 @@ def stream_rag_answer(query: str):
             ],
             stream=True, # Enable streaming!
         )
+        stream_state["response_stream"] = response_stream
         yield f"{{'sources': {json.dumps(unique_sources)}}}" + "[METADATA_END]"
 
         # Yield the answer chunks
         for chunk in response_stream:
+            if stream_state["cancelled"]:
+                break
             content = chunk.choices[0].delta.content
             if content:
                 yield content
     except Exception as e:
-        yield f"{{'sources': []}} [METADATA_END] Error processing your query: {str(e)}"
+        if not stream_state["cancelled"]:
+            stream_state["failed"] = True
+            yield f"{{'sources': []}} [METADATA_END] Error processing your query: {str(e)}"
+    finally:
+        if response_stream is not None:
+            response_stream.close()
 
-@app.on_event("startup")
-def load_rag_components():
-    """Initializes the custom RAG logic and models into memory."""
-    global RAG_CHAIN
-    
+
+def record_stream_end(streamed_text: str, status: str):
+    """
+    Updates STREAM_METRICS when a generation stream ends with status "completed", "cancelled"
+    or "error". Tokens saved by a cancellation are estimated as the average completed answer
+    length minus what was already streamed; failed streams count toward neither.
+    """
+    if status == "error":
+        STREAM_METRICS["failed_streams"] += 1
+        return
+    streamed_tokens = count_tokens(streamed_text)
+    if status == "completed":
+        STREAM_METRICS["completed_streams"] += 1
+        STREAM_METRICS["completed_tokens"] += streamed_tokens
+        return
+    STREAM_METRICS["cancelled_streams"] += 1
+    if STREAM_METRICS["completed_streams"]:
+        average_tokens = STREAM_METRICS["completed_tokens"] / STREAM_METRICS["completed_streams"]
+        STREAM_METRICS["estimated_tokens_saved"] += max(0, round(average_tokens - streamed_tokens))
+    print(f"Stream cancelled by client after {streamed_tokens} tokens.")
+
+
+async def stream_until_disconnect(query: str, http_request: Request = None, cell_type: str | None = None):
+    """
+    Runs stream_rag_answer() in the threadpool and stops it as soon as the client disconnects
+    (or the task is cancelled because every coalesced listener left), closing the upstream
+    stream so the worker thread is released and no more tokens are billed.
+    """
+    stream_state = {"cancelled": False, "failed": False, "response_stream": None}
+    answer_chunks = []
+    completed = False
+    answer_stream = stream_rag_answer(query, stream_state, cell_type)
     try:
-        # Load all documents, create LUNR index, and initialize the models
-        initialize_rag()
-        print(f"Hybrid RAG Logic and Indexes loaded successfully! Model: {hybrid_retriever.GENERATION_MODEL}")
-        if hybrid_retriever.index:
-            doc_count = len(hybrid_retriever.documents) if hybrid_retriever.documents else 0
-            print(f"✓ Hybrid RAG initialized successfully!")
-            print(f"  - FAISS Vector Index: Ready")
-            print(f"  - LUNR Full-Text Index: Ready ({doc_count} documents)")
-            print(f"  - Generation Model: {hybrid_retriever.GENERATION_MODEL}")
-            print(f"  - Supported Sources: PDF, IPYNB, CSV")
+        async for chunk in iterate_in_threadpool(answer_stream):
+            if http_request is not None and await http_request.is_disconnected():
+                break
+            answer_chunks.append(chunk)
+            yield chunk
         else:
-            print("⚠ Warning: RAG index not initialized properly")
+            completed = True
+    finally:
+        if not completed:
+            stream_state["cancelled"] = True
+            if stream_state["response_stream"] is not None:
+                # Unblocks the worker thread if it is waiting on the next upstream chunk
+                stream_state["response_stream"].close()
+            try:
+                answer_stream.close()
+            except ValueError:
+                # Still running in the worker thread; it stops at the "cancelled" check
+                pass
+        if stream_state["response_stream"] is not None:
+            # The first chunk is the [METADATA_END] header, not model output
+            status = "error" if stream_state["failed"] else "completed" if completed else "cancelled"
+            record_stream_end("".join(answer_chunks[1:]), status)
+
+async def admit(http_request: Request, user_id: str | None, lane: str, needs_slot: bool = True):
+    """
+    Takes a scheduler slot for this request or sheds it with 429 + Retry-After.
+    Requests joining an in-flight computation pass needs_slot=False: no slot, same per-user limit.
+    """
+    if not serving.is_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="RAG components are still loading, please retry.",
+            headers={"Retry-After": str(ADMISSION.retry_after)},
+        )
+    user_key = user_id or f"ip:{http_request.client.host if http_request.client else 'unknown'}"
+    try:
+        return await ADMISSION.acquire(user_key, lane, needs_slot)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server busy ({e.reason}), please retry.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that releases its admission ticket when the response is over, however
+    it ends: finished, failed, or the client gone before the body was ever iterated.
+    """
+
+    def __init__(self, content, ticket, **kwargs):
+        super().__init__(content, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            ADMISSION.release(self.ticket)
+            await self.body_iterator.aclose()
+
+
+async def admitted_stream(http_request: Request, user_id: str | None, key, producer_factory, **response_kwargs):
+    """
+    Streams the (coalesced) answer for key. Joining a stream that is already running costs no
+    pipeline capacity, so it takes no slot, but it still counts against the user's limit.
+    """
+    joining = STREAM_FLIGHTS.is_inflight(key)
+    ticket = await admit(http_request, user_id, "interactive", needs_slot=not joining)
+    return AdmittedStreamingResponse(
+        STREAM_FLIGHTS.subscribe(key, producer_factory, http_request), ticket, **response_kwargs
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Formats one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_rag_events(query: str, http_request: Request = None, cell_type: str | None = None):
+    """
+    Hybrid search + streamed answer as typed SSE frames:
+    sources (sent before generation starts), token, usage, error and done.
+    Sends a ping comment while the model is silent and closes the upstream
+    generation as soon as the client goes away or the task is cancelled.
+    """
+    response_stream = None
+    next_chunk = None
+    answer_chunks = []
+    status = "cancelled"
+    try:
+        retrieved_documents = await run_in_threadpool(hybrid_search, query, 5, cell_type)
+        unique_sources = sorted(set(
+            doc["metadata"]["source"]
+            for doc in retrieved_documents
+            if "source" in doc.get("metadata", {})
+        ))
+        yield sse_event("sources", {"sources": unique_sources})
+        if not retrieved_documents:
+            yield sse_event("token", {"text": NO_RESULTS_MESSAGE})
+            yield sse_event("done", {})
+            return
+
+        context, context_stats = build_context(retrieved_documents)
+        response_stream = await hybrid_retriever.async_generation_client.chat.completions.create(
+            model=hybrid_retriever.GENERATION_MODEL,
+            temperature=0.3,
+            messages=[
+                {"role": "system", "content": hybrid_retriever.SYSTEM_MESSAGE},
+                {"role": "user", "content": f"{query}\nSources: {context}"},
+            ],
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        chunks = response_stream.__aiter__()
+        next_chunk = asyncio.ensure_future(chunks.__anext__())
+        while True:
+            done, _ = await asyncio.wait({next_chunk}, timeout=SSE_HEARTBEAT_SECONDS)
+            if http_request is not None and await http_request.is_disconnected():
+                print("SSE client disconnected; cancelling generation.")
+                return
+            if not done:
+                yield ": ping\n\n"
+                continue
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            next_chunk = asyncio.ensure_future(chunks.__anext__())
+
+            if chunk.choices and chunk.choices[0].delta.content:
+                answer_chunks.append(chunk.choices[0].delta.content)
+                yield sse_event("token", {"text": chunk.choices[0].delta.content})
+            if getattr(chunk, "usage", None):
+                yield sse_event("usage", {
+                    "prompt_tokens": chunk.usage.prompt_tokens,
+                    "completion_tokens": chunk.usage.completion_tokens,
+                    "context_tokens_saved": context_stats["tokens_saved"],
+                })
+        status = "completed"
+        yield sse_event("done", {})
     except Exception as e:
-        print(f"FATAL ERROR during RAG initialization: {e}")
-        # In a real app, you might crash the app, but here, log the error.
+        status = "error"
+        yield sse_event("error", {"message": f"Error processing your query: {str(e)}"})
+        yield sse_event("done", {})
+    finally:
+        if next_chunk is not None and not next_chunk.done():
+            next_chunk.cancel()
+        if response_stream is not None:
+            await response_stream.close()
+            record_stream_end("".join(answer_chunks), status)
+
+@app.on_event("startup")
+def load_rag_components():
+    """
+    Starts loading the FAISS index, LUNR index and reranker in a background thread so the
+    process passes liveness immediately; /health/ready turns green once they are loaded.
+    Components already loaded in the gunicorn master (see PSU_serving) are skipped.
+    """
+    serving.start_background_loading()
 
           
 '''
@@ -204,29 +423,63 @@ async def query_rag_endpoint(request: QueryRequest):
 '''
 
 @app.post("/query-rag-stream", tags=["RAG"])
-async def query_rag_stream_endpoint(request: QueryRequest):
+async def query_rag_stream_endpoint(request: QueryRequest, http_request: Request):
     """
     Accepts a user question and streams the RAG-augmented answer chunk by chunk
     using custom Hybrid Search logic (Vector + Full-Text + RRF).
+    Generation is cancelled upstream if the client disconnects mid-answer.
     """
-    # The StreamingResponse handles the asynchronous output from the generator
-    return StreamingResponse(
-        stream_rag_answer(request.question), 
-        media_type="text/plain" 
+    # The StreamingResponse handles the asynchronous output from the generator.
+    # Identical in-flight questions attach to the same upstream stream.
+    return await admitted_stream(
+        http_request,
+        request.user_id,
+        flight_key("stream", request.question, request.code_only),
+        lambda: stream_until_disconnect(request.question, cell_type=request.cell_type()),
+        media_type="text/plain",
+    )
+
+
+@app.post("/query-rag-sse", tags=["RAG"])
+async def query_rag_sse_endpoint(request: QueryRequest, http_request: Request):
+    """
+    Streams the hybrid-search answer as Server-Sent Events (text/event-stream).
+    Events: sources, token, usage, error, done; ': ping' comments keep idle connections open.
+    """
+    return await admitted_stream(
+        http_request,
+        request.user_id,
+        flight_key("sse", request.question, request.code_only),
+        lambda: stream_rag_events(request.question, cell_type=request.cell_type()),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so every token is flushed as it arrives
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @app.post("/query-rag", response_model=RAGResponse, tags=["RAG"])
-async def query_rag_endpoint(request: QueryRequest):
+async def query_rag_endpoint(request: QueryRequest, http_request: Request):
     """
     Non-streaming endpoint that returns complete answer with sources.
     Uses hybrid search for better relevance across all document types.
+    Identical questions already in progress share a single pipeline run.
     """
+    key = flight_key("answer", request.question, request.code_only)
+    # Joining a run in progress takes no slot but still counts against the user's limit
+    ticket = await admit(http_request, request.user_id, "standard", needs_slot=not ANSWER_FLIGHTS.is_inflight(key))
+    try:
+        return await ANSWER_FLIGHTS.do(
+            key, lambda: run_in_threadpool(answer_query, request.question, request.cell_type())
+        )
+    finally:
+        ADMISSION.release(ticket)
+
+
+def answer_query(query: str, cell_type: str | None = None) -> RAGResponse:
+    """Runs hybrid search + generation for one question (blocking; called from the threadpool)."""
     try:
-        query = request.question
-        
         # Perform hybrid search
-        retrieved_documents = hybrid_search(query, limit=5)
+        retrieved_documents = hybrid_search(query, limit=5, cell_type=cell_type)
         
         if not retrieved_documents:
             return RAGResponse(
@@ -234,11 +487,9 @@ async def query_rag_endpoint(request: QueryRequest):
                 sources=[]
             )
         
-        # Build context
-        context = "\n".join([
-            f"{doc['id']}: {doc['text']}" 
-            for doc in retrieved_documents[0:5]
-        ])
+        # Build context (overlapping chunks merged, packed to the token budget)
+        context, context_stats = build_context(retrieved_documents)
+        print(f"Context: {context_stats['context_tokens']} tokens ({context_stats['tokens_saved']} saved)")
         
         # Get answer from LLM
         response = generation_client.chat.completions.create(
@@ -307,16 +558,43 @@ async def query_rag_endpoint(request: QueryRequest):
 def health_check():
     """Checks if the API is running and the RAG is loaded."""
     # status = "OK" if RAG_CHAIN else "UNINITIALIZED"
-    status = "OK" if hybrid_retriever.index else "UNINITIALIZED"
-    doc_count = len(hybrid_retriever.documents) if hybrid_retriever.documents else 0
+    state = hybrid_retriever.STATE
+    status = "OK" if state and state.index else "UNINITIALIZED"
+    doc_count = len(state.documents) if state and state.documents else 0
     return {
         "status": status,
         "model": hybrid_retriever.GENERATION_MODEL,
         "indexed_documents": doc_count,
         "search_type": "Hybrid (Vector + Full-Text + RRF + Rerank)",
+        "index_version": state.version if state else None,
+        "rerank_cache": reranker.cache_stats,
+        "streaming": STREAM_METRICS,
+        "single_flight": {"answer": ANSWER_FLIGHTS.stats, "stream": STREAM_FLIGHTS.stats},
+        "scheduler": ADMISSION.snapshot(),
         "supported_sources": ["PDF", "IPYNB", "CSV"]
     }
 
+@app.get("/health/live", tags=["System"])
+def liveness_check():
+    """The process is up and serving HTTP (indexes may still be loading)."""
+    return {"status": "OK"}
+
+
+@app.get("/health/ready", tags=["System"])
+def readiness_check():
+    """Per-component readiness and load durations; 503 until every component is loaded."""
+    ready = serving.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "READY" if ready else "LOADING", "components": serving.READINESS},
+    )
+
+
+@app.get("/health/memory", tags=["System"])
+def memory_health_check():
+    """Per-worker RSS/PSS of the serving processes (shared index pages are counted once in PSS)."""
+    return memory_report()
+
 # --- DEBUG ENDPOINT: SHOWS RAW CHUNKS ---
 @app.get("/debug-chunks")
 async def get_raw_chunks(query: str):
@@ -349,13 +627,17 @@ async def get_raw_chunks(query: str):
 
 
 @app.get("/debug-hybrid-search", tags=["Debug"])
-async def debug_hybrid_search(query: str):
+async def debug_hybrid_search(
+    query: str, http_request: Request, user_id: str | None = None, code_only: bool = False
+):
     """
     Debug endpoint to see how hybrid search retrieves from multi-source FAISS.
     Shows the ranking process and source distribution.
+    Runs in the lowest-priority scheduler lane.
     """
+    ticket = await admit(http_request, user_id, "debug")
     try:
-        retrieved_documents = hybrid_search(query, limit=10)
+        retrieved_documents = await run_in_threadpool(hybrid_search, query, 10, "code" if code_only else None)
         
         debug_output = []
         source_count = {}
@@ -368,16 +650,29 @@ async def debug_hybrid_search(query: str):
                 "rank": i + 1,
                 "id": doc["id"],
                 "source": source,
+                "cell_type": doc.get("metadata", {}).get("cell_type"),
+                "cell_index": doc.get("metadata", {}).get("cell_index"),
                 "chunk_size": len(doc.get("text", "")),
                 "text_preview": doc.get("text", "")[:200] + "..."
             })
         
+        _, context_stats = build_context(retrieved_documents[0:5])
+
         return {
             "query": query,
             "total_retrieved": len(retrieved_documents),
+            "context_packing": context_stats,
             "source_distribution": source_count,
             "retrieved_chunks": debug_output
         }
         
     except Exception as e:
-        return {"error": str(e), "query": query}
\ No newline at end of file
+        return {"error": str(e), "query": query}
+    finally:
+        ADMISSION.release(ticket)
+
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+if IMPORT_SECONDS > serving.IMPORT_TIME_BUDGET_SECONDS:
+    print(f"⚠ Warning: app import took {IMPORT_SECONDS:.2f}s (budget {serving.IMPORT_TIME_BUDGET_SECONDS}s); "
+          f"check for new eager heavy imports with: python -X importtime -c 'import app'")
@@ -0,0 +1,30 @@
+import os
+
+# Multi-worker serving: the app and its indexes are loaded once in the master and
+# shared copy-on-write with every forked uvicorn worker.
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Streams can stay open for the whole answer
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before workers are forked."""
+    from PSU_serving import preload_shared_indexes, start_master_index_watcher
+
+    preload_shared_indexes()
+    # New index versions are picked up here, not in the workers (see on_reload)
+    start_master_index_watcher()
+
+
+def on_reload(server):
+    """
+    Runs in the master on HUP (sent by the index watcher, or by hand), before the
+    replacement workers are forked: they share the newly loaded index copy-on-write.
+    """
+    from PSU_serving import reload_shared_indexes
+
+    reload_shared_indexes()
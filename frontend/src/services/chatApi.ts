@@ -17,7 +17,7 @@ const convertApiChatToUi = (apiChat: ApiChatSession): ChatSession => {
     return {
         id: apiChat.chat_id,
         title: apiChat.title,
-        lastMessage: '', // We'll need to fetch full chat to get this
+        lastMessage: apiChat.last_message_preview || '',
         timestamp: new Date(apiChat.created_at),
         messageCount: apiChat.message_count,
         updatedAt: new Date(apiChat.updated_at),
@@ -41,23 +41,31 @@ const convertApiMessagesToUi = (apiMessages: ApiChatDetail['messages']): Message
  */
 export const getChatSessions = async (): Promise<ChatSession[]> => {
     try {
-        const url = `${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.CHATS}?user_id=${API_CONFIG.USER_ID}`;
-
-        const response = await fetch(url, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-        });
-
-        if (!response.ok) {
-            throw new Error(`Failed to fetch chat sessions: ${response.statusText}`);
-        }
-
-        const data: GetChatsResponse = await response.json();
+        // The list is paginated; follow next_cursor until the last page
+        const chats: ApiChatSession[] = [];
+        let cursor: string | null = null;
+        do {
+            const query: string = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+            const url = `${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.CHATS}?user_id=${API_CONFIG.USER_ID}${query}`;
+
+            const response = await fetch(url, {
+                method: 'GET',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+            });
+
+            if (!response.ok) {
+                throw new Error(`Failed to fetch chat sessions: ${response.statusText}`);
+            }
+
+            const data: GetChatsResponse = await response.json();
+            chats.push(...data.chats);
+            cursor = data.next_cursor;
+        } while (cursor);
 
         // Convert API format to UI format and sort by updated_at (most recent first)
-        const sessions = data.chats
+        const sessions = chats
             .map(convertApiChatToUi)
             .sort((a, b) => b.updatedAt.getTime() - a.updatedAt.getTime());
 
@@ -73,24 +81,34 @@ export const getChatSessions = async (): Promise<ChatSession[]> => {
  */
 export const getChatById = async (chatId: string): Promise<{ id: string; messages: Message[] }> => {
     try {
-        const url = `${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.CHAT_BY_ID(chatId)}`;
-
-        const response = await fetch(url, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-        });
-
-        if (!response.ok) {
-            throw new Error(`Failed to fetch chat: ${response.statusText}`);
-        }
-
-        const data: GetChatResponse = await response.json();
+        // Messages come newest window first; follow next_before back to the first message
+        const windows: ApiChatDetail['messages'][] = [];
+        let chat: ApiChatDetail;
+        let before: number | null = null;
+        do {
+            const query: string = before !== null ? `?before=${before}` : '';
+            const url = `${API_CONFIG.BASE_URL}${API_CONFIG.ENDPOINTS.CHAT_BY_ID(chatId)}${query}`;
+
+            const response = await fetch(url, {
+                method: 'GET',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+            });
+
+            if (!response.ok) {
+                throw new Error(`Failed to fetch chat: ${response.statusText}`);
+            }
+
+            const data: GetChatResponse = await response.json();
+            chat = data.chat;
+            windows.unshift(data.chat.messages);
+            before = data.has_more ? data.next_before : null;
+        } while (before !== null);
 
         return {
-            id: data.chat.chat_id,
-            messages: convertApiMessagesToUi(data.chat.messages),
+            id: chat.chat_id,
+            messages: convertApiMessagesToUi(windows.flat()),
         };
     } catch (error) {
         console.error('Error fetching chat:', error);
@@ -203,6 +221,7 @@ export const sendMessage = async (message: string): Promise<RAGResponse> => {
 
         const requestBody: QueryRequest = {
             question: message,
+            user_id: API_CONFIG.USER_ID,
         };
 
         const response = await fetch(url, {
@@ -213,6 +232,11 @@ export const sendMessage = async (message: string): Promise<RAGResponse> => {
             body: JSON.stringify(requestBody),
         });
 
+        if (response.status === 429) {
+            const retryAfter = response.headers.get('Retry-After') || '2';
+            throw new Error(`The assistant is busy right now, please try again in ${retryAfter}s.`);
+        }
+
         if (!response.ok) {
             const errorText = await response.text();
             throw new Error(`Failed to send message: ${response.statusText}. ${errorText}`);
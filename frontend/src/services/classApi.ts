@@ -6,19 +6,27 @@ const USER_ID = import.meta.env.VITE_USER_ID;
 export const classApi = {
     getAllClasses: async (): Promise<Class[]> => {
         try {
-            const response = await fetch(`${API_BASE_URL}/users/${USER_ID}/classes`, {
-                method: 'GET',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-            });
+            // The list is paginated; follow next_cursor until the last page
+            const classes: Class[] = [];
+            let cursor: string | null = null;
+            do {
+                const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+                const response = await fetch(`${API_BASE_URL}/users/${USER_ID}/classes${query}`, {
+                    method: 'GET',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                });
 
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
 
-            const data: ClassesResponse = await response.json();
-            return data.classes;
+                const data: ClassesResponse = await response.json();
+                classes.push(...data.classes);
+                cursor = data.next_cursor;
+            } while (cursor);
+            return classes;
         } catch (error) {
             console.error('Error fetching classes:', error);
             throw error;
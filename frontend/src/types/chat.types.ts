@@ -24,6 +24,7 @@ export interface ApiChatMessage {
     role: 'user' | 'assistant';
     content: string;
     timestamp: string;
+    seq?: number;
 }
 
 export interface ApiChatSession {
@@ -33,6 +34,8 @@ export interface ApiChatSession {
     created_at: string;
     updated_at: string;
     message_count: number;
+    last_message_preview?: string;
+    title_status?: 'pending' | 'generated' | 'failed';
 }
 
 export interface ApiChatDetail {
@@ -48,10 +51,15 @@ export interface ApiChatDetail {
 export interface GetChatsResponse {
     chats: ApiChatSession[];
     count: number;
+    // Older chats exist; pass back as ?cursor= to get them
+    next_cursor: string | null;
 }
 
 export interface GetChatResponse {
     chat: ApiChatDetail;
+    // Older messages exist; request them with ?before=next_before
+    has_more: boolean;
+    next_before: number | null;
 }
 
 export interface CreateChatResponse {
@@ -86,6 +94,8 @@ export interface ChatSession {
 
 export interface QueryRequest {
     question: string;
+    user_id?: string;
+    code_only?: boolean;
 }
 
 export interface RAGResponse {
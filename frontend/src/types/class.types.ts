@@ -11,4 +11,6 @@ export interface Class {
 
 export interface ClassesResponse {
     classes: Class[];
+    // Pass back as ?cursor= to get the next page; null on the last page
+    next_cursor: string | null;
 }
\ No newline at end of file
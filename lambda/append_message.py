@@ -1,98 +1,98 @@
-import json
-import boto3
 import os
 from datetime import datetime
+from botocore.exceptions import ClientError
+from lambda_common import api_handler, dynamodb, error_response, parse_body, path_params, response, table
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME'])
+# Characters of the latest message kept on the chat item for the sidebar
+PREVIEW_LENGTH = 200
+# Appends racing for the same sequence number are retried this many times before a 409
+APPEND_ATTEMPTS = 3
 
+def current_count(chats, chat_id):
+    """
+    (messages so far, whether the chat item stores the counter), or None if there is no chat.
+    Chats created before messages moved to their own table have no message_count; their
+    messages are still in the chat item's list, so numbering continues after them.
+    """
+    item = chats.get_item(Key={'chat_id': chat_id}, ProjectionExpression='chat_id, message_count').get('Item')
+    if item is None:
+        return None
+    if 'message_count' in item:
+        return int(item['message_count']), True
+    legacy = chats.get_item(Key={'chat_id': chat_id}, ProjectionExpression='messages').get('Item', {})
+    return len(legacy.get('messages', [])), False
+
+@api_handler('Failed to append message')
 def lambda_handler(event, context):
-    try:
-        # Get chat_id from path parameters
-        chat_id = event.get('pathParameters', {}).get('chat_id')
-        
-        if not chat_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'chat_id is required'
-                })
-            }
-        
-        # Parse request body
-        body = json.loads(event.get('body', '{}'))
-        message = body.get('message')
-        role = body.get('role', 'user')
-        
-        if not message:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'message is required'
-                })
-            }
-        
-        timestamp = datetime.utcnow().isoformat()
-        
-        # Create message object
-        new_message = {
-            'role': role,
-            'content': message,
-            'timestamp': timestamp
-        }
-        
-        # Append message to the messages list and update updated_at
-        response = table.update_item(
-            Key={'chat_id': chat_id},
-            UpdateExpression='SET messages = list_append(if_not_exists(messages, :empty_list), :new_message), updated_at = :updated_at',
-            ExpressionAttributeValues={
-                ':new_message': [new_message],
-                ':empty_list': [],
-                ':updated_at': timestamp
-            },
-            ReturnValues='ALL_NEW'
-        )
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Message appended successfully',
-                'chat_id': chat_id,
-                'updated_at': timestamp,
-                'total_messages': len(response['Attributes']['messages'])
-            })
-        }
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Failed to append message',
-                'error': str(e)
-            })
+    # Get chat_id from path parameters
+    chat_id = path_params(event).get('chat_id')
+
+    if not chat_id:
+        return error_response(400, 'chat_id is required')
+
+    # Parse request body
+    body = parse_body(event)
+    message = body.get('message')
+    role = body.get('role', 'user')
+
+    if not message:
+        return error_response(400, 'message is required')
+
+    timestamp = datetime.utcnow().isoformat()
+    chats = table('TABLE_NAME')
+
+    # The counter bump and the message item are written in one transaction, as in create_chat:
+    # the counter only moves if the message is stored, and each sequence number is used once
+    for _ in range(APPEND_ATTEMPTS):
+        current = current_count(chats, chat_id)
+        if current is None:
+            return error_response(404, 'Chat not found')
+        count, has_counter = current
+        seq = count + 1
+        values = {
+            ':updated_at': timestamp,
+            ':preview': message[:PREVIEW_LENGTH],
+            ':role': role,
+            ':seq': seq
         }
+        if has_counter:
+            condition = 'message_count = :count'
+            values[':count'] = count
+        else:
+            condition = 'attribute_exists(chat_id) AND attribute_not_exists(message_count)'
+        try:
+            dynamodb().meta.client.transact_write_items(TransactItems=[
+                {'Update': {
+                    'TableName': chats.name,
+                    'Key': {'chat_id': chat_id},
+                    'UpdateExpression': 'SET updated_at = :updated_at, last_message_preview = :preview, last_message_role = :role, message_count = :seq',
+                    'ConditionExpression': condition,
+                    'ExpressionAttributeValues': values
+                }},
+                # Each message is its own item, so an append costs the same however long the chat is
+                {'Put': {
+                    'TableName': os.environ['MESSAGES_TABLE_NAME'],
+                    'Item': {
+                        'chat_id': chat_id,
+                        'seq': seq,
+                        'role': role,
+                        'content': message,
+                        'timestamp': timestamp
+                    },
+                    'ConditionExpression': 'attribute_not_exists(seq)'
+                }}
+            ])
+            break
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+            # Another append took this sequence number (or the chat was deleted): read again
+    else:
+        return error_response(409, 'Chat was updated concurrently, retry')
+
+    return response(200, {
+        'message': 'Message appended successfully',
+        'chat_id': chat_id,
+        'updated_at': timestamp,
+        'total_messages': seq
+    })
@@ -0,0 +1,161 @@
+import os
+import math
+from datetime import datetime
+from botocore.exceptions import ClientError
+from lambda_common import api_handler, client, error_response, parse_body, path_params, response, table
+
+bucket_name = os.environ['S3_BUCKET_NAME']
+
+# Presigned upload URLs are valid this long (seconds)
+UPLOAD_URL_EXPIRES = 3600
+# Files larger than this are uploaded in parts
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+PART_SIZE = 16 * 1024 * 1024
+# S3 limit on parts per upload
+MAX_PARTS = 10000
+
+def file_key_for(user_id, assignment_id, file_name):
+    return f"assignments/{user_id}/{assignment_id}/{os.path.basename(file_name)}"
+
+def start_upload(user_id, assignment_id, body):
+    """
+    Returns where the client uploads the file: one presigned PUT, or for large files
+    a multipart upload with one presigned URL per part.
+    """
+    file_name = body.get('file_name')
+    if not file_name:
+        return error_response(400, 'file_name is required')
+    file_type = body.get('file_type', 'application/octet-stream')
+    file_size = int(body.get('file_size', 0))
+    file_key = file_key_for(user_id, assignment_id, file_name)
+    s3 = client('s3')
+
+    if file_size <= MULTIPART_THRESHOLD:
+        url = s3.generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': bucket_name,
+                'Key': file_key,
+                'ContentType': file_type
+            },
+            ExpiresIn=UPLOAD_URL_EXPIRES
+        )
+        return response(200, {
+            'file_key': file_key,
+            'method': 'PUT',
+            'url': url,
+            # The PUT must send this Content-Type, it is part of the signature
+            'headers': {'Content-Type': file_type},
+            'expires_in': UPLOAD_URL_EXPIRES
+        })
+
+    part_size = max(PART_SIZE, math.ceil(file_size / MAX_PARTS))
+    part_count = math.ceil(file_size / part_size)
+    upload = s3.create_multipart_upload(Bucket=bucket_name, Key=file_key, ContentType=file_type)
+    parts = [
+        {
+            'part_number': part_number,
+            'url': s3.generate_presigned_url(
+                'upload_part',
+                Params={
+                    'Bucket': bucket_name,
+                    'Key': file_key,
+                    'UploadId': upload['UploadId'],
+                    'PartNumber': part_number
+                },
+                ExpiresIn=UPLOAD_URL_EXPIRES
+            )
+        }
+        for part_number in range(1, part_count + 1)
+    ]
+    return response(200, {
+        'file_key': file_key,
+        'method': 'MULTIPART',
+        'upload_id': upload['UploadId'],
+        'part_size': part_size,
+        'parts': parts,
+        'expires_in': UPLOAD_URL_EXPIRES
+    })
+
+def complete_upload(user_id, assignment_id, body):
+    """Finishes a multipart upload if needed, then records the uploaded file on the assignment"""
+    file_key = body.get('file_key')
+    if not file_key or not file_key.startswith(f"assignments/{user_id}/{assignment_id}/"):
+        return error_response(400, 'file_key does not belong to this assignment')
+    s3 = client('s3')
+
+    if body.get('upload_id'):
+        # parts: [{'part_number': 1, 'etag': '"..."'}, ...] with the ETag header of each part PUT
+        s3.complete_multipart_upload(
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=body['upload_id'],
+            MultipartUpload={
+                'Parts': [
+                    {'PartNumber': int(part['part_number']), 'ETag': part['etag']}
+                    for part in sorted(body.get('parts', []), key=lambda p: int(p['part_number']))
+                ]
+            }
+        )
+
+    try:
+        head = s3.head_object(Bucket=bucket_name, Key=file_key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+            return error_response(409, 'File has not been uploaded')
+        raise
+
+    timestamp = datetime.utcnow().isoformat()
+    file_name = file_key.rsplit('/', 1)[-1]
+    try:
+        table('ASSIGNMENTS_TABLE_NAME').update_item(
+            Key={'user_id': user_id, 'assignment_id': assignment_id},
+            UpdateExpression='SET file_key = :file_key, file_name = :file_name, file_type = :file_type, file_size = :file_size, updated_at = :updated_at',
+            ConditionExpression='attribute_exists(assignment_id)',
+            ExpressionAttributeValues={
+                ':file_key': file_key,
+                ':file_name': file_name,
+                ':file_type': head.get('ContentType', 'application/octet-stream'),
+                ':file_size': head['ContentLength'],
+                ':updated_at': timestamp
+            }
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return error_response(404, 'Assignment not found')
+
+    return response(200, {
+        'message': 'File attached successfully',
+        'id': assignment_id,
+        'file_key': file_key,
+        'file_name': file_name,
+        'file_size': head['ContentLength'],
+        'updated_at': timestamp
+    })
+
+@api_handler('Failed to process upload')
+def lambda_handler(event, context):
+    """
+    POST /users/{user_id}/assignments/{assignment_id}/upload           -> presigned upload URL(s)
+    POST /users/{user_id}/assignments/{assignment_id}/upload/complete  -> record the uploaded file
+    File bytes go straight from the client to S3 and never pass through Lambda.
+    """
+    user_id = path_params(event).get('user_id')
+    assignment_id = path_params(event).get('assignment_id')
+
+    if not user_id or not assignment_id:
+        return error_response(400, 'user_id and assignment_id are required')
+
+    body = parse_body(event)
+
+    if event.get('routeKey', '').endswith('/upload/complete'):
+        return complete_upload(user_id, assignment_id, body)
+
+    existing = table('ASSIGNMENTS_TABLE_NAME').get_item(
+        Key={'user_id': user_id, 'assignment_id': assignment_id},
+        ProjectionExpression='assignment_id'
+    )
+    if 'Item' not in existing:
+        return error_response(404, 'Assignment not found')
+    return start_upload(user_id, assignment_id, body)
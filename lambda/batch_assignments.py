@@ -0,0 +1,294 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from botocore.exceptions import ClientError
+from lambda_common import (
+    api_handler, batch_get, batch_write, client, dynamodb, error_response, parse_body, path_params, response, table
+)
+
+bucket_name = os.environ['S3_BUCKET_NAME']
+
+# Items per request: the transactional bulk update is limited to 100 items
+MAX_BATCH_ITEMS = 100
+# Concurrent S3 calls (stays below the shared connection pool size)
+S3_WORKERS = 16
+# Same limits as assignment_upload.py: larger files go through its multipart flow
+UPLOAD_URL_EXPIRES = 3600
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+# S3 DeleteObjects limit
+S3_DELETE_BATCH = 1000
+
+UPDATABLE_FIELDS = ['title', 'description', 'class_id', 'class_name', 'due_date', 'status', 'notes']
+
+def file_key_for(user_id, assignment_id, file_name):
+    return f"assignments/{user_id}/{assignment_id}/{os.path.basename(file_name)}"
+
+def upload_target(user_id, assignment_id, entry):
+    """Presigned PUT for the entry's file, or None when the entry has no file"""
+    if not entry.get('file_name'):
+        return None
+    file_type = entry.get('file_type', 'application/octet-stream')
+    file_key = file_key_for(user_id, assignment_id, entry['file_name'])
+    url = client('s3').generate_presigned_url(
+        'put_object',
+        Params={
+            'Bucket': bucket_name,
+            'Key': file_key,
+            'ContentType': file_type
+        },
+        ExpiresIn=UPLOAD_URL_EXPIRES
+    )
+    return {
+        'file_key': file_key,
+        'method': 'PUT',
+        'url': url,
+        'headers': {'Content-Type': file_type},
+        'expires_in': UPLOAD_URL_EXPIRES
+    }
+
+def create_assignments(user_id, entries):
+    """
+    Creates the assignments with batched writes. Entries with file_name/file_type/file_size
+    come back with a presigned PUT; after uploading, record the files with batch/upload/complete.
+    Files over 64MB get an upload_error instead: they go through the multipart upload endpoint.
+    File content is not accepted inline here.
+    """
+    for index, entry in enumerate(entries):
+        if 'title' not in entry:
+            return error_response(400, f'title is required (assignments[{index}])')
+        try:
+            int(entry.get('file_size', 0))
+        except (TypeError, ValueError):
+            return error_response(400, f'file_size must be an integer (assignments[{index}])')
+
+    timestamp = datetime.utcnow().isoformat()
+    items = []
+    created = []
+    for entry in entries:
+        assignment_id = str(uuid.uuid4())
+        item = {
+            'user_id': user_id,
+            'assignment_id': assignment_id,
+            'title': entry['title'],
+            'description': entry.get('description', ''),
+            'class_id': entry.get('class_id', ''),
+            'class_name': entry.get('class_name', ''),
+            'due_date': entry.get('due_date', ''),
+            'status': entry.get('status', 'pending'),
+            'notes': entry.get('notes', ''),
+            'created_at': timestamp,
+            'updated_at': timestamp
+        }
+        items.append(item)
+        assignment = {
+            'id': assignment_id,
+            'title': item['title'],
+            'description': item['description'],
+            'class_id': item['class_id'],
+            'class_name': item['class_name'],
+            'due_date': item['due_date'],
+            'status': item['status'],
+            'created_at': timestamp
+        }
+        if entry.get('file_name') and int(entry.get('file_size', 0)) > MULTIPART_THRESHOLD:
+            # Too large for a single presigned PUT
+            assignment['upload'] = None
+            assignment['upload_error'] = {
+                'code': 'file_too_large',
+                'message': f"Files over {MULTIPART_THRESHOLD // (1024 * 1024)}MB must be uploaded with "
+                           f"POST /users/{user_id}/assignments/{assignment_id}/upload"
+            }
+        else:
+            assignment['upload'] = upload_target(user_id, assignment_id, entry)
+        created.append(assignment)
+
+    unprocessed = batch_write(
+        table('ASSIGNMENTS_TABLE_NAME').name,
+        [{'PutRequest': {'Item': item}} for item in items]
+    )
+    unwritten = {request['PutRequest']['Item']['assignment_id'] for request in unprocessed}
+    # Positions in the request of the entries that were not written (their ids were never handed out)
+    failed = [index for index, item in enumerate(items) if item['assignment_id'] in unwritten]
+
+    return response(201, {
+        'assignments': [a for a in created if a['id'] not in unwritten],
+        'failed': failed,
+        'count': len(created) - len(failed)
+    })
+
+def update_assignments(user_id, entries):
+    """Applies every entry's field changes in one transaction: all of them or none"""
+    for index, entry in enumerate(entries):
+        if not isinstance(entry.get('id'), str) or not entry['id']:
+            return error_response(400, f'id is required (assignments[{index}])')
+    ids = [entry['id'] for entry in entries]
+    if len(set(ids)) != len(ids):
+        return error_response(400, 'Each assignment can appear only once')
+
+    timestamp = datetime.utcnow().isoformat()
+    table_name = table('ASSIGNMENTS_TABLE_NAME').name
+    transact_items = []
+    for index, entry in enumerate(entries):
+        fields = [field for field in UPDATABLE_FIELDS if field in entry]
+        if not fields:
+            return error_response(400, f'No fields to update (assignments[{index}])')
+        names = {f"#{field}": field for field in fields}
+        values = {f":{field}": entry[field] for field in fields}
+        names['#updated_at'] = 'updated_at'
+        values[':updated_at'] = timestamp
+        transact_items.append({
+            'Update': {
+                'TableName': table_name,
+                'Key': {'user_id': user_id, 'assignment_id': entry['id']},
+                'UpdateExpression': 'SET ' + ', '.join(f"{name} = :{field}" for name, field in names.items()),
+                'ConditionExpression': 'attribute_exists(assignment_id)',
+                'ExpressionAttributeNames': names,
+                'ExpressionAttributeValues': values
+            }
+        })
+
+    try:
+        dynamodb().meta.client.transact_write_items(TransactItems=transact_items)
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'TransactionCanceledException':
+            raise
+        # One reason per item, in order; ConditionalCheckFailed marks the missing ones
+        reasons = e.response.get('CancellationReasons', [])
+        missing = [
+            entry['id'] for entry, reason in zip(entries, reasons)
+            if reason.get('Code') == 'ConditionalCheckFailed'
+        ]
+        if missing:
+            return response(404, {'message': 'Assignments not found', 'missing': missing})
+        return error_response(409, 'Update conflicted with another write, retry')
+
+    return response(200, {
+        'message': 'Assignments updated successfully',
+        'ids': [entry['id'] for entry in entries],
+        'updated_at': timestamp
+    })
+
+def delete_assignments(user_id, assignment_ids):
+    """
+    Deletes the assignments, then the files of the rows that were actually deleted with one
+    S3 DeleteObjects call, so a row that stays never points at a missing file
+    """
+    table_name = table('ASSIGNMENTS_TABLE_NAME').name
+    keys = [{'user_id': user_id, 'assignment_id': assignment_id} for assignment_id in assignment_ids]
+    existing = batch_get(table_name, keys, projection='assignment_id, file_key')
+
+    unprocessed = batch_write(table_name, [{'DeleteRequest': {'Key': key}} for key in keys])
+    failed = {request['DeleteRequest']['Key']['assignment_id'] for request in unprocessed}
+    file_keys = [
+        item['file_key'] for item in existing
+        if item.get('file_key') and item['assignment_id'] not in failed
+    ]
+
+    for start in range(0, len(file_keys), S3_DELETE_BATCH):
+        result = client('s3').delete_objects(
+            Bucket=bucket_name,
+            Delete={'Objects': [{'Key': key} for key in file_keys[start:start + S3_DELETE_BATCH]], 'Quiet': True}
+        )
+        for error in result.get('Errors', []):
+            print(f"Error deleting file from S3: {error.get('Key')}: {error.get('Message')}")
+
+    return response(200, {
+        'message': 'Assignments deleted successfully',
+        'ids': [assignment_id for assignment_id in assignment_ids if assignment_id not in failed],
+        'failed': sorted(failed)
+    })
+
+def complete_uploads(user_id, uploads):
+    """Records the files uploaded with batch-create's presigned PUTs, checking each one in parallel"""
+    timestamp = datetime.utcnow().isoformat()
+    table_name = table('ASSIGNMENTS_TABLE_NAME').name
+    # Clients are thread-safe (resources are not); both are created here, before the workers start
+    s3 = client('s3')
+    ddb = dynamodb().meta.client
+
+    def complete(upload):
+        assignment_id = upload.get('assignment_id')
+        file_key = upload.get('file_key')
+        if not isinstance(assignment_id, str) or not isinstance(file_key, str):
+            return assignment_id, 'assignment_id and file_key must be strings'
+        if not assignment_id or not file_key.startswith(f"assignments/{user_id}/{assignment_id}/"):
+            return assignment_id, 'file_key does not belong to this assignment'
+        try:
+            head = s3.head_object(Bucket=bucket_name, Key=file_key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return assignment_id, 'File has not been uploaded'
+            # Reported for this upload only: the rest of the batch still completes
+            print(f"Error checking upload {file_key}: {str(e)}")
+            return assignment_id, 'Could not check the uploaded file, retry'
+        try:
+            ddb.update_item(
+                TableName=table_name,
+                Key={'user_id': user_id, 'assignment_id': assignment_id},
+                UpdateExpression='SET file_key = :file_key, file_name = :file_name, file_type = :file_type, file_size = :file_size, updated_at = :updated_at',
+                ConditionExpression='attribute_exists(assignment_id)',
+                ExpressionAttributeValues={
+                    ':file_key': file_key,
+                    ':file_name': file_key.rsplit('/', 1)[-1],
+                    ':file_type': head.get('ContentType', 'application/octet-stream'),
+                    ':file_size': head['ContentLength'],
+                    ':updated_at': timestamp
+                }
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                print(f"Error recording upload {file_key}: {str(e)}")
+                return assignment_id, 'Could not record the uploaded file, retry'
+            return assignment_id, 'Assignment not found'
+        return assignment_id, None
+
+    with ThreadPoolExecutor(max_workers=S3_WORKERS) as pool:
+        results = list(pool.map(complete, uploads))
+
+    return response(200, {
+        'completed': [assignment_id for assignment_id, error in results if error is None],
+        'failed': [{'id': assignment_id, 'message': error} for assignment_id, error in results if error],
+        'updated_at': timestamp
+    })
+
+@api_handler('Failed to process assignment batch')
+def lambda_handler(event, context):
+    """
+    POST /users/{user_id}/assignments/batch                  {"assignments": [{title, ...}]}
+    PUT  /users/{user_id}/assignments/batch                  {"assignments": [{id, status, ...}]}
+    POST /users/{user_id}/assignments/batch/delete           {"ids": [...]}
+    POST /users/{user_id}/assignments/batch/upload/complete  {"uploads": [{assignment_id, file_key}]}
+    At most 100 entries per request.
+    """
+    user_id = path_params(event).get('user_id')
+
+    if not user_id:
+        return error_response(400, 'user_id is required')
+
+    body = parse_body(event)
+    route_key = event.get('routeKey', '')
+    if route_key.endswith('/batch/delete'):
+        entries = body.get('ids')
+    elif route_key.endswith('/batch/upload/complete'):
+        entries = body.get('uploads')
+    else:
+        entries = body.get('assignments')
+
+    if not isinstance(entries, list) or not entries:
+        return error_response(400, 'A non-empty list is required')
+    if len(entries) > MAX_BATCH_ITEMS:
+        return error_response(400, f'At most {MAX_BATCH_ITEMS} entries per request')
+    if route_key.endswith('/batch/delete'):
+        if not all(isinstance(entry, str) and entry for entry in entries):
+            return error_response(400, 'ids must be non-empty strings')
+    elif not all(isinstance(entry, dict) for entry in entries):
+        return error_response(400, 'Each entry must be an object')
+
+    if route_key.endswith('/batch/delete'):
+        return delete_assignments(user_id, list(dict.fromkeys(entries)))
+    if route_key.endswith('/batch/upload/complete'):
+        return complete_uploads(user_id, entries)
+    if route_key.startswith('PUT '):
+        return update_assignments(user_id, entries)
+    return create_assignments(user_id, entries)
@@ -0,0 +1,183 @@
+import uuid
+from datetime import datetime
+from botocore.exceptions import ClientError
+from lambda_common import api_handler, batch_write, dynamodb, error_response, parse_body, path_params, response, table
+
+# Items per request: the transactional bulk update is limited to 100 items
+MAX_BATCH_ITEMS = 100
+
+REQUIRED_FIELDS = ['name', 'code', 'instructor', 'schedule', 'semester']
+UPDATABLE_FIELDS = ['name', 'code', 'instructor', 'schedule', 'semester', 'color', 'description']
+
+def format_class(cls):
+    # Transform to match frontend interface
+    formatted_class = {
+        'id': cls['class_id'],
+        'name': cls['name'],
+        'code': cls['code'],
+        'instructor': cls['instructor'],
+        'schedule': cls['schedule'],
+        'semester': cls['semester']
+    }
+    if 'color' in cls:
+        formatted_class['color'] = cls['color']
+    if 'description' in cls:
+        formatted_class['description'] = cls['description']
+    return formatted_class
+
+def create_classes(user_id, entries):
+    """
+    Creates the classes with batched writes. An entry's id is kept if given, like create_class,
+    but such an entry is written with a conditional put so it never overwrites an existing class.
+    """
+    for index, entry in enumerate(entries):
+        for field in REQUIRED_FIELDS:
+            if field not in entry:
+                return error_response(400, f'{field} is required (classes[{index}])')
+        if 'id' in entry and (not isinstance(entry['id'], str) or not entry['id']):
+            return error_response(400, f'id must be a non-empty string (classes[{index}])')
+
+    timestamp = datetime.utcnow().isoformat()
+    items = []
+    for entry in entries:
+        item = {
+            'user_id': user_id,
+            'class_id': entry.get('id', str(uuid.uuid4())),
+            'created_at': timestamp,
+            'updated_at': timestamp
+        }
+        for field in REQUIRED_FIELDS + ['color', 'description']:
+            if field in entry:
+                item[field] = entry[field]
+        items.append(item)
+
+    if len({item['class_id'] for item in items}) != len(items):
+        return error_response(400, 'Each class can appear only once')
+
+    classes = table('CLASSES_TABLE_NAME')
+    # Client-supplied ids may already exist: batch writes cannot carry a condition
+    conflicts = []
+    for index, (entry, item) in enumerate(zip(entries, items)):
+        if 'id' not in entry:
+            continue
+        try:
+            classes.put_item(Item=item, ConditionExpression='attribute_not_exists(class_id)')
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            conflicts.append(index)
+
+    unprocessed = batch_write(
+        classes.name,
+        [{'PutRequest': {'Item': item}} for entry, item in zip(entries, items) if 'id' not in entry]
+    )
+    unwritten = {request['PutRequest']['Item']['class_id'] for request in unprocessed}
+    # Positions in the request of the entries that were not written (their ids were never handed out)
+    failed = [index for index, item in enumerate(items) if item['class_id'] in unwritten]
+    not_created = set(failed) | set(conflicts)
+
+    return response(201, {
+        'classes': [format_class(item) for index, item in enumerate(items) if index not in not_created],
+        'failed': failed,
+        # Positions of entries whose id belongs to an existing class (left unchanged)
+        'conflicts': conflicts,
+        'count': len(items) - len(not_created)
+    })
+
+def update_classes(user_id, entries):
+    """Applies every entry's field changes in one transaction: all of them or none"""
+    for index, entry in enumerate(entries):
+        if not isinstance(entry.get('id'), str) or not entry['id']:
+            return error_response(400, f'id is required (classes[{index}])')
+    ids = [entry['id'] for entry in entries]
+    if len(set(ids)) != len(ids):
+        return error_response(400, 'Each class can appear only once')
+
+    timestamp = datetime.utcnow().isoformat()
+    table_name = table('CLASSES_TABLE_NAME').name
+    transact_items = []
+    for index, entry in enumerate(entries):
+        fields = [field for field in UPDATABLE_FIELDS if field in entry]
+        if not fields:
+            return error_response(400, f'No fields to update (classes[{index}])')
+        names = {f"#{field}": field for field in fields}
+        values = {f":{field}": entry[field] for field in fields}
+        names['#updated_at'] = 'updated_at'
+        values[':updated_at'] = timestamp
+        transact_items.append({
+            'Update': {
+                'TableName': table_name,
+                'Key': {'user_id': user_id, 'class_id': entry['id']},
+                'UpdateExpression': 'SET ' + ', '.join(f"{name} = :{field}" for name, field in names.items()),
+                'ConditionExpression': 'attribute_exists(class_id)',
+                'ExpressionAttributeNames': names,
+                'ExpressionAttributeValues': values
+            }
+        })
+
+    try:
+        dynamodb().meta.client.transact_write_items(TransactItems=transact_items)
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'TransactionCanceledException':
+            raise
+        # One reason per item, in order; ConditionalCheckFailed marks the missing ones
+        reasons = e.response.get('CancellationReasons', [])
+        missing = [
+            entry['id'] for entry, reason in zip(entries, reasons)
+            if reason.get('Code') == 'ConditionalCheckFailed'
+        ]
+        if missing:
+            return response(404, {'message': 'Classes not found', 'missing': missing})
+        return error_response(409, 'Update conflicted with another write, retry')
+
+    return response(200, {
+        'message': 'Classes updated successfully',
+        'ids': ids,
+        'updated_at': timestamp
+    })
+
+def delete_classes(user_id, class_ids):
+    unprocessed = batch_write(
+        table('CLASSES_TABLE_NAME').name,
+        [{'DeleteRequest': {'Key': {'user_id': user_id, 'class_id': class_id}}} for class_id in class_ids]
+    )
+    failed = {request['DeleteRequest']['Key']['class_id'] for request in unprocessed}
+
+    return response(200, {
+        'message': 'Classes deleted successfully',
+        'ids': [class_id for class_id in class_ids if class_id not in failed],
+        'failed': sorted(failed)
+    })
+
+@api_handler('Failed to process class batch')
+def lambda_handler(event, context):
+    """
+    POST /users/{user_id}/classes/batch         {"classes": [{name, code, ...}]}
+    PUT  /users/{user_id}/classes/batch         {"classes": [{id, name, ...}]}
+    POST /users/{user_id}/classes/batch/delete  {"ids": [...]}
+    At most 100 entries per request.
+    """
+    user_id = path_params(event).get('user_id')
+
+    if not user_id:
+        return error_response(400, 'user_id is required')
+
+    body = parse_body(event)
+    route_key = event.get('routeKey', '')
+    entries = body.get('ids') if route_key.endswith('/batch/delete') else body.get('classes')
+
+    if not isinstance(entries, list) or not entries:
+        return error_response(400, 'A non-empty list is required')
+    if len(entries) > MAX_BATCH_ITEMS:
+        return error_response(400, f'At most {MAX_BATCH_ITEMS} entries per request')
+    if route_key.endswith('/batch/delete'):
+        if not all(isinstance(entry, str) and entry for entry in entries):
+            return error_response(400, 'ids must be non-empty strings')
+    elif not all(isinstance(entry, dict) for entry in entries):
+        return error_response(400, 'Each entry must be an object')
+
+    if route_key.endswith('/batch/delete'):
+        return delete_classes(user_id, list(dict.fromkeys(entries)))
+    if route_key.startswith('PUT '):
+        return update_classes(user_id, entries)
+    return create_classes(user_id, entries)
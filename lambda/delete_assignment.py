@@ -1,87 +1,46 @@
-import json
-import boto3
 import os
+from lambda_common import api_handler, client, error_response, path_params, response, table
 
-dynamodb = boto3.resource('dynamodb')
-s3 = boto3.client('s3')
-table = dynamodb.Table(os.environ['ASSIGNMENTS_TABLE_NAME'])
 bucket_name = os.environ['S3_BUCKET_NAME']
 
+@api_handler('Failed to delete assignment')
 def lambda_handler(event, context):
-    try:
-        # Get user_id and assignment_id from path parameters
-        path_params = event.get('pathParameters', {})
-        user_id = path_params.get('user_id')
-        assignment_id = path_params.get('assignment_id')
-        
-        if not user_id or not assignment_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'user_id and assignment_id are required'
-                })
-            }
-        
-        # Get assignment to find file_key
-        response = table.get_item(
-            Key={
-                'user_id': user_id,
-                'assignment_id': assignment_id
-            }
-        )
-        
-        # Delete file from S3 if exists
-        if 'Item' in response and 'file_key' in response['Item']:
-            try:
-                s3.delete_object(
-                    Bucket=bucket_name,
-                    Key=response['Item']['file_key']
-                )
-            except Exception as e:
-                print(f"Error deleting file from S3: {str(e)}")
-        
-        # Delete from DynamoDB
-        table.delete_item(
-            Key={
-                'user_id': user_id,
-                'assignment_id': assignment_id
-            }
-        )
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Assignment deleted successfully',
-                'assignment_id': assignment_id
-            })
+    # Get user_id and assignment_id from path parameters
+    user_id = path_params(event).get('user_id')
+    assignment_id = path_params(event).get('assignment_id')
+
+    if not user_id or not assignment_id:
+        return error_response(400, 'user_id and assignment_id are required')
+
+    assignments_table = table('ASSIGNMENTS_TABLE_NAME')
+
+    # Get assignment to find file_key
+    result = assignments_table.get_item(
+        Key={
+            'user_id': user_id,
+            'assignment_id': assignment_id
         }
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Failed to delete assignment',
-                'error': str(e)
-            })
+    )
+
+    # Delete file from S3 if exists
+    if 'Item' in result and 'file_key' in result['Item']:
+        try:
+            client('s3').delete_object(
+                Bucket=bucket_name,
+                Key=result['Item']['file_key']
+            )
+        except Exception as e:
+            print(f"Error deleting file from S3: {str(e)}")
+
+    # Delete from DynamoDB
+    assignments_table.delete_item(
+        Key={
+            'user_id': user_id,
+            'assignment_id': assignment_id
         }
+    )
+
+    return response(200, {
+        'message': 'Assignment deleted successfully',
+        'assignment_id': assignment_id
+    })
@@ -1,58 +1,37 @@
-import json
-import boto3
-import os
+from boto3.dynamodb.conditions import Key
+from lambda_common import api_handler, error_response, path_params, response, table
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME'])
+def delete_messages(chat_id):
+    """Deletes every message item of the chat in batches of 25"""
+    messages_table = table('MESSAGES_TABLE_NAME')
+    query_args = {
+        'KeyConditionExpression': Key('chat_id').eq(chat_id),
+        'ProjectionExpression': 'chat_id, seq'
+    }
+    with messages_table.batch_writer() as batch:
+        while True:
+            page = messages_table.query(**query_args)
+            for key in page.get('Items', []):
+                batch.delete_item(Key={'chat_id': key['chat_id'], 'seq': key['seq']})
+            if 'LastEvaluatedKey' not in page:
+                break
+            query_args['ExclusiveStartKey'] = page['LastEvaluatedKey']
 
+@api_handler('Failed to delete chat')
 def lambda_handler(event, context):
-    try:
-        # Get chat_id from path parameters
-        chat_id = event.get('pathParameters', {}).get('chat_id')
-        
-        if not chat_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'chat_id is required'
-                })
-            }
-        
-        # Delete item from DynamoDB
-        table.delete_item(
-            Key={'chat_id': chat_id}
-        )
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Chat deleted successfully',
-                'chat_id': chat_id
-            })
-        }
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'message': 'Failed to delete chat',
-                'error': str(e)
-            })
-        }
+    # Get chat_id from path parameters
+    chat_id = path_params(event).get('chat_id')
+
+    if not chat_id:
+        return error_response(400, 'chat_id is required')
+
+    # Delete item from DynamoDB
+    table('TABLE_NAME').delete_item(
+        Key={'chat_id': chat_id}
+    )
+    delete_messages(chat_id)
+
+    return response(200, {
+        'message': 'Chat deleted successfully',
+        'chat_id': chat_id
+    })
@@ -0,0 +1,114 @@
+import json
+from botocore.exceptions import ClientError
+from lambda_common import client, table
+
+def generate_title(first_message):
+    """Generate a short title from the first message using Amazon Nova"""
+    prompt = f"""Generate a short, concise title (maximum 6 words) that summarizes this message.
+Only return the title, nothing else.
+
+Message: {first_message}
+
+Title:"""
+
+    # Amazon Nova Lite API format
+    request_body = {
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "text": prompt
+                    }
+                ]
+            }
+        ],
+        "inferenceConfig": {
+            "max_new_tokens": 50,
+            "temperature": 0.7
+        }
+    }
+
+    response = client('bedrock-runtime').invoke_model(
+        modelId='amazon.nova-lite-v1:0',
+        contentType='application/json',
+        accept='application/json',
+        body=json.dumps(request_body)
+    )
+
+    response_body = json.loads(response['body'].read())
+
+    # Amazon Nova response format
+    title = response_body['output']['message']['content'][0]['text'].strip()
+
+    # Remove quotes if present
+    title = title.strip('"').strip("'")
+
+    # Truncate if too long
+    if len(title) > 60:
+        title = title[:57] + "..."
+
+    return title
+
+def first_message_of(image):
+    """First message from a stream NewImage (DynamoDB JSON): a new chat's preview is its first message"""
+    return image.get('last_message_preview', {}).get('S')
+
+def mark_title_failed(chat_id):
+    """Keeps the provisional title but moves the chat out of 'pending' so it is not left waiting forever"""
+    try:
+        table('TABLE_NAME').update_item(
+            Key={'chat_id': chat_id},
+            UpdateExpression='SET title_status = :failed',
+            ConditionExpression='title_status = :pending',
+            ExpressionAttributeValues={
+                ':failed': 'failed',
+                ':pending': 'pending'
+            }
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            print(f"Error marking title failed for {chat_id}: {str(e)}")
+
+def lambda_handler(event, context):
+    """
+    Triggered by the chats table stream (new chats only). Replaces the provisional
+    title written by create_chat with a generated one; on failure the provisional title
+    stays and title_status becomes 'failed'.
+    """
+    for record in event.get('Records', []):
+        if record.get('eventName') != 'INSERT':
+            continue
+        image = record['dynamodb'].get('NewImage', {})
+        if image.get('title_status', {}).get('S') != 'pending':
+            continue
+        chat_id = image['chat_id']['S']
+        first_message = first_message_of(image)
+        if not first_message:
+            continue
+
+        try:
+            title = generate_title(first_message)
+            # Only while still pending: a title the user set in the meantime wins
+            table('TABLE_NAME').update_item(
+                Key={'chat_id': chat_id},
+                UpdateExpression='SET title = :title, title_status = :generated',
+                ConditionExpression='title_status = :pending',
+                ExpressionAttributeValues={
+                    ':title': title,
+                    ':generated': 'generated',
+                    ':pending': 'pending'
+                }
+            )
+            print(f"Title for {chat_id}: {title}")
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                print(f"Error updating title for {chat_id}: {str(e)}")
+                mark_title_failed(chat_id)
+        except Exception as e:
+            print(f"Error generating title for {chat_id}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            mark_title_failed(chat_id)
+
+    return {'statusCode': 200}
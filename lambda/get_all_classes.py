@@ -1,91 +1,53 @@
-import json
-import boto3
-import os
-from decimal import Decimal
 from boto3.dynamodb.conditions import Key
+from lambda_common import api_handler, error_response, next_cursor, page_args, path_params, query_params, response, table
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['CLASSES_TABLE_NAME'])
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Items per page (?limit=)
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 200
 
+@api_handler('Failed to get classes')
 def lambda_handler(event, context):
-    try:
-        # Get user_id from path parameters
-        user_id = event.get('pathParameters', {}).get('user_id')
-        
-        if not user_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'user_id is required'
-                })
-            }
-        
-        # Query all classes for the user
-        response = table.query(
-            KeyConditionExpression=Key('user_id').eq(user_id)
-        )
-        
-        classes = response.get('Items', [])
-        
-        # Transform to match frontend interface
-        formatted_classes = []
-        for cls in classes:
-            formatted_class = {
-                'id': cls['class_id'],
-                'name': cls['name'],
-                'code': cls['code'],
-                'instructor': cls['instructor'],
-                'schedule': cls['schedule'],
-                'semester': cls['semester']
-            }
-            
-            # Add optional fields if they exist
-            if 'color' in cls:
-                formatted_class['color'] = cls['color']
-            if 'description' in cls:
-                formatted_class['description'] = cls['description']
-            
-            formatted_classes.append(formatted_class)
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'classes': formatted_classes
-            }, cls=DecimalEncoder)
-        }
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Failed to get classes',
-                'error': str(e)
-            })
+    # Get user_id from path parameters
+    user_id = path_params(event).get('user_id')
+
+    if not user_id:
+        return error_response(400, 'user_id is required')
+
+    # Page size and position (?limit=, ?cursor= from the previous page's next_cursor)
+    scope = f"classes:{user_id}"
+    query_args = page_args(query_params(event), scope, DEFAULT_LIMIT, MAX_LIMIT)
+    if query_args is None:
+        return error_response(400, 'Invalid limit or cursor')
+
+    # Query all classes for the user
+    result = table('CLASSES_TABLE_NAME').query(
+        KeyConditionExpression=Key('user_id').eq(user_id),
+        **query_args
+    )
+
+    classes = result.get('Items', [])
+
+    # Transform to match frontend interface
+    formatted_classes = []
+    for cls in classes:
+        formatted_class = {
+            'id': cls['class_id'],
+            'name': cls['name'],
+            'code': cls['code'],
+            'instructor': cls['instructor'],
+            'schedule': cls['schedule'],
+            'semester': cls['semester']
         }
+
+        # Add optional fields if they exist
+        if 'color' in cls:
+            formatted_class['color'] = cls['color']
+        if 'description' in cls:
+            formatted_class['description'] = cls['description']
+
+        formatted_classes.append(formatted_class)
+
+    return response(200, {
+        'classes': formatted_classes,
+        'next_cursor': next_cursor(result, scope)
+    })
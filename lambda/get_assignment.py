@@ -1,132 +1,97 @@
-import json
-import boto3
 import os
-from decimal import Decimal
+from lambda_common import api_handler, client, error_response, int_param, path_params, query_params, response, table
 
-dynamodb = boto3.resource('dynamodb')
-s3 = boto3.client('s3')
-table = dynamodb.Table(os.environ['ASSIGNMENTS_TABLE_NAME'])
 bucket_name = os.environ['S3_BUCKET_NAME']
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# File content is only inlined on request (?include_content=true), at most max_bytes of it
+DEFAULT_CONTENT_BYTES = 64 * 1024
+MAX_CONTENT_BYTES = 1024 * 1024
+TEXT_TYPES = ('text/', 'application/json', 'application/xml', 'application/x-yaml')
 
+@api_handler('Failed to get assignment')
 def lambda_handler(event, context):
-    try:
-        # Get user_id and assignment_id from path parameters
-        path_params = event.get('pathParameters', {})
-        user_id = path_params.get('user_id')
-        assignment_id = path_params.get('assignment_id')
-        
-        if not user_id or not assignment_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'user_id and assignment_id are required'
-                })
-            }
-        
-        # Get assignment from DynamoDB
-        response = table.get_item(
-            Key={
-                'user_id': user_id,
-                'assignment_id': assignment_id
-            }
-        )
-        
-        if 'Item' not in response:
-            return {
-                'statusCode': 404,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'Assignment not found'
-                })
-            }
-        
-        assignment = response['Item']
-        
-        # Format assignment
-        formatted_assignment = {
-            'id': assignment['assignment_id'],
-            'title': assignment['title'],
-            'description': assignment.get('description', ''),
-            'class_id': assignment.get('class_id', ''),
-            'class_name': assignment.get('class_name', ''),
-            'due_date': assignment.get('due_date', ''),
-            'status': assignment.get('status', 'pending'),
-            'file_key': assignment.get('file_key', ''),
-            'file_name': assignment.get('file_name', ''),
-            'file_type': assignment.get('file_type', ''),
-            'created_at': assignment.get('created_at', ''),
-            'updated_at': assignment.get('updated_at', ''),
-            'notes': assignment.get('notes', '')
-        }
-        
-        # Generate presigned URL for file if exists
-        if assignment.get('file_key'):
-            try:
-                url = s3.generate_presigned_url(
-                    'get_object',
-                    Params={
-                        'Bucket': bucket_name,
-                        'Key': assignment['file_key']
-                    },
-                    ExpiresIn=3600
-                )
-                formatted_assignment['file_url'] = url
-            except Exception as e:
-                print(f"Error generating presigned URL: {str(e)}")
-                formatted_assignment['file_url'] = None
-        
-        # If file is text-based, optionally read content
-        if assignment.get('file_type') in ['text/plain', 'text/markdown', 'application/json']:
-            try:
-                obj = s3.get_object(Bucket=bucket_name, Key=assignment['file_key'])
-                content = obj['Body'].read().decode('utf-8')
-                formatted_assignment['file_content'] = content
-            except Exception as e:
-                print(f"Error reading file content: {str(e)}")
-                formatted_assignment['file_content'] = None
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps(formatted_assignment, cls=DecimalEncoder)
-        }
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Failed to get assignment',
-                'error': str(e)
-            })
+    # Get user_id and assignment_id from path parameters
+    user_id = path_params(event).get('user_id')
+    assignment_id = path_params(event).get('assignment_id')
+    params = query_params(event)
+
+    if not user_id or not assignment_id:
+        return error_response(400, 'user_id and assignment_id are required')
+
+    max_bytes = int_param(params, 'max_bytes', DEFAULT_CONTENT_BYTES)
+    if max_bytes is None:
+        return error_response(400, 'max_bytes must be an integer')
+    max_bytes = min(max(max_bytes, 1), MAX_CONTENT_BYTES)
+
+    # Get assignment from DynamoDB
+    result = table('ASSIGNMENTS_TABLE_NAME').get_item(
+        Key={
+            'user_id': user_id,
+            'assignment_id': assignment_id
         }
+    )
+
+    if 'Item' not in result:
+        return error_response(404, 'Assignment not found')
+
+    assignment = result['Item']
+
+    # Format assignment
+    formatted_assignment = {
+        'id': assignment['assignment_id'],
+        'title': assignment['title'],
+        'description': assignment.get('description', ''),
+        'class_id': assignment.get('class_id', ''),
+        'class_name': assignment.get('class_name', ''),
+        'due_date': assignment.get('due_date', ''),
+        'status': assignment.get('status', 'pending'),
+        'file_key': assignment.get('file_key', ''),
+        'file_name': assignment.get('file_name', ''),
+        'file_type': assignment.get('file_type', ''),
+        'file_size': assignment.get('file_size'),
+        'created_at': assignment.get('created_at', ''),
+        'updated_at': assignment.get('updated_at', ''),
+        'notes': assignment.get('notes', '')
+    }
+
+    s3 = client('s3')
+
+    # Generate presigned URL for file if exists
+    if assignment.get('file_key'):
+        try:
+            url = s3.generate_presigned_url(
+                'get_object',
+                Params={
+                    'Bucket': bucket_name,
+                    'Key': assignment['file_key']
+                },
+                ExpiresIn=3600
+            )
+            formatted_assignment['file_url'] = url
+        except Exception as e:
+            print(f"Error generating presigned URL: {str(e)}")
+            formatted_assignment['file_url'] = None
+
+    # The presigned URL is the normal way to fetch the file; a text preview is opt-in
+    # and reads only the first max_bytes with a ranged GET
+    include_content = params.get('include_content', '').lower() == 'true'
+    file_type = assignment.get('file_type', '')
+    if include_content and assignment.get('file_key') and file_type.startswith(TEXT_TYPES):
+        try:
+            obj = s3.get_object(
+                Bucket=bucket_name,
+                Key=assignment['file_key'],
+                Range=f"bytes=0-{max_bytes - 1}"
+            )
+            data = obj['Body'].read()
+            # Content-Range: "bytes 0-65535/1048576"
+            total_size = int(obj.get('ContentRange', '').rsplit('/', 1)[-1] or len(data))
+            # A cut can split a multi-byte character at the end
+            formatted_assignment['file_content'] = data.decode('utf-8', errors='ignore')
+            formatted_assignment['content_truncated'] = total_size > len(data)
+            formatted_assignment['file_size'] = total_size
+        except Exception as e:
+            print(f"Error reading file content: {str(e)}")
+            formatted_assignment['file_content'] = None
+
+    return response(200, formatted_assignment)
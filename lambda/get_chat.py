@@ -1,80 +1,58 @@
-import json
-import boto3
-import os
-from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+from lambda_common import api_handler, error_response, int_param, parse_limit, path_params, query_params, response, table
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME'])
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Messages per page (?limit=), newest window first
+DEFAULT_MESSAGE_LIMIT = 50
+MAX_MESSAGE_LIMIT = 200
 
+@api_handler('Failed to get chat')
 def lambda_handler(event, context):
-    try:
-        # Get chat_id from path parameters
-        chat_id = event.get('pathParameters', {}).get('chat_id')
-        
-        if not chat_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'message': 'chat_id is required'
-                })
-            }
-        
-        # Get item from DynamoDB
-        response = table.get_item(
-            Key={'chat_id': chat_id}
-        )
-        
-        if 'Item' not in response:
-            return {
-                'statusCode': 404,
-                'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'Chat not found'
-                })
-            }
-        
-        chat = response['Item']
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'chat': chat
-            }, cls=DecimalEncoder)
-        }
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Failed to get chat',
-                'error': str(e)
-            })
-        }
+    # Get chat_id from path parameters
+    chat_id = path_params(event).get('chat_id')
+
+    if not chat_id:
+        return error_response(400, 'chat_id is required')
+
+    # One window of messages, older than ?before=<seq> when paging back
+    params = query_params(event)
+    limit = parse_limit(params, DEFAULT_MESSAGE_LIMIT, MAX_MESSAGE_LIMIT)
+    before = int_param(params, 'before', 0)
+    if limit is None or before is None:
+        return error_response(400, 'limit and before must be integers')
+
+    # Get item from DynamoDB
+    result = table('TABLE_NAME').get_item(
+        Key={'chat_id': chat_id}
+    )
+
+    if 'Item' not in result:
+        return error_response(404, 'Chat not found')
+
+    chat = result['Item']
+
+    # One window of messages
+    key_condition = Key('chat_id').eq(chat_id)
+    if before:
+        key_condition = key_condition & Key('seq').lt(before)
+    page = table('MESSAGES_TABLE_NAME').query(
+        KeyConditionExpression=key_condition,
+        ScanIndexForward=False,
+        Limit=limit
+    )
+    messages = [
+        {'role': m['role'], 'content': m['content'], 'timestamp': m['timestamp'], 'seq': m['seq']}
+        for m in reversed(page.get('Items', []))
+    ]
+    has_more = 'LastEvaluatedKey' in page
+    # Chats created before messages moved to their own table keep them in the chat item;
+    # they come before every stored message, so they belong to the oldest window
+    legacy_messages = chat.pop('messages', [])
+    if not has_more:
+        messages = legacy_messages + messages
+    chat['messages'] = messages
+
+    return response(200, {
+        'chat': chat,
+        'has_more': has_more,
+        'next_before': messages[0]['seq'] if has_more else None
+    })
@@ -0,0 +1,223 @@
+"""
+Shared code for the API Lambdas, deployed as the common layer (terraform/modules/lambda-layer):
+responses with CORS headers, JSON encoding, lazily created boto3 clients and uniform errors.
+"""
+import base64
+import functools
+import hashlib
+import hmac
+import json
+import os
+import traceback
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    # Layer built without its requirements: same output, slower encoding
+    orjson = None
+
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type'
+}
+
+# botocore tuning shared by every client: keep-alive connections, a pool large enough for
+# parallel S3/DynamoDB calls, short connect timeout, standard retry mode with backoff
+MAX_POOL_CONNECTIONS = int(os.environ.get('BOTO_MAX_POOL_CONNECTIONS', '25'))
+CONNECT_TIMEOUT = float(os.environ.get('BOTO_CONNECT_TIMEOUT', '2'))
+READ_TIMEOUT = float(os.environ.get('BOTO_READ_TIMEOUT', '10'))
+MAX_ATTEMPTS = int(os.environ.get('BOTO_MAX_ATTEMPTS', '3'))
+
+# --- JSON ---
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj):
+    """JSON string for a response body; DynamoDB Decimals become int/float"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default).decode('utf-8')
+    return json.dumps(obj, default=_default)
+
+def parse_body(event):
+    return json.loads(event.get('body') or '{}')
+
+def path_params(event):
+    return event.get('pathParameters') or {}
+
+def query_params(event):
+    return event.get('queryStringParameters') or {}
+
+# --- RESPONSES ---
+def response(status_code, body):
+    return {
+        'statusCode': status_code,
+        'headers': CORS_HEADERS,
+        'body': dumps(body)
+    }
+
+def error_response(status_code, message):
+    return response(status_code, {'message': message})
+
+def api_handler(failure_message):
+    """
+    Wraps a lambda_handler: any uncaught exception is logged with its traceback and
+    returned as a 500 with failure_message, like every handler used to do by hand.
+    """
+    def decorate(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            try:
+                return handler(event, context)
+            except Exception as e:
+                print(f"Error: {str(e)}")
+                traceback.print_exc()
+                return response(500, {'message': failure_message, 'error': str(e)})
+        return wrapper
+    return decorate
+
+# --- AWS CLIENTS ---
+_clients = {}
+_tables = {}
+
+def _config():
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        retries={'mode': 'standard', 'max_attempts': MAX_ATTEMPTS},
+        tcp_keepalive=True
+    )
+
+def client(service_name):
+    """boto3 client created on first use and reused for the life of the container"""
+    if service_name not in _clients:
+        import boto3
+
+        _clients[service_name] = boto3.client(service_name, config=_config())
+    return _clients[service_name]
+
+def dynamodb():
+    if 'dynamodb-resource' not in _clients:
+        import boto3
+
+        _clients['dynamodb-resource'] = boto3.resource('dynamodb', config=_config())
+    return _clients['dynamodb-resource']
+
+def table(env_var):
+    """DynamoDB Table named by the environment variable"""
+    if env_var not in _tables:
+        _tables[env_var] = dynamodb().Table(os.environ[env_var])
+    return _tables[env_var]
+
+# --- PAGINATION ---
+def _cursor_signature(payload):
+    secret = os.environ['CURSOR_SECRET'].encode('utf-8')
+    return hmac.new(secret, payload.encode('ascii'), hashlib.sha256).hexdigest()
+
+def encode_cursor(last_evaluated_key, scope):
+    """Opaque next_cursor: the LastEvaluatedKey and the query it belongs to, HMAC-signed"""
+    payload = base64.urlsafe_b64encode(
+        dumps({'key': last_evaluated_key, 'scope': scope}).encode('utf-8')
+    ).decode('ascii')
+    return f"{payload}.{_cursor_signature(payload)}"
+
+def decode_cursor(cursor, scope):
+    """ExclusiveStartKey from a cursor issued for the same query, or None if it is invalid"""
+    try:
+        payload, signature = cursor.split('.')
+        if not hmac.compare_digest(signature, _cursor_signature(payload)):
+            return None
+        data = json.loads(base64.urlsafe_b64decode(payload.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        return None
+    return data['key'] if data.get('scope') == scope else None
+
+def int_param(params, name, default=None):
+    """Integer query parameter, default when absent, or None when it is not an integer"""
+    value = params.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def parse_limit(params, default_limit, max_limit):
+    """?limit= clamped to 1..max_limit, or None when it is not an integer"""
+    limit = int_param(params, 'limit', default_limit)
+    return None if limit is None else min(max(limit, 1), max_limit)
+
+def page_args(params, scope, default_limit, max_limit):
+    """
+    Query kwargs for one page (?limit=, ?cursor=), or None when the limit or cursor is invalid.
+    """
+    limit = parse_limit(params, default_limit, max_limit)
+    if limit is None:
+        return None
+    query_args = {'Limit': limit}
+    if params.get('cursor'):
+        start_key = decode_cursor(params['cursor'], scope)
+        if start_key is None:
+            return None
+        query_args['ExclusiveStartKey'] = start_key
+    return query_args
+
+def next_cursor(query_response, scope):
+    last_key = query_response.get('LastEvaluatedKey')
+    return encode_cursor(last_key, scope) if last_key else None
+
+# --- BATCH ---
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+BATCH_MAX_ATTEMPTS = 8
+
+def _backoff(attempt):
+    import time
+
+    time.sleep(min(0.05 * 2 ** attempt, 2.0))
+
+def batch_write(table_name, write_requests):
+    """
+    Sends PutRequest/DeleteRequest entries in batches of 25, resending unprocessed items
+    with exponential backoff. Returns the requests that were still unprocessed at the end.
+    """
+    ddb = dynamodb().meta.client
+    unprocessed = []
+    for start in range(0, len(write_requests), BATCH_WRITE_SIZE):
+        pending = {table_name: write_requests[start:start + BATCH_WRITE_SIZE]}
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            pending = ddb.batch_write_item(RequestItems=pending).get('UnprocessedItems') or {}
+            if not pending:
+                break
+            _backoff(attempt)
+        unprocessed.extend(pending.get(table_name, []))
+    return unprocessed
+
+def batch_get(table_name, keys, projection=None):
+    """Items for the keys (any order, missing ones left out), fetched 100 at a time"""
+    ddb = dynamodb().meta.client
+    items = []
+    for start in range(0, len(keys), BATCH_GET_SIZE):
+        request = {'Keys': keys[start:start + BATCH_GET_SIZE]}
+        if projection:
+            request['ProjectionExpression'] = projection
+        pending = {table_name: request}
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            result = ddb.batch_get_item(RequestItems=pending)
+            items.extend(result.get('Responses', {}).get(table_name, []))
+            pending = result.get('UnprocessedKeys') or {}
+            if not pending:
+                break
+            _backoff(attempt)
+        else:
+            raise RuntimeError(f"{len(pending[table_name]['Keys'])} keys still unprocessed after retries")
+    return items
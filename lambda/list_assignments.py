@@ -1,121 +1,105 @@
-import json
-import boto3
 import os
-from decimal import Decimal
+import time
 from boto3.dynamodb.conditions import Key
+from lambda_common import api_handler, client, error_response, next_cursor, page_args, path_params, query_params, response, table
 
-dynamodb = boto3.resource('dynamodb')
-s3 = boto3.client('s3')
-table = dynamodb.Table(os.environ['ASSIGNMENTS_TABLE_NAME'])
 bucket_name = os.environ['S3_BUCKET_NAME']
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Presigned GET URLs, reused across warm invocations while they stay valid long enough
+URL_EXPIRES = 3600
+URL_MIN_REMAINING = 900
+URL_CACHE_SIZE = 2048
+url_cache = {}  # file_key -> (url, expires_at)
 
+# Items per page (?limit=)
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 200
+
+def presigned_url(file_key):
+    """Cached presigned GET URL for the file; a new one is signed when the cached one is close to expiring"""
+    now = time.time()
+    cached = url_cache.get(file_key)
+    if cached and cached[1] - now > URL_MIN_REMAINING:
+        return cached[0]
+    url = client('s3').generate_presigned_url(
+        'get_object',
+        Params={
+            'Bucket': bucket_name,
+            'Key': file_key
+        },
+        ExpiresIn=URL_EXPIRES
+    )
+    if len(url_cache) >= URL_CACHE_SIZE:
+        # Dicts keep insertion order: drop the oldest entry
+        del url_cache[next(iter(url_cache))]
+    url_cache[file_key] = (url, now + URL_EXPIRES)
+    return url
+
+@api_handler('Failed to list assignments')
 def lambda_handler(event, context):
-    try:
-        # Get user_id from path parameters
-        user_id = event.get('pathParameters', {}).get('user_id')
-        
-        # Get optional query parameters
-        query_params = event.get('queryStringParameters', {}) or {}
-        class_id = query_params.get('class_id')
-        
-        if not user_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'user_id is required'
-                })
-            }
-        
-        # Query assignments - filter by class if provided
-        if class_id:
-            response = table.query(
-                IndexName='user_id-class_id-index',
-                KeyConditionExpression=Key('user_id').eq(user_id) & Key('class_id').eq(class_id)
-            )
-        else:
-            response = table.query(
-                KeyConditionExpression=Key('user_id').eq(user_id)
-            )
-        
-        assignments = response.get('Items', [])
-        
-        # Format assignments
-        formatted_assignments = []
-        for assignment in assignments:
-            formatted_assignment = {
-                'id': assignment['assignment_id'],
-                'title': assignment['title'],
-                'description': assignment.get('description', ''),
-                'class_id': assignment.get('class_id', ''),
-                'class_name': assignment.get('class_name', ''),
-                'due_date': assignment.get('due_date', ''),
-                'status': assignment.get('status', 'pending'),
-                'file_key': assignment.get('file_key', ''),
-                'file_name': assignment.get('file_name', ''),
-                'file_type': assignment.get('file_type', ''),
-                'created_at': assignment.get('created_at', ''),
-                'updated_at': assignment.get('updated_at', '')
-            }
-            
-            # Add file URL if file exists
-            if assignment.get('file_key'):
-                # Generate presigned URL (valid for 1 hour)
-                try:
-                    url = s3.generate_presigned_url(
-                        'get_object',
-                        Params={
-                            'Bucket': bucket_name,
-                            'Key': assignment['file_key']
-                        },
-                        ExpiresIn=3600
-                    )
-                    formatted_assignment['file_url'] = url
-                except Exception as e:
-                    print(f"Error generating presigned URL: {str(e)}")
-                    formatted_assignment['file_url'] = None
-            
-            formatted_assignments.append(formatted_assignment)
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'assignments': formatted_assignments,
-                'count': len(formatted_assignments)
-            }, cls=DecimalEncoder)
-        }
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Failed to list assignments',
-                'error': str(e)
-            })
+    # Get user_id from path parameters
+    user_id = path_params(event).get('user_id')
+
+    # Get optional query parameters
+    params = query_params(event)
+    class_id = params.get('class_id')
+    # ?include_urls=false lists without file URLs (fetch one with get_assignment when needed)
+    include_urls = params.get('include_urls', 'true').lower() != 'false'
+
+    if not user_id:
+        return error_response(400, 'user_id is required')
+
+    # Page size and position (?limit=, ?cursor= from the previous page's next_cursor)
+    scope = f"assignments:{user_id}:{class_id or ''}"
+    query_args = page_args(params, scope, DEFAULT_LIMIT, MAX_LIMIT)
+    if query_args is None:
+        return error_response(400, 'Invalid limit or cursor')
+
+    # Query assignments - filter by class if provided
+    if class_id:
+        result = table('ASSIGNMENTS_TABLE_NAME').query(
+            IndexName='user_id-class_id-index',
+            KeyConditionExpression=Key('user_id').eq(user_id) & Key('class_id').eq(class_id),
+            **query_args
+        )
+    else:
+        result = table('ASSIGNMENTS_TABLE_NAME').query(
+            KeyConditionExpression=Key('user_id').eq(user_id),
+            **query_args
+        )
+
+    assignments = result.get('Items', [])
+
+    # Format assignments
+    formatted_assignments = []
+    for assignment in assignments:
+        formatted_assignment = {
+            'id': assignment['assignment_id'],
+            'title': assignment['title'],
+            'description': assignment.get('description', ''),
+            'class_id': assignment.get('class_id', ''),
+            'class_name': assignment.get('class_name', ''),
+            'due_date': assignment.get('due_date', ''),
+            'status': assignment.get('status', 'pending'),
+            'file_key': assignment.get('file_key', ''),
+            'file_name': assignment.get('file_name', ''),
+            'file_type': assignment.get('file_type', ''),
+            'created_at': assignment.get('created_at', ''),
+            'updated_at': assignment.get('updated_at', '')
         }
+
+        # Add file URL if file exists
+        if include_urls and assignment.get('file_key'):
+            try:
+                formatted_assignment['file_url'] = presigned_url(assignment['file_key'])
+            except Exception as e:
+                print(f"Error generating presigned URL: {str(e)}")
+                formatted_assignment['file_url'] = None
+
+        formatted_assignments.append(formatted_assignment)
+
+    return response(200, {
+        'assignments': formatted_assignments,
+        'count': len(formatted_assignments),
+        'next_cursor': next_cursor(result, scope)
+    })
@@ -1,86 +1,68 @@
-import json
-import boto3
-import os
-from decimal import Decimal
 from boto3.dynamodb.conditions import Key
+from lambda_common import api_handler, error_response, next_cursor, page_args, query_params, response, table
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME'])
+# Attributes read for the chat list; all of them are projected into the GSI
+LIST_ATTRIBUTE_NAMES = {
+    '#chat_id': 'chat_id',
+    '#user_id': 'user_id',
+    '#title': 'title',
+    '#title_status': 'title_status',
+    '#created_at': 'created_at',
+    '#updated_at': 'updated_at',
+    '#message_count': 'message_count',
+    '#last_message_preview': 'last_message_preview'
+}
+LIST_PROJECTION = ', '.join(LIST_ATTRIBUTE_NAMES)
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return int(obj) if obj % 1 == 0 else float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Items per page (?limit=)
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 100
 
+@api_handler('Failed to list chats')
 def lambda_handler(event, context):
-    try:
-        # Get user_id from query parameters
-        query_params = event.get('queryStringParameters', {}) or {}
-        user_id = query_params.get('user_id')
-        
-        if not user_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-                },
-                'body': json.dumps({
-                    'message': 'user_id query parameter is required'
-                })
-            }
-        
-        # Query chats for the user using GSI
-        response = table.query(
-            IndexName='user_id-updated_at-index',
-            KeyConditionExpression=Key('user_id').eq(user_id),
-            ScanIndexForward=False  # Sort in descending order (most recent first)
-        )
-        
-        chats = response.get('Items', [])
-        
-        # Remove messages from list view for performance
-        chats_summary = []
-        for chat in chats:
-            chat_summary = {
-                'chat_id': chat['chat_id'],
-                'user_id': chat['user_id'],
-                'title': chat.get('title', 'Untitled Chat'),
-                'created_at': chat['created_at'],
-                'updated_at': chat['updated_at'],
-                'message_count': len(chat.get('messages', []))
-            }
-            chats_summary.append(chat_summary)
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                    'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'chats': chats_summary,
-                'count': len(chats_summary)
-            }, cls=DecimalEncoder)
-        }
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps({
-                'message': 'Failed to list chats',
-                'error': str(e)
-            })
+    # Get user_id from query parameters
+    params = query_params(event)
+    user_id = params.get('user_id')
+
+    if not user_id:
+        return error_response(400, 'user_id query parameter is required')
+
+    # Page size and position (?limit=, ?cursor= from the previous page's next_cursor)
+    scope = f"chats:{user_id}"
+    query_args = page_args(params, scope, DEFAULT_LIMIT, MAX_LIMIT)
+    if query_args is None:
+        return error_response(400, 'Invalid limit or cursor')
+
+    # Query chats for the user using GSI (projects only the summary fields below)
+    result = table('TABLE_NAME').query(
+        IndexName='user_id-updated_at-index',
+        KeyConditionExpression=Key('user_id').eq(user_id),
+        ProjectionExpression=LIST_PROJECTION,
+        ExpressionAttributeNames=LIST_ATTRIBUTE_NAMES,
+        ScanIndexForward=False,  # Sort in descending order (most recent first)
+        **query_args
+    )
+
+    chats = result.get('Items', [])
+
+    # message_count and last_message_preview are maintained on write by create_chat/append_message
+    # (backfilled on older chats by scripts/backfill_chat_summaries.py)
+    chats_summary = []
+    for chat in chats:
+        chat_summary = {
+            'chat_id': chat['chat_id'],
+            'user_id': chat['user_id'],
+            'title': chat.get('title', 'Untitled Chat'),
+            'title_status': chat.get('title_status', 'generated'),
+            'created_at': chat['created_at'],
+            'updated_at': chat['updated_at'],
+            'message_count': chat.get('message_count', 0),
+            'last_message_preview': chat.get('last_message_preview', '')
         }
+        chats_summary.append(chat_summary)
+
+    return response(200, {
+        'chats': chats_summary,
+        'count': len(chats_summary),
+        'next_cursor': next_cursor(result, scope)
+    })
@@ -0,0 +1,54 @@
+"""
+Single-function ("monolith") deployment of the API: API Gateway sends every route here and
+the route key picks the handler. The handler modules are the same files the per-function
+deployment ships one by one, so both layouts run identical code; here they share one
+container, its warm boto3 clients and connection pools (see terraform use_router_lambda).
+"""
+import importlib
+from lambda_common import error_response
+
+# API Gateway route key -> handler module
+ROUTES = {
+    # Chats
+    'POST /chats': 'create_chat',
+    'GET /chats/{chat_id}': 'get_chat',
+    'GET /chats': 'list_chats',
+    'DELETE /chats/{chat_id}': 'delete_chat',
+    'POST /chats/{chat_id}/messages': 'append_message',
+
+    # Classes
+    'GET /users/{user_id}/classes': 'get_all_classes',
+    'GET /users/{user_id}/classes/{class_id}': 'get_class_by_id',
+    'POST /users/{user_id}/classes': 'create_class',
+    'PUT /users/{user_id}/classes/{class_id}': 'update_class',
+    'DELETE /users/{user_id}/classes/{class_id}': 'delete_class',
+    'POST /users/{user_id}/classes/batch': 'batch_classes',
+    'PUT /users/{user_id}/classes/batch': 'batch_classes',
+    'POST /users/{user_id}/classes/batch/delete': 'batch_classes',
+
+    # Assignments
+    'GET /users/{user_id}/assignments': 'list_assignments',
+    'GET /users/{user_id}/assignments/{assignment_id}': 'get_assignment',
+    'POST /users/{user_id}/assignments': 'create_assignment',
+    'PUT /users/{user_id}/assignments/{assignment_id}': 'update_assignment',
+    'DELETE /users/{user_id}/assignments/{assignment_id}': 'delete_assignment',
+    'POST /users/{user_id}/assignments/{assignment_id}/upload': 'assignment_upload',
+    'POST /users/{user_id}/assignments/{assignment_id}/upload/complete': 'assignment_upload',
+    'POST /users/{user_id}/assignments/batch': 'batch_assignments',
+    'PUT /users/{user_id}/assignments/batch': 'batch_assignments',
+    'POST /users/{user_id}/assignments/batch/delete': 'batch_assignments',
+    'POST /users/{user_id}/assignments/batch/upload/complete': 'batch_assignments'
+}
+
+# Imported during init, so a cold start pays for every module once and no request pays for one later
+HANDLERS = {
+    route_key: importlib.import_module(module_name).lambda_handler
+    for route_key, module_name in ROUTES.items()
+}
+
+def lambda_handler(event, context):
+    route_key = event.get('routeKey', '')
+    handler = HANDLERS.get(route_key)
+    if handler is None:
+        return error_response(404, f"No handler for route {route_key}")
+    return handler(event, context)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+One-off backfill of the chat list fields for chats created before messages moved to their
+own table. Those chats have no message_count or last_message_preview, and the chat list
+reads only the user_id-updated_at-index GSI, which does not project the legacy messages
+list, so they show up with 0 messages and no preview until this runs.
+
+For every chat item without message_count, the fields are derived from its messages list:
+
+  python backfill_chat_summaries.py --dry-run
+  python backfill_chat_summaries.py
+
+Each update is conditional on message_count still being absent, so a chat that gets a new
+message while the backfill runs keeps the values append_message wrote. The legacy list is
+left in place (get_chat still returns it) and running the script again is safe.
+"""
+
+import os
+import json
+import argparse
+import subprocess
+from typing import Any, Dict, Optional
+import boto3
+from botocore.exceptions import ClientError
+
+# Same as create_chat.py / append_message.py
+PREVIEW_LENGTH = 200
+
+def terraform_output(terraform_dir: str, name: str) -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ['terraform', 'output', '-json'],
+            cwd=terraform_dir,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    output = json.loads(result.stdout).get(name)
+    return output['value'] if output else None
+
+def summary_of(chat: Dict[str, Any]) -> Dict[str, Any]:
+    """message_count, last_message_preview and last_message_role as append_message maintains them"""
+    messages = chat.get('messages', [])
+    last = messages[-1] if messages else {}
+    return {
+        'message_count': len(messages),
+        'last_message_preview': last.get('content', '')[:PREVIEW_LENGTH],
+        'last_message_role': last.get('role', 'user')
+    }
+
+def backfill(table_name: str, dry_run: bool = False) -> Dict[str, int]:
+    chats = boto3.resource('dynamodb').Table(table_name)
+    stats = {'scanned': 0, 'updated': 0, 'skipped': 0}
+    scan_args = {
+        'FilterExpression': 'attribute_not_exists(message_count)',
+        'ProjectionExpression': 'chat_id, messages'
+    }
+    while True:
+        page = chats.scan(**scan_args)
+        stats['scanned'] += page.get('ScannedCount', 0)
+        for chat in page.get('Items', []):
+            summary = summary_of(chat)
+            if dry_run:
+                print(f"{chat['chat_id']}: {summary['message_count']} messages")
+                stats['updated'] += 1
+                continue
+            try:
+                chats.update_item(
+                    Key={'chat_id': chat['chat_id']},
+                    UpdateExpression='SET message_count = :count, last_message_preview = :preview, last_message_role = :role',
+                    ConditionExpression='attribute_exists(chat_id) AND attribute_not_exists(message_count)',
+                    ExpressionAttributeValues={
+                        ':count': summary['message_count'],
+                        ':preview': summary['last_message_preview'],
+                        ':role': summary['last_message_role']
+                    }
+                )
+                stats['updated'] += 1
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                # Appended to (or deleted) since the scan read it
+                stats['skipped'] += 1
+        if 'LastEvaluatedKey' not in page:
+            return stats
+        scan_args['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Backfill message_count and last_message_preview on legacy chats',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument(
+        '--table',
+        type=str,
+        help='Chats table name (default: CHATS_TABLE_NAME env var, then terraform output dynamodb_chats_table_name)'
+    )
+
+    parser.add_argument(
+        '--terraform-dir',
+        type=str,
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'terraform'),
+        help='Terraform directory to read the table name from'
+    )
+
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='List the chats that would be updated without writing'
+    )
+
+    args = parser.parse_args()
+
+    table_name = args.table or os.environ.get('CHATS_TABLE_NAME') or terraform_output(
+        args.terraform_dir, 'dynamodb_chats_table_name'
+    )
+    if not table_name:
+        parser.error('No chats table: pass --table or set CHATS_TABLE_NAME')
+
+    stats = backfill(table_name, dry_run=args.dry_run)
+    action = 'Would update' if args.dry_run else 'Updated'
+    print(f"{action} {stats['updated']} chats ({stats['scanned']} scanned, {stats['skipped']} changed meanwhile)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Benchmark the deployed API: client-side latency per route and Lambda cold starts.
+
+Run it once per deployment layout and compare the saved results:
+
+  terraform apply -var use_router_lambda=false
+  python benchmark_lambda_layout.py --output-json per_function.json
+  terraform apply -var use_router_lambda=true
+  python benchmark_lambda_layout.py --output-json router.json
+  python benchmark_lambda_layout.py --compare per_function.json router.json
+
+Cold starts are counted from the "Init Duration" field of the REPORT lines in the
+functions' CloudWatch logs during the run.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import boto3
+import requests
+
+DEFAULT_API_BASE_URL = "https://YOUR_API_ENDPOINT/dev"
+DEFAULT_USER_ID = "benchmark-user"
+INIT_DURATION = re.compile(r"Init Duration: ([\d.]+) ms")
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50), 1),
+        'p95_ms': round(percentile(values, 95), 1),
+        'p99_ms': round(percentile(values, 99), 1),
+        'max_ms': round(max(values), 1) if values else 0.0
+    }
+
+def terraform_outputs(terraform_dir: str) -> Dict[str, Any]:
+    result = subprocess.run(
+        ['terraform', 'output', '-json'],
+        cwd=terraform_dir,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return {name: output['value'] for name, output in json.loads(result.stdout).items()}
+
+class LayoutBenchmark:
+    def __init__(self, api_base_url: str, user_id: str, function_names: List[str]):
+        self.api_base_url = api_base_url.rstrip('/')
+        self.user_id = user_id
+        self.function_names = function_names
+        self.session = requests.Session()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors = 0
+
+    def call(self, route: str, method: str, path: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """Times one request; route is the label results are grouped under"""
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.api_base_url}{path}", timeout=30, **kwargs)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.latencies.setdefault(route, []).append(elapsed)
+            if response.status_code >= 400:
+                self.errors += 1
+                return None
+            return response.json()
+        except requests.exceptions.RequestException:
+            self.errors += 1
+            return None
+
+    def request_mix(self, chat_id: str, i: int):
+        """One iteration of the workload: the sidebar reads plus one chat turn"""
+        self.call('GET /chats', 'GET', '/chats', params={'user_id': self.user_id})
+        self.call('GET /users/{user_id}/classes', 'GET', f"/users/{self.user_id}/classes")
+        self.call('GET /users/{user_id}/assignments', 'GET', f"/users/{self.user_id}/assignments",
+                  params={'include_urls': 'false'})
+        self.call('POST /chats/{chat_id}/messages', 'POST', f"/chats/{chat_id}/messages",
+                  json={'message': f"benchmark message {i}", 'role': 'user'})
+        self.call('GET /chats/{chat_id}', 'GET', f"/chats/{chat_id}", params={'limit': 20})
+
+    def run(self, iterations: int, concurrency: int, rounds: int, pause: float) -> Dict[str, Any]:
+        created = self.call('POST /chats', 'POST', '/chats',
+                            json={'message': 'benchmark chat', 'user_id': self.user_id})
+        if not created:
+            raise RuntimeError("Could not create the benchmark chat")
+        chat_id = created['chat_id']
+
+        start_ms = int(time.time() * 1000)
+        try:
+            for round_number in range(rounds):
+                if round_number and pause:
+                    # Idle long enough and Lambda recycles containers: the next round shows cold starts again
+                    print(f"Pausing {pause:.0f}s before round {round_number + 1}...")
+                    time.sleep(pause)
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    list(pool.map(lambda i: self.request_mix(chat_id, i), range(iterations)))
+                print(f"Round {round_number + 1}/{rounds} done")
+        finally:
+            self.call('DELETE /chats/{chat_id}', 'DELETE', f"/chats/{chat_id}")
+        end_ms = int(time.time() * 1000)
+
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        return {
+            'function_names': self.function_names,
+            'requests': len(all_latencies),
+            'errors': self.errors,
+            'overall': latency_summary(all_latencies),
+            'routes': {route: latency_summary(values) for route, values in sorted(self.latencies.items())},
+            'start_ms': start_ms,
+            'end_ms': end_ms
+        }
+
+def cold_starts(function_names: List[str], start_ms: int, end_ms: int, region: Optional[str]) -> Dict[str, Any]:
+    """Init durations from the REPORT lines each function logged between start_ms and end_ms"""
+    logs = boto3.client('logs', region_name=region)
+    init_durations = {}
+    for function_name in function_names:
+        durations = []
+        paginator = logs.get_paginator('filter_log_events')
+        for page in paginator.paginate(
+            logGroupName=f"/aws/lambda/{function_name}",
+            startTime=start_ms,
+            endTime=end_ms,
+            filterPattern='"Init Duration"'
+        ):
+            for log_event in page.get('events', []):
+                match = INIT_DURATION.search(log_event['message'])
+                if match:
+                    durations.append(float(match.group(1)))
+        init_durations[function_name] = durations
+
+    all_durations = [value for values in init_durations.values() for value in values]
+    return {
+        'count': len(all_durations),
+        'mean_init_ms': round(sum(all_durations) / len(all_durations), 1) if all_durations else 0.0,
+        'per_function': {name: len(values) for name, values in init_durations.items() if values}
+    }
+
+def print_result(label: str, result: Dict[str, Any]):
+    overall = result['overall']
+    print(f"\n=== {label} ({len(result['function_names'])} function(s)) ===")
+    print(f"Requests: {result['requests']}  errors: {result['errors']}")
+    print(f"Latency p50 {overall['p50_ms']} ms  p95 {overall['p95_ms']} ms  "
+          f"p99 {overall['p99_ms']} ms  max {overall['max_ms']} ms")
+    starts = result['cold_starts']
+    print(f"Cold starts: {starts['count']} "
+          f"({100 * starts['count'] / max(result['requests'], 1):.2f}% of requests), "
+          f"mean init {starts['mean_init_ms']} ms")
+    for route, summary in result['routes'].items():
+        print(f"  {route:<40} p50 {summary['p50_ms']:>7} ms  p99 {summary['p99_ms']:>7} ms  n={summary['count']}")
+
+def compare(paths: List[str]):
+    results = []
+    for path in paths:
+        with open(path) as f:
+            results.append(json.load(f))
+    print(f"{'layout':<20} {'requests':>9} {'cold starts':>12} {'cold %':>7} {'init ms':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for result in results:
+        starts = result['cold_starts']
+        print(f"{result['label']:<20} {result['requests']:>9} {starts['count']:>12} "
+              f"{100 * starts['count'] / max(result['requests'], 1):>6.2f}% {starts['mean_init_ms']:>8} "
+              f"{result['overall']['p50_ms']:>8} {result['overall']['p99_ms']:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare cold starts and latency of the per-function and router Lambda layouts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+
+    parser.add_argument(
+        '--api-url',
+        type=str,
+        help='API base URL (default: API_BASE_URL env var, then terraform output api_endpoint)'
+    )
+
+    parser.add_argument(
+        '--user-id',
+        type=str,
+        default=os.environ.get('USER_ID', DEFAULT_USER_ID),
+        help='User ID the benchmark reads and writes as (default: from USER_ID env var or "benchmark-user")'
+    )
+
+    parser.add_argument(
+        '--terraform-dir',
+        type=str,
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'terraform'),
+        help='Terraform directory to read the endpoint and function names from'
+    )
+
+    parser.add_argument(
+        '--functions',
+        nargs='+',
+        help='Lambda function names to count cold starts for (default: from terraform outputs)'
+    )
+
+    parser.add_argument(
+        '--iterations', '-n',
+        type=int,
+        default=100,
+        help='Workload iterations per round, 6 requests each (default: 100)'
+    )
+
+    parser.add_argument(
+        '--concurrency', '-c',
+        type=int,
+        default=8,
+        help='Concurrent clients (default: 8)'
+    )
+
+    parser.add_argument(
+        '--rounds',
+        type=int,
+        default=1,
+        help='Rounds of the workload (default: 1)'
+    )
+
+    parser.add_argument(
+        '--pause',
+        type=float,
+        default=0,
+        help='Seconds to idle between rounds (default: 0)'
+    )
+
+    parser.add_argument(
+        '--log-delay',
+        type=float,
+        default=20,
+        help='Seconds to wait for CloudWatch to receive the last REPORT lines (default: 20)'
+    )
+
+    parser.add_argument(
+        '--region',
+        type=str,
+        default=os.environ.get('AWS_REGION'),
+        help='AWS region of the functions (default: AWS_REGION env var or the boto3 default)'
+    )
+
+    parser.add_argument(
+        '--output-json',
+        type=str,
+        help='Save results to JSON file'
+    )
+
+    parser.add_argument(
+        '--compare',
+        nargs='+',
+        metavar='RESULT_JSON',
+        help='Print saved results side by side instead of running'
+    )
+
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    outputs = {}
+    if not args.api_url or not args.functions:
+        try:
+            outputs = terraform_outputs(args.terraform_dir)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error reading terraform outputs: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    api_url = args.api_url or os.environ.get('API_BASE_URL') or outputs.get('api_endpoint', DEFAULT_API_BASE_URL)
+    if args.functions:
+        function_names = args.functions
+        label = 'custom'
+    elif outputs.get('router_function_name'):
+        function_names = [outputs['router_function_name']]
+        label = 'router'
+    else:
+        function_names = list(outputs.get('lambda_function_names', {}).values())
+        label = 'per-function'
+
+    print(f"Benchmarking {api_url} ({label}: {', '.join(function_names)})")
+    benchmark = LayoutBenchmark(api_url, args.user_id, function_names)
+    result = benchmark.run(args.iterations, args.concurrency, args.rounds, args.pause)
+
+    print(f"Waiting {args.log_delay:.0f}s for CloudWatch logs...")
+    time.sleep(args.log_delay)
+    result['cold_starts'] = cold_starts(function_names, result['start_ms'], result['end_ms'] + 60000, args.region)
+    result['label'] = label
+
+    print_result(label, result)
+
+    if args.output_json:
+        with open(args.output_json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults saved to: {args.output_json}")
+
+if __name__ == "__main__":
+    main()
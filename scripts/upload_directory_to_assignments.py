@@ -1,27 +1,33 @@
 #!/usr/bin/env python3
 """
 Upload all files from a directory to the assignments API.
-Each file will be created as a separate assignment with metadata.
+Each file will be created as a separate assignment with metadata; assignments are
+created 100 per request through the batch endpoint and the files uploaded in parallel.
 """
 
 import os
 import sys
 import json
-import base64
 import argparse
 import mimetypes
 from pathlib import Path
 from datetime import datetime, timedelta
 import requests
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List
 
 # Default configuration
 DEFAULT_API_BASE_URL = "https://YOUR_API_ENDPOINT/dev"
 DEFAULT_USER_ID = "user123"
+# Assignments per batch request (the API's limit)
+BATCH_SIZE = 100
+DEFAULT_WORKERS = 8
 
 class AssignmentUploader:
-    def __init__(self, api_base_url: str, user_id: str, class_id: Optional[str] = None):
+    def __init__(self, api_base_url: str, user_id: str, class_id: Optional[str] = None,
+                 workers: int = DEFAULT_WORKERS):
         self.api_base_url = api_base_url.rstrip('/')
+        self.workers = workers
         self.user_id = user_id
         self.class_id = class_id or "default-class"
         self.class_name = "Imported Documents"
@@ -38,92 +44,145 @@ class AssignmentUploader:
             'modified_time': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
         }
     
-    def read_file_content(self, file_path: Path, file_type: str) -> tuple[str, Optional[str]]:
+    def upload_file(self, assignment_id: str, file_path: Path, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Read file content and determine encoding.
-        Returns (content, encoding) where encoding is 'base64' or None for text.
+        Upload the file straight to S3 with presigned URLs, then attach it to the assignment.
+        Large files are sent in parts.
         """
-        # Text-based files
-        text_types = [
-            'text/', 'application/json', 'application/xml',
-            'application/javascript', 'application/x-yaml'
-        ]
-        
-        is_text = any(file_type.startswith(t) for t in text_types)
+        base = f"{self.api_base_url}/users/{self.user_id}/assignments/{assignment_id}/upload"
+        response = requests.post(
+            base,
+            json={
+                'file_name': metadata['file_name'],
+                'file_type': metadata['file_type'],
+                'file_size': metadata['file_size']
+            },
+            timeout=30
+        )
+        response.raise_for_status()
+        upload = response.json()
         
-        if is_text:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                return content, None
-            except UnicodeDecodeError:
-                # Fallback to binary if text decode fails
-                pass
+        completion = {'file_key': upload['file_key']}
+        if upload['method'] == 'PUT':
+            with open(file_path, 'rb') as f:
+                put = requests.put(upload['url'], data=f, headers=upload['headers'], timeout=300)
+            put.raise_for_status()
+        else:
+            parts = []
+            with open(file_path, 'rb') as f:
+                for part in upload['parts']:
+                    put = requests.put(part['url'], data=f.read(upload['part_size']), timeout=300)
+                    put.raise_for_status()
+                    parts.append({'part_number': part['part_number'], 'etag': put.headers['ETag']})
+            completion.update({'upload_id': upload['upload_id'], 'parts': parts})
         
-        # Binary files
-        with open(file_path, 'rb') as f:
-            binary_content = f.read()
-            encoded_content = base64.b64encode(binary_content).decode('utf-8')
-            return encoded_content, 'base64'
+        response = requests.post(f"{base}/complete", json=completion, timeout=30)
+        response.raise_for_status()
+        return response.json()
     
-    def create_assignment(
+    def assignment_data(
         self,
         file_path: Path,
+        metadata: Dict[str, Any],
         title: Optional[str] = None,
         description: Optional[str] = None,
         due_date: Optional[str] = None,
         status: str = 'pending',
         notes: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Create an assignment with file upload."""
-        
-        metadata = self.get_file_metadata(file_path)
-        
-        # Read file content
-        file_content, encoding = self.read_file_content(file_path, metadata['file_type'])
-        
-        # Prepare assignment data
-        assignment_data = {
+        """Assignment fields for a file (the file itself goes to S3 separately)."""
+        return {
             'title': title or file_path.stem,
             'description': description or f"Uploaded from {file_path.name}",
             'class_id': self.class_id,
             'class_name': self.class_name,
             'due_date': due_date or (datetime.now() + timedelta(days=7)).isoformat(),
             'status': status,
-            'notes': notes or f"File size: {metadata['file_size']} bytes\nModified: {metadata['modified_time']}",
-            'file_content': file_content,
-            'file_name': metadata['file_name'],
-            'file_type': metadata['file_type']
+            'notes': notes or f"File size: {metadata['file_size']} bytes\nModified: {metadata['modified_time']}"
         }
+    
+    def put_file(self, file_path: Path, upload: Dict[str, Any]):
+        """Send the file to its presigned PUT URL."""
+        with open(file_path, 'rb') as f:
+            put = requests.put(upload['url'], data=f, headers=upload['headers'], timeout=300)
+        put.raise_for_status()
+    
+    def create_batch(self, files: List[Path]) -> Dict[str, Any]:
+        """
+        Create assignments for up to BATCH_SIZE files with one request, upload the files in
+        parallel and record them with one more request.
+        """
+        base = f"{self.api_base_url}/users/{self.user_id}/assignments/batch"
+        metadata = [self.get_file_metadata(file_path) for file_path in files]
+        entries = [
+            dict(self.assignment_data(file_path, meta),
+                 file_name=meta['file_name'], file_type=meta['file_type'], file_size=meta['file_size'])
+            for file_path, meta in zip(files, metadata)
+        ]
         
-        if encoding:
-            assignment_data['file_encoding'] = encoding
+        response = requests.post(base, json={'assignments': entries}, timeout=60)
+        response.raise_for_status()
+        created = response.json()
         
-        # Make API request
-        url = f"{self.api_base_url}/users/{self.user_id}/assignments"
+        # Created assignments come back in request order, without the failed positions
+        failed_positions = set(created.get('failed', []))
+        written = [i for i in range(len(files)) if i not in failed_positions]
+        assignments = dict(zip(written, created['assignments']))
         
-        print(f"Uploading {file_path.name}... ", end='', flush=True)
+        def send(i: int) -> Optional[Dict[str, Any]]:
+            assignment = assignments[i]
+            if assignment.get('upload'):
+                self.put_file(files[i], assignment['upload'])
+                return {'assignment_id': assignment['id'], 'file_key': assignment['upload']['file_key']}
+            if assignment.get('upload_error', {}).get('code') == 'file_too_large':
+                # The per-assignment multipart flow records the file itself
+                self.upload_file(assignment['id'], files[i], metadata[i])
+                return None
+            raise ValueError(assignment.get('upload_error', {}).get('message', 'no upload URL returned'))
         
-        try:
-            response = requests.post(
-                url,
-                json=assignment_data,
-                headers={'Content-Type': 'application/json'},
-                timeout=60
-            )
-            
-            if response.status_code in [200, 201]:
-                result = response.json()
-                print(f"✓ Success (ID: {result.get('id', 'unknown')})")
-                return result
+        uploaded, upload_errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(send, i): i for i in assignments}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    uploaded[i] = future.result()
+                except (requests.exceptions.RequestException, OSError, ValueError) as e:
+                    upload_errors[i] = str(e)
+        
+        completions = [upload for upload in uploaded.values() if upload]
+        if completions:
+            try:
+                response = requests.post(f"{base}/upload/complete", json={'uploads': completions}, timeout=60)
+                response.raise_for_status()
+                failures = response.json().get('failed', [])
+            except requests.exceptions.RequestException as e:
+                # The assignments exist and their files are in S3; only recording the files failed
+                failures = [
+                    {'id': upload['assignment_id'], 'message': f"file uploaded but not recorded: {e}"}
+                    for upload in completions
+                ]
+            for failure in failures:
+                i = next(i for i, a in assignments.items() if a['id'] == failure['id'])
+                upload_errors[i] = failure['message']
+        
+        successful, failed = [], []
+        for i, file_path in enumerate(files):
+            if i in assignments and i not in upload_errors:
+                print(f"  ✓ {file_path.name} (ID: {assignments[i]['id']})")
+                successful.append({
+                    'file': str(file_path),
+                    'assignment_id': assignments[i]['id'],
+                    'title': assignments[i]['title']
+                })
+            elif i in assignments:
+                # The assignment was created; only its file is missing
+                print(f"  ✗ {file_path.name} (ID: {assignments[i]['id']}): {upload_errors[i]}")
+                failed.append(str(file_path))
             else:
-                print(f"✗ Failed (Status: {response.status_code})")
-                print(f"  Error: {response.text}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
-            print(f"✗ Error: {str(e)}")
-            return None
+                print(f"  ✗ {file_path.name}: assignment was not created")
+                failed.append(str(file_path))
+        return {'successful': successful, 'failed': failed}
     
     def upload_directory(
         self,
@@ -169,19 +228,18 @@ class AssignmentUploader:
             'total': len(files)
         }
         
-        for i, file_path in enumerate(files, 1):
-            print(f"[{i}/{len(files)}] ", end='')
+        for start in range(0, len(files), BATCH_SIZE):
+            batch = files[start:start + BATCH_SIZE]
+            print(f"[{start + 1}-{start + len(batch)}/{len(files)}] Uploading {len(batch)} file(s)...")
             
-            result = self.create_assignment(file_path)
+            try:
+                batch_results = self.create_batch(batch)
+            except requests.exceptions.RequestException as e:
+                print(f"  ✗ Batch failed: {str(e)}")
+                batch_results = {'successful': [], 'failed': [str(f) for f in batch]}
             
-            if result:
-                results['successful'].append({
-                    'file': str(file_path),
-                    'assignment_id': result.get('id'),
-                    'title': result.get('title')
-                })
-            else:
-                results['failed'].append(str(file_path))
+            results['successful'].extend(batch_results['successful'])
+            results['failed'].extend(batch_results['failed'])
         
         # Summary
         print("\n" + "=" * 60)
@@ -272,6 +330,13 @@ Examples:
         help='Filter by file extensions (e.g., .pdf .txt .docx)'
     )
     
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Files uploaded in parallel (default: {DEFAULT_WORKERS})'
+    )
+    
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -300,7 +365,8 @@ Examples:
     uploader = AssignmentUploader(
         api_base_url=args.api_url,
         user_id=args.user_id,
-        class_id=args.class_id
+        class_id=args.class_id,
+        workers=args.workers
     )
     
     if args.class_name:
@@ -8,6 +8,10 @@ terraform {
       source  = "hashicorp/archive"
       version = "~> 2.0"
     }
+    random = {
+      source  = "hashicorp/random"
+      version = "~> 3.0"
+    }
   }
 }
 
@@ -39,6 +43,20 @@ module "dynamodb_assignments" {
   environment  = var.environment
 }
 
+# Key that list endpoints use to sign their pagination cursors
+resource "random_password" "cursor_secret" {
+  length  = 48
+  special = false
+}
+
+# Lambda Layer (shared handler code)
+module "lambda_layer" {
+  source = "./modules/lambda-layer"
+
+  project_name = var.project_name
+  environment  = var.environment
+}
+
 # IAM Module
 module "iam" {
   source = "./modules/iam"
@@ -47,6 +65,8 @@ module "iam" {
   environment           = var.environment
   dynamodb_table_arn    = module.dynamodb.table_arn
   dynamodb_gsi_arn      = module.dynamodb.gsi_arn
+  messages_table_arn    = module.dynamodb.messages_table_arn
+  dynamodb_stream_arn   = module.dynamodb.stream_arn
   classes_table_arn     = module.dynamodb_classes.table_arn
   classes_gsi_arn       = module.dynamodb_classes.gsi_arn
   assignments_table_arn = module.dynamodb_assignments.table_arn
@@ -70,6 +90,10 @@ module "lambda" {
   environment         = var.environment
   lambda_role_arn     = module.iam.lambda_role_arn
   dynamodb_table_name = module.dynamodb.table_name
+  messages_table_name = module.dynamodb.messages_table_name
+  dynamodb_stream_arn = module.dynamodb.stream_arn
+  cursor_secret       = random_password.cursor_secret.result
+  common_layer_arn    = module.lambda_layer.layer_arn
   api_execution_arn   = module.api_gateway.execution_arn
 }
 
@@ -81,6 +105,8 @@ module "lambda_classes" {
   environment         = var.environment
   lambda_role_arn     = module.iam.lambda_role_arn
   classes_table_name  = module.dynamodb_classes.table_name
+  cursor_secret       = random_password.cursor_secret.result
+  common_layer_arn    = module.lambda_layer.layer_arn
   api_execution_arn   = module.api_gateway.execution_arn
 }
 
@@ -93,9 +119,35 @@ module "lambda_assignments" {
   lambda_role_arn        = module.iam.lambda_role_arn
   assignments_table_name = module.dynamodb_assignments.table_name
   s3_bucket_name         = module.s3.bucket_name
+  cursor_secret          = random_password.cursor_secret.result
+  common_layer_arn       = module.lambda_layer.layer_arn
   api_execution_arn      = module.api_gateway.execution_arn
 }
 
+# Lambda Module (Router): one function serving every API route, only with use_router_lambda
+module "lambda_router" {
+  source = "./modules/lambda-router"
+  count  = var.use_router_lambda ? 1 : 0
+
+  project_name           = var.project_name
+  environment            = var.environment
+  lambda_role_arn        = module.iam.lambda_role_arn
+  dynamodb_table_name    = module.dynamodb.table_name
+  messages_table_name    = module.dynamodb.messages_table_name
+  classes_table_name     = module.dynamodb_classes.table_name
+  assignments_table_name = module.dynamodb_assignments.table_name
+  s3_bucket_name         = module.s3.bucket_name
+  cursor_secret          = random_password.cursor_secret.result
+  common_layer_arn       = module.lambda_layer.layer_arn
+  api_execution_arn      = module.api_gateway.execution_arn
+}
+
+locals {
+  # With the router enabled every route integrates with it; otherwise null and coalesce()
+  # below falls through to the route's own function
+  router_invoke_arn = var.use_router_lambda ? module.lambda_router[0].router_invoke_arn : null
+}
+
 # API Gateway Module
 module "api_gateway" {
   source = "./modules/api-gateway"
@@ -104,11 +156,11 @@ module "api_gateway" {
   environment  = var.environment
 
   # Chat Lambda function ARNs
-  create_chat_invoke_arn    = module.lambda.create_chat_invoke_arn
-  get_chat_invoke_arn       = module.lambda.get_chat_invoke_arn
-  list_chats_invoke_arn     = module.lambda.list_chats_invoke_arn
-  delete_chat_invoke_arn    = module.lambda.delete_chat_invoke_arn
-  append_message_invoke_arn = module.lambda.append_message_invoke_arn
+  create_chat_invoke_arn    = coalesce(local.router_invoke_arn, module.lambda.create_chat_invoke_arn)
+  get_chat_invoke_arn       = coalesce(local.router_invoke_arn, module.lambda.get_chat_invoke_arn)
+  list_chats_invoke_arn     = coalesce(local.router_invoke_arn, module.lambda.list_chats_invoke_arn)
+  delete_chat_invoke_arn    = coalesce(local.router_invoke_arn, module.lambda.delete_chat_invoke_arn)
+  append_message_invoke_arn = coalesce(local.router_invoke_arn, module.lambda.append_message_invoke_arn)
 
   # Chat Lambda function names
   create_chat_function_name    = module.lambda.create_chat_function_name
@@ -118,11 +170,12 @@ module "api_gateway" {
   append_message_function_name = module.lambda.append_message_function_name
 
   # Classes Lambda function ARNs
-  get_all_classes_invoke_arn = module.lambda_classes.get_all_classes_invoke_arn
-  get_class_by_id_invoke_arn = module.lambda_classes.get_class_by_id_invoke_arn
-  create_class_invoke_arn    = module.lambda_classes.create_class_invoke_arn
-  update_class_invoke_arn    = module.lambda_classes.update_class_invoke_arn
-  delete_class_invoke_arn    = module.lambda_classes.delete_class_invoke_arn
+  get_all_classes_invoke_arn = coalesce(local.router_invoke_arn, module.lambda_classes.get_all_classes_invoke_arn)
+  get_class_by_id_invoke_arn = coalesce(local.router_invoke_arn, module.lambda_classes.get_class_by_id_invoke_arn)
+  create_class_invoke_arn    = coalesce(local.router_invoke_arn, module.lambda_classes.create_class_invoke_arn)
+  update_class_invoke_arn    = coalesce(local.router_invoke_arn, module.lambda_classes.update_class_invoke_arn)
+  delete_class_invoke_arn    = coalesce(local.router_invoke_arn, module.lambda_classes.delete_class_invoke_arn)
+  batch_classes_invoke_arn   = coalesce(local.router_invoke_arn, module.lambda_classes.batch_classes_invoke_arn)
 
   # Classes Lambda function names
   get_all_classes_function_name = module.lambda_classes.get_all_classes_function_name
@@ -130,13 +183,16 @@ module "api_gateway" {
   create_class_function_name    = module.lambda_classes.create_class_function_name
   update_class_function_name    = module.lambda_classes.update_class_function_name
   delete_class_function_name    = module.lambda_classes.delete_class_function_name
+  batch_classes_function_name   = module.lambda_classes.batch_classes_function_name
 
   # Assignments Lambda function ARNs
-  list_assignments_invoke_arn  = module.lambda_assignments.list_assignments_invoke_arn
-  get_assignment_invoke_arn    = module.lambda_assignments.get_assignment_invoke_arn
-  create_assignment_invoke_arn = module.lambda_assignments.create_assignment_invoke_arn
-  update_assignment_invoke_arn = module.lambda_assignments.update_assignment_invoke_arn
-  delete_assignment_invoke_arn = module.lambda_assignments.delete_assignment_invoke_arn
+  list_assignments_invoke_arn  = coalesce(local.router_invoke_arn, module.lambda_assignments.list_assignments_invoke_arn)
+  get_assignment_invoke_arn    = coalesce(local.router_invoke_arn, module.lambda_assignments.get_assignment_invoke_arn)
+  create_assignment_invoke_arn = coalesce(local.router_invoke_arn, module.lambda_assignments.create_assignment_invoke_arn)
+  update_assignment_invoke_arn = coalesce(local.router_invoke_arn, module.lambda_assignments.update_assignment_invoke_arn)
+  delete_assignment_invoke_arn = coalesce(local.router_invoke_arn, module.lambda_assignments.delete_assignment_invoke_arn)
+  assignment_upload_invoke_arn = coalesce(local.router_invoke_arn, module.lambda_assignments.assignment_upload_invoke_arn)
+  batch_assignments_invoke_arn = coalesce(local.router_invoke_arn, module.lambda_assignments.batch_assignments_invoke_arn)
 
   # Assignments Lambda function names
   list_assignments_function_name  = module.lambda_assignments.list_assignments_function_name
@@ -144,4 +200,6 @@ module "api_gateway" {
   create_assignment_function_name = module.lambda_assignments.create_assignment_function_name
   update_assignment_function_name = module.lambda_assignments.update_assignment_function_name
   delete_assignment_function_name = module.lambda_assignments.delete_assignment_function_name
+  assignment_upload_function_name = module.lambda_assignments.assignment_upload_function_name
+  batch_assignments_function_name = module.lambda_assignments.batch_assignments_function_name
 }
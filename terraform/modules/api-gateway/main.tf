@@ -202,6 +202,33 @@ resource "aws_apigatewayv2_route" "delete_class_route" {
   target    = "integrations/${aws_apigatewayv2_integration.delete_class_integration.id}"
 }
 
+# Bulk create (POST .../batch), update (PUT .../batch) and delete (POST .../batch/delete)
+resource "aws_apigatewayv2_integration" "batch_classes_integration" {
+  api_id             = aws_apigatewayv2_api.chat_api.id
+  integration_type   = "AWS_PROXY"
+  integration_uri    = var.batch_classes_invoke_arn
+  integration_method = "POST"
+  payload_format_version = "2.0"
+}
+
+resource "aws_apigatewayv2_route" "batch_create_classes_route" {
+  api_id    = aws_apigatewayv2_api.chat_api.id
+  route_key = "POST /users/{user_id}/classes/batch"
+  target    = "integrations/${aws_apigatewayv2_integration.batch_classes_integration.id}"
+}
+
+resource "aws_apigatewayv2_route" "batch_update_classes_route" {
+  api_id    = aws_apigatewayv2_api.chat_api.id
+  route_key = "PUT /users/{user_id}/classes/batch"
+  target    = "integrations/${aws_apigatewayv2_integration.batch_classes_integration.id}"
+}
+
+resource "aws_apigatewayv2_route" "batch_delete_classes_route" {
+  api_id    = aws_apigatewayv2_api.chat_api.id
+  route_key = "POST /users/{user_id}/classes/batch/delete"
+  target    = "integrations/${aws_apigatewayv2_integration.batch_classes_integration.id}"
+}
+
 # ==================== ASSIGNMENTS INTEGRATIONS ====================
 
 resource "aws_apigatewayv2_integration" "list_assignments_integration" {
@@ -244,6 +271,14 @@ resource "aws_apigatewayv2_integration" "delete_assignment_integration" {
   payload_format_version = "2.0"
 }
 
+resource "aws_apigatewayv2_integration" "assignment_upload_integration" {
+  api_id             = aws_apigatewayv2_api.chat_api.id
+  integration_type   = "AWS_PROXY"
+  integration_uri    = var.assignment_upload_invoke_arn
+  integration_method = "POST"
+  payload_format_version = "2.0"
+}
+
 # ==================== ASSIGNMENTS ROUTES ====================
 
 resource "aws_apigatewayv2_route" "list_assignments_route" {
@@ -275,3 +310,49 @@ resource "aws_apigatewayv2_route" "delete_assignment_route" {
   route_key = "DELETE /users/{user_id}/assignments/{assignment_id}"
   target    = "integrations/${aws_apigatewayv2_integration.delete_assignment_integration.id}"
 }
+
+resource "aws_apigatewayv2_route" "assignment_upload_route" {
+  api_id    = aws_apigatewayv2_api.chat_api.id
+  route_key = "POST /users/{user_id}/assignments/{assignment_id}/upload"
+  target    = "integrations/${aws_apigatewayv2_integration.assignment_upload_integration.id}"
+}
+
+resource "aws_apigatewayv2_route" "assignment_upload_complete_route" {
+  api_id    = aws_apigatewayv2_api.chat_api.id
+  route_key = "POST /users/{user_id}/assignments/{assignment_id}/upload/complete"
+  target    = "integrations/${aws_apigatewayv2_integration.assignment_upload_integration.id}"
+}
+
+# Bulk create (POST .../batch), update (PUT .../batch), delete (POST .../batch/delete)
+# and upload completion (POST .../batch/upload/complete)
+resource "aws_apigatewayv2_integration" "batch_assignments_integration" {
+  api_id             = aws_apigatewayv2_api.chat_api.id
+  integration_type   = "AWS_PROXY"
+  integration_uri    = var.batch_assignments_invoke_arn
+  integration_method = "POST"
+  payload_format_version = "2.0"
+}
+
+resource "aws_apigatewayv2_route" "batch_create_assignments_route" {
+  api_id    = aws_apigatewayv2_api.chat_api.id
+  route_key = "POST /users/{user_id}/assignments/batch"
+  target    = "integrations/${aws_apigatewayv2_integration.batch_assignments_integration.id}"
+}
+
+resource "aws_apigatewayv2_route" "batch_update_assignments_route" {
+  api_id    = aws_apigatewayv2_api.chat_api.id
+  route_key = "PUT /users/{user_id}/assignments/batch"
+  target    = "integrations/${aws_apigatewayv2_integration.batch_assignments_integration.id}"
+}
+
+resource "aws_apigatewayv2_route" "batch_delete_assignments_route" {
+  api_id    = aws_apigatewayv2_api.chat_api.id
+  route_key = "POST /users/{user_id}/assignments/batch/delete"
+  target    = "integrations/${aws_apigatewayv2_integration.batch_assignments_integration.id}"
+}
+
+resource "aws_apigatewayv2_route" "batch_complete_uploads_route" {
+  api_id    = aws_apigatewayv2_api.chat_api.id
+  route_key = "POST /users/{user_id}/assignments/batch/upload/complete"
+  target    = "integrations/${aws_apigatewayv2_integration.batch_assignments_integration.id}"
+}
@@ -162,3 +162,33 @@ variable "delete_assignment_function_name" {
   description = "Delete Assignment Lambda function name"
   type        = string
 }
+
+variable "assignment_upload_invoke_arn" {
+  description = "Assignment Upload Lambda invoke ARN"
+  type        = string
+}
+
+variable "assignment_upload_function_name" {
+  description = "Assignment Upload Lambda function name"
+  type        = string
+}
+
+variable "batch_classes_invoke_arn" {
+  description = "Batch Classes Lambda invoke ARN"
+  type        = string
+}
+
+variable "batch_classes_function_name" {
+  description = "Batch Classes Lambda function name"
+  type        = string
+}
+
+variable "batch_assignments_invoke_arn" {
+  description = "Batch Assignments Lambda invoke ARN"
+  type        = string
+}
+
+variable "batch_assignments_function_name" {
+  description = "Batch Assignments Lambda function name"
+  type        = string
+}
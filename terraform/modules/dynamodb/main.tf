@@ -3,6 +3,10 @@ resource "aws_dynamodb_table" "chats_table" {
   billing_mode   = "PAY_PER_REQUEST"
   hash_key       = "chat_id"
 
+  # New chats are picked up by the generate_chat_title Lambda
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
+
   attribute {
     name = "chat_id"
     type = "S"
@@ -18,11 +22,15 @@ resource "aws_dynamodb_table" "chats_table" {
     type = "S"
   }
 
+  # Only the fields the chat list shows (see list_chats.py), not metadata or legacy message lists.
+  # Changing the projection makes DynamoDB delete and rebuild the index: list_chats fails until
+  # the new index is ACTIVE. Chats older than message_count need scripts/backfill_chat_summaries.py.
   global_secondary_index {
-    name            = "user_id-updated_at-index"
-    hash_key        = "user_id"
-    range_key       = "updated_at"
-    projection_type = "ALL"
+    name               = "user_id-updated_at-index"
+    hash_key           = "user_id"
+    range_key          = "updated_at"
+    projection_type    = "INCLUDE"
+    non_key_attributes = ["title", "title_status", "created_at", "message_count", "last_message_preview"]
   }
 
   tags = {
@@ -31,3 +39,27 @@ resource "aws_dynamodb_table" "chats_table" {
     ManagedBy   = "Terraform"
   }
 }
+
+# One item per chat message, ordered by the chat's message sequence number
+resource "aws_dynamodb_table" "chat_messages_table" {
+  name           = "${var.project_name}-${var.environment}-chat-messages"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "chat_id"
+  range_key      = "seq"
+
+  attribute {
+    name = "chat_id"
+    type = "S"
+  }
+
+  attribute {
+    name = "seq"
+    type = "N"
+  }
+
+  tags = {
+    Name        = "${var.project_name}-${var.environment}-chat-messages"
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
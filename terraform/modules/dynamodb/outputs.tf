@@ -12,3 +12,18 @@ output "gsi_arn" {
   description = "DynamoDB GSI ARN"
   value       = "${aws_dynamodb_table.chats_table.arn}/index/*"
 }
+
+output "stream_arn" {
+  description = "DynamoDB stream ARN"
+  value       = aws_dynamodb_table.chats_table.stream_arn
+}
+
+output "messages_table_name" {
+  description = "DynamoDB chat messages table name"
+  value       = aws_dynamodb_table.chat_messages_table.name
+}
+
+output "messages_table_arn" {
+  description = "DynamoDB chat messages table ARN"
+  value       = aws_dynamodb_table.chat_messages_table.arn
+}
@@ -38,17 +38,30 @@ resource "aws_iam_role_policy" "lambda_policy" {
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
           "dynamodb:Query",
-          "dynamodb:Scan"
+          "dynamodb:Scan",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:BatchGetItem"
         ]
         Resource = [
           var.dynamodb_table_arn,
           var.dynamodb_gsi_arn,
+          var.messages_table_arn,
           var.classes_table_arn,
           var.classes_gsi_arn,
           var.assignments_table_arn,
           var.assignments_gsi_arn
         ]
       },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:DescribeStream",
+          "dynamodb:ListStreams"
+        ]
+        Resource = var.dynamodb_stream_arn
+      },
       {
         Effect = "Allow"
         Action = [
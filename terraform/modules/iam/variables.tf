@@ -18,6 +18,16 @@ variable "dynamodb_gsi_arn" {
   type        = string
 }
 
+variable "messages_table_arn" {
+  description = "DynamoDB chat messages table ARN"
+  type        = string
+}
+
+variable "dynamodb_stream_arn" {
+  description = "DynamoDB chats table stream ARN"
+  type        = string
+}
+
 variable "classes_table_arn" {
   description = "DynamoDB classes table ARN"
   type        = string
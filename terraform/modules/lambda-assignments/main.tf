@@ -13,11 +13,13 @@ resource "aws_lambda_function" "list_assignments" {
   source_code_hash = data.archive_file.list_assignments_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
       ASSIGNMENTS_TABLE_NAME = var.assignments_table_name
       S3_BUCKET_NAME        = var.s3_bucket_name
+      CURSOR_SECRET          = var.cursor_secret
     }
   }
 
@@ -61,6 +63,7 @@ resource "aws_lambda_function" "get_assignment" {
   source_code_hash = data.archive_file.get_assignment_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
@@ -109,6 +112,7 @@ resource "aws_lambda_function" "create_assignment" {
   source_code_hash = data.archive_file.create_assignment_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
@@ -157,6 +161,7 @@ resource "aws_lambda_function" "update_assignment" {
   source_code_hash = data.archive_file.update_assignment_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
@@ -205,6 +210,7 @@ resource "aws_lambda_function" "delete_assignment" {
   source_code_hash = data.archive_file.delete_assignment_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
@@ -237,3 +243,101 @@ resource "aws_lambda_permission" "delete_assignment_permission" {
   principal     = "apigateway.amazonaws.com"
   source_arn    = "${var.api_execution_arn}/*/*"
 }
+
+# Lambda: Assignment Upload (presigned S3 uploads; file bytes never pass through Lambda)
+data "archive_file" "assignment_upload_zip" {
+  type        = "zip"
+  source_file = "${path.module}/../../../lambda/assignment_upload.py"
+  output_path = "${path.module}/../../../lambda/assignment_upload.zip"
+}
+
+resource "aws_lambda_function" "assignment_upload" {
+  filename         = data.archive_file.assignment_upload_zip.output_path
+  function_name    = "${var.project_name}-${var.environment}-assignment-upload"
+  role            = var.lambda_role_arn
+  handler         = "assignment_upload.lambda_handler"
+  source_code_hash = data.archive_file.assignment_upload_zip.output_base64sha256
+  runtime         = "python3.11"
+  timeout         = 30
+  layers          = [var.common_layer_arn]
+
+  environment {
+    variables = {
+      ASSIGNMENTS_TABLE_NAME = var.assignments_table_name
+      S3_BUCKET_NAME        = var.s3_bucket_name
+    }
+  }
+
+  tags = {
+    Name        = "${var.project_name}-${var.environment}-assignment-upload"
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_cloudwatch_log_group" "assignment_upload_logs" {
+  name              = "/aws/lambda/${aws_lambda_function.assignment_upload.function_name}"
+  retention_in_days = 7
+
+  tags = {
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_lambda_permission" "assignment_upload_permission" {
+  statement_id  = "AllowAPIGatewayInvoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.assignment_upload.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${var.api_execution_arn}/*/*"
+}
+
+# Lambda: Batch Assignments (bulk create/update/delete, batched upload completion)
+data "archive_file" "batch_assignments_zip" {
+  type        = "zip"
+  source_file = "${path.module}/../../../lambda/batch_assignments.py"
+  output_path = "${path.module}/../../../lambda/batch_assignments.zip"
+}
+
+resource "aws_lambda_function" "batch_assignments" {
+  filename         = data.archive_file.batch_assignments_zip.output_path
+  function_name    = "${var.project_name}-${var.environment}-batch-assignments"
+  role            = var.lambda_role_arn
+  handler         = "batch_assignments.lambda_handler"
+  source_code_hash = data.archive_file.batch_assignments_zip.output_base64sha256
+  runtime         = "python3.11"
+  timeout         = 30
+  layers          = [var.common_layer_arn]
+
+  environment {
+    variables = {
+      ASSIGNMENTS_TABLE_NAME = var.assignments_table_name
+      S3_BUCKET_NAME        = var.s3_bucket_name
+    }
+  }
+
+  tags = {
+    Name        = "${var.project_name}-${var.environment}-batch-assignments"
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_cloudwatch_log_group" "batch_assignments_logs" {
+  name              = "/aws/lambda/${aws_lambda_function.batch_assignments.function_name}"
+  retention_in_days = 7
+
+  tags = {
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_lambda_permission" "batch_assignments_permission" {
+  statement_id  = "AllowAPIGatewayInvoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.batch_assignments.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${var.api_execution_arn}/*/*"
+}
@@ -47,3 +47,23 @@ output "delete_assignment_invoke_arn" {
   description = "Delete Assignment Lambda invoke ARN"
   value       = aws_lambda_function.delete_assignment.invoke_arn
 }
+
+output "assignment_upload_function_name" {
+  description = "Assignment Upload Lambda function name"
+  value       = aws_lambda_function.assignment_upload.function_name
+}
+
+output "assignment_upload_invoke_arn" {
+  description = "Assignment Upload Lambda invoke ARN"
+  value       = aws_lambda_function.assignment_upload.invoke_arn
+}
+
+output "batch_assignments_function_name" {
+  description = "Batch Assignments Lambda function name"
+  value       = aws_lambda_function.batch_assignments.function_name
+}
+
+output "batch_assignments_invoke_arn" {
+  description = "Batch Assignments Lambda invoke ARN"
+  value       = aws_lambda_function.batch_assignments.invoke_arn
+}
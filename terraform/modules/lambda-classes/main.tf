@@ -13,10 +13,12 @@ resource "aws_lambda_function" "get_all_classes" {
   source_code_hash = data.archive_file.get_all_classes_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
       CLASSES_TABLE_NAME = var.classes_table_name
+      CURSOR_SECRET      = var.cursor_secret
     }
   }
 
@@ -55,6 +57,7 @@ resource "aws_lambda_function" "get_class_by_id" {
   source_code_hash = data.archive_file.get_class_by_id_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
@@ -97,6 +100,7 @@ resource "aws_lambda_function" "create_class" {
   source_code_hash = data.archive_file.create_class_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
@@ -139,6 +143,7 @@ resource "aws_lambda_function" "update_class" {
   source_code_hash = data.archive_file.update_class_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
@@ -181,6 +186,7 @@ resource "aws_lambda_function" "delete_class" {
   source_code_hash = data.archive_file.delete_class_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
@@ -207,3 +213,46 @@ resource "aws_lambda_permission" "delete_class_permission" {
   principal     = "apigateway.amazonaws.com"
   source_arn    = "${var.api_execution_arn}/*/*"
 }
+
+# Lambda: Batch Classes (bulk create/update/delete)
+data "archive_file" "batch_classes_zip" {
+  type        = "zip"
+  source_file = "${path.module}/../../../lambda/batch_classes.py"
+  output_path = "${path.module}/../../../lambda/batch_classes.zip"
+}
+
+resource "aws_lambda_function" "batch_classes" {
+  filename         = data.archive_file.batch_classes_zip.output_path
+  function_name    = "${var.project_name}-${var.environment}-batch-classes"
+  role            = var.lambda_role_arn
+  handler         = "batch_classes.lambda_handler"
+  source_code_hash = data.archive_file.batch_classes_zip.output_base64sha256
+  runtime         = "python3.11"
+  timeout         = 30
+  layers          = [var.common_layer_arn]
+
+  environment {
+    variables = {
+      CLASSES_TABLE_NAME = var.classes_table_name
+    }
+  }
+
+  tags = {
+    Name        = "${var.project_name}-${var.environment}-batch-classes"
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_cloudwatch_log_group" "batch_classes_logs" {
+  name              = "/aws/lambda/${aws_lambda_function.batch_classes.function_name}"
+  retention_in_days = 7
+}
+
+resource "aws_lambda_permission" "batch_classes_permission" {
+  statement_id  = "AllowAPIGatewayInvoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.batch_classes.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${var.api_execution_arn}/*/*"
+}
@@ -47,3 +47,13 @@ output "delete_class_invoke_arn" {
   description = "Delete Class Lambda invoke ARN"
   value       = aws_lambda_function.delete_class.invoke_arn
 }
+
+output "batch_classes_function_name" {
+  description = "Batch Classes Lambda function name"
+  value       = aws_lambda_function.batch_classes.function_name
+}
+
+output "batch_classes_invoke_arn" {
+  description = "Batch Classes Lambda invoke ARN"
+  value       = aws_lambda_function.batch_classes.invoke_arn
+}
@@ -22,3 +22,14 @@ variable "api_execution_arn" {
   description = "API Gateway execution ARN"
     type = string
 }
+
+variable "cursor_secret" {
+  description = "Key used to sign pagination cursors"
+  type        = string
+  sensitive   = true
+}
+
+variable "common_layer_arn" {
+  description = "ARN of the common Lambda layer (lambda_common)"
+  type        = string
+}
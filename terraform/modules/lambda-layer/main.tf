@@ -0,0 +1,18 @@
+# Lambda Layer: shared handler code (lambda/layer/python/lambda_common.py) and its dependencies.
+# Install the dependencies into the layer before applying:
+#   pip install -r lambda/layer/requirements.txt -t lambda/layer/python \
+#     --platform manylinux2014_x86_64 --only-binary=:all: --python-version 3.11
+data "archive_file" "common_layer_zip" {
+  type        = "zip"
+  source_dir  = "${path.module}/../../../lambda/layer"
+  output_path = "${path.module}/../../../lambda/layer.zip"
+  excludes    = ["requirements.txt"]
+}
+
+resource "aws_lambda_layer_version" "common" {
+  filename            = data.archive_file.common_layer_zip.output_path
+  layer_name          = "${var.project_name}-${var.environment}-common"
+  source_code_hash    = data.archive_file.common_layer_zip.output_base64sha256
+  compatible_runtimes = ["python3.11"]
+  description         = "Shared helpers for the API Lambdas"
+}
@@ -0,0 +1,4 @@
+output "layer_arn" {
+  description = "ARN of the common layer version"
+  value       = aws_lambda_layer_version.common.arn
+}
@@ -0,0 +1,85 @@
+# Lambda: Router (optional single-function deployment, see lambda/router.py)
+locals {
+  handler_files = [
+    "router.py",
+    "create_chat.py",
+    "get_chat.py",
+    "list_chats.py",
+    "delete_chat.py",
+    "append_message.py",
+    "get_all_classes.py",
+    "get_class_by_id.py",
+    "create_class.py",
+    "update_class.py",
+    "delete_class.py",
+    "batch_classes.py",
+    "list_assignments.py",
+    "get_assignment.py",
+    "create_assignment.py",
+    "update_assignment.py",
+    "delete_assignment.py",
+    "assignment_upload.py",
+    "batch_assignments.py"
+  ]
+}
+
+data "archive_file" "router_zip" {
+  type        = "zip"
+  output_path = "${path.module}/../../../lambda/router.zip"
+
+  dynamic "source" {
+    for_each = local.handler_files
+    content {
+      content  = file("${path.module}/../../../lambda/${source.value}")
+      filename = source.value
+    }
+  }
+}
+
+resource "aws_lambda_function" "router" {
+  filename         = data.archive_file.router_zip.output_path
+  function_name    = "${var.project_name}-${var.environment}-api-router"
+  role            = var.lambda_role_arn
+  handler         = "router.lambda_handler"
+  source_code_hash = data.archive_file.router_zip.output_base64sha256
+  runtime         = "python3.11"
+  timeout         = 30
+  memory_size     = var.memory_size
+  layers          = [var.common_layer_arn]
+
+  # Union of the environments of the per-function deployment
+  environment {
+    variables = {
+      TABLE_NAME             = var.dynamodb_table_name
+      MESSAGES_TABLE_NAME    = var.messages_table_name
+      CLASSES_TABLE_NAME     = var.classes_table_name
+      ASSIGNMENTS_TABLE_NAME = var.assignments_table_name
+      S3_BUCKET_NAME         = var.s3_bucket_name
+      CURSOR_SECRET          = var.cursor_secret
+    }
+  }
+
+  tags = {
+    Name        = "${var.project_name}-${var.environment}-api-router"
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_cloudwatch_log_group" "router_logs" {
+  name              = "/aws/lambda/${aws_lambda_function.router.function_name}"
+  retention_in_days = 7
+
+  tags = {
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_lambda_permission" "router_permission" {
+  statement_id  = "AllowAPIGatewayInvoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.router.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${var.api_execution_arn}/*/*"
+}
@@ -0,0 +1,9 @@
+output "router_function_name" {
+  description = "Router Lambda function name"
+  value       = aws_lambda_function.router.function_name
+}
+
+output "router_invoke_arn" {
+  description = "Router Lambda invoke ARN"
+  value       = aws_lambda_function.router.invoke_arn
+}
@@ -0,0 +1,61 @@
+variable "project_name" {
+  description = "Project name"
+  type        = string
+}
+
+variable "environment" {
+  description = "Environment name"
+  type        = string
+}
+
+variable "lambda_role_arn" {
+  description = "Lambda IAM role ARN"
+  type        = string
+}
+
+variable "dynamodb_table_name" {
+  description = "DynamoDB chats table name"
+  type        = string
+}
+
+variable "messages_table_name" {
+  description = "DynamoDB chat messages table name"
+  type        = string
+}
+
+variable "classes_table_name" {
+  description = "DynamoDB classes table name"
+  type        = string
+}
+
+variable "assignments_table_name" {
+  description = "DynamoDB assignments table name"
+  type        = string
+}
+
+variable "s3_bucket_name" {
+  description = "S3 bucket name for assignment files"
+  type        = string
+}
+
+variable "cursor_secret" {
+  description = "Key used to sign pagination cursors"
+  type        = string
+  sensitive   = true
+}
+
+variable "common_layer_arn" {
+  description = "ARN of the common Lambda layer (lambda_common)"
+  type        = string
+}
+
+variable "memory_size" {
+  description = "Router Lambda memory in MB"
+  type        = number
+  default     = 256
+}
+
+variable "api_execution_arn" {
+  description = "API Gateway execution ARN"
+  type        = string
+}
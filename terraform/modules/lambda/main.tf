@@ -13,10 +13,12 @@ resource "aws_lambda_function" "create_chat" {
   source_code_hash = data.archive_file.create_chat_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
-      TABLE_NAME = var.dynamodb_table_name
+      TABLE_NAME          = var.dynamodb_table_name
+      MESSAGES_TABLE_NAME = var.messages_table_name
     }
   }
 
@@ -60,10 +62,12 @@ resource "aws_lambda_function" "get_chat" {
   source_code_hash = data.archive_file.get_chat_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
-      TABLE_NAME = var.dynamodb_table_name
+      TABLE_NAME          = var.dynamodb_table_name
+      MESSAGES_TABLE_NAME = var.messages_table_name
     }
   }
 
@@ -107,10 +111,12 @@ resource "aws_lambda_function" "list_chats" {
   source_code_hash = data.archive_file.list_chats_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
-      TABLE_NAME = var.dynamodb_table_name
+      TABLE_NAME    = var.dynamodb_table_name
+      CURSOR_SECRET = var.cursor_secret
     }
   }
 
@@ -154,10 +160,12 @@ resource "aws_lambda_function" "delete_chat" {
   source_code_hash = data.archive_file.delete_chat_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
-      TABLE_NAME = var.dynamodb_table_name
+      TABLE_NAME          = var.dynamodb_table_name
+      MESSAGES_TABLE_NAME = var.messages_table_name
     }
   }
 
@@ -201,10 +209,12 @@ resource "aws_lambda_function" "append_message" {
   source_code_hash = data.archive_file.append_message_zip.output_base64sha256
   runtime         = "python3.11"
   timeout         = 30
+  layers          = [var.common_layer_arn]
 
   environment {
     variables = {
-      TABLE_NAME = var.dynamodb_table_name
+      TABLE_NAME          = var.dynamodb_table_name
+      MESSAGES_TABLE_NAME = var.messages_table_name
     }
   }
 
@@ -232,3 +242,59 @@ resource "aws_lambda_permission" "append_message_permission" {
   principal     = "apigateway.amazonaws.com"
   source_arn    = "${var.api_execution_arn}/*/*"
 }
+
+# Lambda: Generate Chat Title (chats table stream, off the create_chat request path)
+data "archive_file" "generate_chat_title_zip" {
+  type        = "zip"
+  source_file = "${path.module}/../../../lambda/generate_chat_title.py"
+  output_path = "${path.module}/../../../lambda/generate_chat_title.zip"
+}
+
+resource "aws_lambda_function" "generate_chat_title" {
+  filename         = data.archive_file.generate_chat_title_zip.output_path
+  function_name    = "${var.project_name}-${var.environment}-generate-chat-title"
+  role            = var.lambda_role_arn
+  handler         = "generate_chat_title.lambda_handler"
+  source_code_hash = data.archive_file.generate_chat_title_zip.output_base64sha256
+  runtime         = "python3.11"
+  timeout         = 30
+  layers          = [var.common_layer_arn]
+
+  environment {
+    variables = {
+      TABLE_NAME = var.dynamodb_table_name
+    }
+  }
+
+  tags = {
+    Name        = "${var.project_name}-${var.environment}-generate-chat-title"
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_cloudwatch_log_group" "generate_chat_title_logs" {
+  name              = "/aws/lambda/${aws_lambda_function.generate_chat_title.function_name}"
+  retention_in_days = 7
+
+  tags = {
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_lambda_event_source_mapping" "generate_chat_title_stream" {
+  event_source_arn  = var.dynamodb_stream_arn
+  function_name     = aws_lambda_function.generate_chat_title.arn
+  starting_position = "LATEST"
+  batch_size        = 10
+
+  # Only new chats; message appends and title updates do not invoke the function
+  filter_criteria {
+    filter {
+      pattern = jsonencode({
+        eventName = ["INSERT"]
+      })
+    }
+  }
+}
@@ -18,7 +18,28 @@ variable "dynamodb_table_name" {
   type        = string
 }
 
+variable "messages_table_name" {
+  description = "DynamoDB chat messages table name"
+  type        = string
+}
+
 variable "api_execution_arn" {
   description = "API Gateway execution ARN"
   type        = string
 }
+
+variable "dynamodb_stream_arn" {
+  description = "Chats table stream ARN (triggers title generation)"
+  type        = string
+}
+
+variable "cursor_secret" {
+  description = "Key used to sign pagination cursors"
+  type        = string
+  sensitive   = true
+}
+
+variable "common_layer_arn" {
+  description = "ARN of the common Lambda layer (lambda_common)"
+  type        = string
+}
@@ -60,6 +60,7 @@ output "lambda_function_names" {
     create_class    = module.lambda_classes.create_class_function_name
     update_class    = module.lambda_classes.update_class_function_name
     delete_class    = module.lambda_classes.delete_class_function_name
+    batch_classes   = module.lambda_classes.batch_classes_function_name
     
     # Assignments functions
     list_assignments   = module.lambda_assignments.list_assignments_function_name
@@ -67,9 +68,15 @@ output "lambda_function_names" {
     create_assignment  = module.lambda_assignments.create_assignment_function_name
     update_assignment  = module.lambda_assignments.update_assignment_function_name
     delete_assignment  = module.lambda_assignments.delete_assignment_function_name
+    batch_assignments  = module.lambda_assignments.batch_assignments_function_name
   }
 }
 
+output "router_function_name" {
+  description = "Router Lambda function name (null unless use_router_lambda)"
+  value       = var.use_router_lambda ? module.lambda_router[0].router_function_name : null
+}
+
 output "api_routes" {
   description = "Available API routes"
   value = {
@@ -86,6 +93,7 @@ output "api_routes" {
     create_class    = "POST ${module.api_gateway.api_endpoint}/users/{user_id}/classes"
     update_class    = "PUT ${module.api_gateway.api_endpoint}/users/{user_id}/classes/{class_id}"
     delete_class    = "DELETE ${module.api_gateway.api_endpoint}/users/{user_id}/classes/{class_id}"
+    batch_classes   = "POST|PUT ${module.api_gateway.api_endpoint}/users/{user_id}/classes/batch, POST .../classes/batch/delete"
     
     # Assignments routes
     list_assignments  = "GET ${module.api_gateway.api_endpoint}/users/{user_id}/assignments"
@@ -93,5 +101,6 @@ output "api_routes" {
     create_assignment = "POST ${module.api_gateway.api_endpoint}/users/{user_id}/assignments"
     update_assignment = "PUT ${module.api_gateway.api_endpoint}/users/{user_id}/assignments/{assignment_id}"
     delete_assignment = "DELETE ${module.api_gateway.api_endpoint}/users/{user_id}/assignments/{assignment_id}"
+    batch_assignments = "POST|PUT ${module.api_gateway.api_endpoint}/users/{user_id}/assignments/batch, POST .../assignments/batch/delete, POST .../assignments/batch/upload/complete"
   }
 }
@@ -29,3 +29,9 @@ variable "use_lambda" {
   type        = bool
   default     = false
 }
+
+variable "use_router_lambda" {
+  description = "Serve every API route from one router Lambda instead of one function per route"
+  type        = bool
+  default     = false
+}